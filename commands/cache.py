@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+#  Copyright (C) 2010-2012  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+import time
+
+import src
+
+# Define all possible option for the cache command :  sat cache <options>
+parser = src.options.Options()
+parser.add_option('s', 'stats', 'boolean', 'stats',
+                  _('Optional: Show the content and the size of the build '
+                    'cache (default).'))
+parser.add_option('', 'prune', 'boolean', 'prune',
+                  _('Optional: Remove the products the least recently used '
+                    'from the build cache, until its size is lower than '
+                    'the maximum size.'))
+parser.add_option('', 'max_size', 'int', 'max_size',
+                  _('Optional: The maximum size in MB used by --prune, '
+                    'instead of LOCAL.build_cache_max_size.'))
+
+def format_size(size):
+    '''Get a size in bytes as a readable string.'''
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024:
+            return "%.1f %s" % (size, unit)
+        size /= 1024.
+    return "%.1f TB" % size
+
+def show_stats(cache, logger):
+    '''Display the entries of the build cache and its size.
+
+    :param cache BuildCache: The build cache.
+    :param logger Logger: The logger instance to use for the display.
+    '''
+    entries = cache.get_entries()
+    products = {} # product name -> [number of entries, size, hits]
+    for date, entry_dir, info in entries:
+        stats = products.setdefault(info.product, [0, 0, 0])
+        stats[0] += 1
+        stats[1] += info.size
+        stats[2] += info.hits
+    for name in sorted(products):
+        nb, size, hits = products[name]
+        logger.write("  %s %s %d build(s), %s, restored %d time(s)\n" % (
+                     src.printcolors.printcLabel(name),
+                     "." * (30 - len(name)), nb, format_size(size), hits), 3)
+    size = sum([info.size for date, entry_dir, info in entries])
+    info = [(_("directory"), cache.cache_dir),
+            (_("builds"), len(entries)),
+            (_("size"), format_size(size)),
+            (_("maximum size"),
+             format_size(cache.max_size * 1024 * 1024) if cache.max_size
+             else _("no limit")),
+            (_("restored"), sum([i.hits for d, e, i in entries]))]
+    if entries:
+        info.append((_("least recently used"),
+                     time.strftime("%Y-%m-%d %H:%M:%S",
+                                   time.localtime(entries[0][0]))))
+    logger.write("\n", 3)
+    src.print_info(logger, info)
+
+def description():
+    '''method that is called when salomeTools is called with --help option.
+
+    :return: The text to display for the cache command description.
+    :rtype: str
+    '''
+    return _("The cache command manages the build cache, where the compile "
+             "command stores the installations of the products, to restore "
+             "them in the other applications (see sat init --build_cache)."
+             "\n\nexample:\nsat cache --prune --max_size 20000")
+
+def run(args, runner, logger):
+    '''method that is called when salomeTools is called with cache parameter.
+    '''
+    # Parse the options
+    (options, args) = parser.parse_args(args)
+
+    cache = src.buildCache.BuildCache.from_config(runner.cfg)
+    if cache is None:
+        msg = _("There is no build cache, set it with sat init --build_cache")
+        logger.write(src.printcolors.printcWarning(msg) + "\n", 1)
+        return 1
+
+    logger.write(_('Build cache %s\n\n') %
+                 src.printcolors.printcLabel(cache.cache_dir), 1)
+
+    if options.prune:
+        max_size = cache.max_size
+        if options.max_size is not None:
+            max_size = options.max_size
+        if max_size < 0 or (max_size == 0 and options.max_size is None):
+            msg = _("No maximum size, set it with --max_size or with "
+                    "sat init --build_cache_max_size")
+            logger.write(src.printcolors.printcWarning(msg) + "\n", 1)
+            return 1
+        removed = cache.prune(max_size)
+        for date, entry_dir, info in removed:
+            logger.write(_("Remove %(name)s %(version)s (%(size)s)\n") %
+                         {"name" : src.printcolors.printcLabel(info.product),
+                          "version" : info.version,
+                          "size" : format_size(info.size)}, 3)
+        logger.write(_("%(nb)d build(s) removed, %(size)s freed\n\n") %
+                     {"nb" : len(removed),
+                      "size" : format_size(sum([i.size for d, e, i
+                                                in removed]))}, 1)
+
+    show_stats(cache, logger)
+    return 0
@@ -251,5 +251,10 @@ try 'sat --help clean' and 'sat clean ... --products ... --sources --build --ins
     
     # Suppress the list of paths
     suppress_directories(l_dir_to_suppress, logger)
+
+    # the install directories of the products in base depend on the 
+    # existing ones, the product configurations have to be computed again
+    if options.all or options.install:
+        src.product.invalidate_product_configs()
     
     return 0
@@ -18,6 +18,8 @@
 
 import os
 import re
+import sys
+import time
 import subprocess
 import src
 import src.debug as DBG
@@ -38,6 +40,11 @@ parser.add_option('f', 'force', 'boolean', 'force',
     'Optional: force the compilation of product, even if it is already installed. The BUILD directory is cleaned before compilation.')
 parser.add_option('u', 'update', 'boolean', 'update',
     'Optional: update mode, compile only products which sources has changed, including the dependencies.')
+parser.add_option('', 'incremental', 'boolean', 'incremental',
+    _("Optional: incremental mode, compile again only the products whose "
+      "fingerprint (sources, configuration, compilation environment and "
+      "dependencies) has changed since their compilation, and tell why."),
+    False)
 parser.add_option('', 'with_fathers', 'boolean', 'fathers',
     _("Optional: build all necessary products to the given product (KERNEL is "
       "build before building GUI)."), False)
@@ -62,64 +69,23 @@ parser.add_option('', 'check', 'boolean', 'check', _(
 
 parser.add_option('', 'clean_build_after', 'boolean', 'clean_build_after', 
                   _('Optional: remove the build directory after successful compilation'), False)
+parser.add_option('j', 'jobs', 'int', 'jobs',
+                  _("Optional: compile the independent products in parallel, "
+                    "sharing this number of processors (make -j) between "
+                    "the products compiled at the same time."))
+parser.add_option('', 'jobserver', 'boolean', 'jobserver',
+                  _("Optional: share a GNU make jobserver between the make "
+                    "commands of the products, and with the other sat "
+                    "compile --jobserver commands of the user, to run no "
+                    "more jobs than the processors of the machine (or "
+                    "--jobs, --make_flags)."), False)
+parser.add_option('', 'report', 'boolean', 'report',
+                  _("Optional: do not compile, show the slowest products and "
+                    "the critical path of the dependencies, from the last "
+                    "compilation of the products."), False)
 
-
-# from sat product infos, represent the product dependencies in a simple python graph
-# keys are nodes, the list of dependencies are values
-def get_dependencies_graph(p_infos, compile_time=True):
-    graph={}
-    for (p_name,p_info) in p_infos:
-        depprod=[]
-        for d in p_info.depend:
-            depprod.append(d)
-        if compile_time and "build_depend" in p_info:
-            for d in p_info.build_depend:
-                depprod.append(d)
-        graph[p_name]=depprod
-    return graph
-
-# this recursive function calculates all the dependencies of node start
-def depth_search_graph(graph, start, visited=[]):
-    visited= visited+ [start]
-    for node in graph[start]:  # for all nodes in start dependencies
-        if node not in visited:
-            visited=depth_search_graph(graph, node, visited)
-    return visited
-
-# find a path from start node to end (a group of nodes)
-def find_path_graph(graph, start, end, path=[]):
-    path = path + [start]
-    if start in end:
-        return path
-    if start not in graph:
-        return None
-    for node in graph[start]:
-        if node not in path:
-            newpath = find_path_graph(graph, node, end, path)
-            if newpath: return newpath
-    return None
-
-# Topological sorting algo
-# return in sorted_nodes the list of sorted nodes
-def depth_first_topo_graph(graph, start, visited=[], sorted_nodes=[]):
-    visited = visited + [start]
-    if start not in graph:
-        # get more explicit error
-        where = [k for k in graph if start in graph[k]]
-        raise src.SatException('Error in product dependencies : %s product is referenced in products dependencies, but is not present in the application, from %s' % (start, where))
-        # may be in debug mode, continue loop to get all problems, (if comment raise)
-        # print("WARNING : %s product is referenced in products dependencies but is not present in the application, from %s" % (start, where))
-        # sorted_nodes = sorted_nodes + [start]
-        # return visited, sorted_nodes
-    for node in graph[start]:
-        if node not in visited:
-            visited,sorted_nodes=depth_first_topo_graph(graph, node, visited,sorted_nodes)
-        else:
-            if node not in sorted_nodes:
-                raise src.SatException('Error in product dependencies : cycle detection for node %s and %s' % (start,node))
-    
-    sorted_nodes = sorted_nodes + [start]
-    return visited, sorted_nodes
+# the number of products shown by the --report option
+NB_REPORTED_PRODUCTS = 10
 
 
 # check for p_name that all dependencies are installed
@@ -145,6 +111,65 @@ def log_res_step(logger, res):
         logger.write("%s \n" % src.printcolors.printcError("KO"), 4)
         logger.flush()
 
+def check_product_to_compile(config, options, p_name, p_info, logger, header):
+    '''Check if a product has to be compiled, and log why if it has not.
+
+    :param config Config: The global configuration
+    :param p_name str: The product name
+    :param p_info Config: The specific config of the product
+    :param logger Logger: The logger instance to use for the display and logging
+    :param header Str: the header to display when logging
+    :return: the product info (recomputed), True if the product has to be
+             compiled, and the number of errors (0 or 1).
+    :rtype: (Config, boolean, int)
+    '''
+    # Do nothing if the product is not compilable
+    if not src.product.product_compiles(p_info):
+        log_step(logger, header, "ignored")
+        logger.write("\n", 3, False)
+        return p_info, False, 0
+
+    # Do nothing if the product is native
+    if src.product.product_is_native(p_info):
+        log_step(logger, header, "native")
+        logger.write("\n", 3, False)
+        return p_info, False, 0
+
+    # Do nothing if the product is fixed (already compiled by third party)
+    if src.product.product_is_fixed(p_info):
+        log_step(logger, header, "native")
+        logger.write("\n", 3, False)
+        return p_info, False, 0
+
+    # Recompute the product information to get the right install_dir
+    # (it could change if there is a clean of the install directory)
+    p_info = src.product.get_product_config(config, p_name)
+
+    # Check if sources was already successfully installed
+    check_source = src.product.check_source(p_info)
+    is_pip= (src.appli_test_property(config,"pip", "yes") and src.product.product_test_property(p_info,"pip", "yes"))
+    # don't check sources with option --show 
+    # or for products managed by pip (there sources are in wheels stored in LOCAL.ARCHIVE
+    if not (options.no_compile or is_pip): 
+        if not check_source:
+            logger.write(_("Sources of product not found (try 'sat -h prepare') \n"))
+            return p_info, False, 1 # one more error
+
+    # if we don't force compilation, check if the was already successfully installed.
+    # we don't compile in this case.
+    if (not options.force) and src.product.check_installation(config, p_info):
+        logger.write(_("Already installed"))
+        logger.write(_(" in %s" % p_info.install_dir), 4)
+        logger.write(_("\n"))
+        return p_info, False, 0
+
+    # If the show option was called, do not launch the compilation
+    if options.no_compile:
+        logger.write(_("Not installed in %s\n" % p_info.install_dir))
+        return p_info, False, 0
+
+    return p_info, True, 0
+
 def compile_all_products(sat, config, options, products_infos, all_products_dict, all_products_graph, logger):
     '''Execute the proper configuration commands 
        in each product build directory.
@@ -161,6 +186,10 @@ def compile_all_products(sat, config, options, products_infos, all_products_dict
     # first loop for the cleaning 
     check_salome_configuration=False
     updated_products=[]
+    # the fingerprints are computed once, and stored only in incremental mode
+    fingerprints = None
+    if options.incremental:
+        fingerprints = src.fingerprint.Fingerprints(config)
     for p_name_info in products_infos:
         
         p_name, p_info = p_name_info
@@ -211,7 +240,7 @@ def compile_all_products(sat, config, options, products_infos, all_products_dict
                     if len(updated_products)>0:
                         # if other products where updated, check that the current product is a child 
                         # in this case it will be also updated
-                        if find_path_graph(all_products_graph, p_name, updated_products):
+                        if all_products_graph.depends_on(p_name, updated_products):
                             logger.write("\nUpdate product %s (child)" % p_name, 5)
                             do_update=True
                     if (not do_update) and os.path.isdir(p_info.source_dir) \
@@ -232,6 +261,25 @@ def compile_all_products(sat, config, options, products_infos, all_products_dict
                 except:
                     pass
 
+            if options.incremental:
+                # the fingerprints of the dependencies are in the fingerprint
+                # of the product: the children of a changed product change
+                changes = fingerprints.get_changes(p_name)
+                if not changes:
+                    logger.write(_("Incremental: %s is up to date\n") %
+                                 src.printcolors.printcLabel(p_name), 4)
+                    continue
+                logger.write(_("Incremental: %(name)s will be compiled "
+                               "(%(why)s)\n") %
+                             {"name" : src.printcolors.printcLabel(p_name),
+                              "why" : ", ".join(changes)}, 3)
+                sat.clean(config.VARS.application + 
+                          " --products " + p_name + 
+                          " --build --install",
+                          batch=True,
+                          verbose=0,
+                          logger_add_link = logger)
+
     if check_salome_configuration:
         # For salome applications, we check if the sources of configuration modules are present
         # configuration modules have the property "configure_dependency"
@@ -256,8 +304,15 @@ def compile_all_products(sat, config, options, products_infos, all_products_dict
         if res>0:
             return res  # error configure dependency : we stop the compilation
 
+    # compile the independent products in parallel
+    if options.jobs and not options.no_compile:
+        return compile_all_products_parallel(sat, config, options,
+                                             products_infos, all_products_dict,
+                                             logger)
+
     # second loop to compile
     res = 0
+    build_cache = src.buildCache.BuildCache.from_config(config)
     for p_name_info in products_infos:
         
         p_name, p_info = p_name_info
@@ -269,52 +324,13 @@ def compile_all_products(sat, config, options, products_infos, all_products_dict
         logger.write(header, 3)
         logger.flush()
 
-        # Do nothing if the product is not compilable
-        if not src.product.product_compiles(p_info):
-            log_step(logger, header, "ignored")
-            logger.write("\n", 3, False)
-            continue
-
-        # Do nothing if the product is native
-        if src.product.product_is_native(p_info):
-            log_step(logger, header, "native")
-            logger.write("\n", 3, False)
-            continue
-
-        # Do nothing if the product is fixed (already compiled by third party)
-        if src.product.product_is_fixed(p_info):
-            log_step(logger, header, "native")
-            logger.write("\n", 3, False)
+        # Check if the product has to be compiled (it is logged if not)
+        p_info, to_compile, nb_errors = check_product_to_compile(
+                                   config, options, p_name, p_info, logger, header)
+        res += nb_errors
+        if not to_compile:
             continue
-
-
-        # Recompute the product information to get the right install_dir
-        # (it could change if there is a clean of the install directory)
-        p_info = src.product.get_product_config(config, p_name)
-        
-        # Check if sources was already successfully installed
-        check_source = src.product.check_source(p_info)
         is_pip= (src.appli_test_property(config,"pip", "yes") and src.product.product_test_property(p_info,"pip", "yes"))
-        # don't check sources with option --show 
-        # or for products managed by pip (there sources are in wheels stored in LOCAL.ARCHIVE
-        if not (options.no_compile or is_pip): 
-            if not check_source:
-                logger.write(_("Sources of product not found (try 'sat -h prepare') \n"))
-                res += 1 # one more error
-                continue
-        
-        # if we don't force compilation, check if the was already successfully installed.
-        # we don't compile in this case.
-        if (not options.force) and src.product.check_installation(config, p_info):
-            logger.write(_("Already installed"))
-            logger.write(_(" in %s" % p_info.install_dir), 4)
-            logger.write(_("\n"))
-            continue
-        
-        # If the show option was called, do not launch the compilation
-        if options.no_compile:
-            logger.write(_("Not installed in %s\n" % p_info.install_dir))
-            continue
         
         # Check if the dependencies are installed
         l_depends_not_installed = check_dependencies(config, p_name_info, all_products_dict)
@@ -329,7 +345,8 @@ def compile_all_products(sat, config, options, products_infos, all_products_dict
         
         # Call the function to compile the product
         res_prod, len_end_line, error_step = compile_product(
-             sat, p_name_info, config, options, logger, header, len_end_line)
+             sat, p_name_info, config, options, logger, header, len_end_line,
+             fingerprints, build_cache)
         
         if res_prod != 0:
             res += 1
@@ -383,6 +400,10 @@ def compile_all_products(sat, config, options, products_infos, all_products_dict
             logger.write("\r" + header + src.printcolors.printcSuccess("OK"))
             logger.write(_("\nINSTALL directory = %s" % 
                            src.printcolors.printcInfo(p_info.install_dir)), 3)
+            cache_stats = get_compiler_cache_results(logger, p_name)
+            if cache_stats is not None:
+                logger.write(_("\nCompiler cache: %s") %
+                             format_compiler_cache_results(cache_stats), 3)
             logger.write("\n==== %s \n" % src.printcolors.printcInfo("OK"), 4)
             logger.write("\n==== Compilation of %(name)s %(OK)s \n" %
                 { "name" : p_name , "OK" : src.printcolors.printcInfo("OK")}, 4)
@@ -395,7 +416,237 @@ def compile_all_products(sat, config, options, products_infos, all_products_dict
         
     return res
 
-def compile_product(sat, p_name_info, config, options, logger, header, len_end):
+def get_compile_command(sat, config, options, p_name, nb_proc, index,
+                        paths_file):
+    '''Get the command that compiles one product in a separate sat process,
+       with its own log files.
+
+    :param sat Sat: The Sat instance of the parent command
+    :param config Config: The global configuration
+    :param options Options: The options of the compile command
+    :param p_name str: The product name
+    :param nb_proc int: The number of processors given to the product
+    :param index int: The number of the product, to name its log files
+    :param paths_file str: The file where the process writes its result
+                           and the paths of its log files
+    :return: the command
+    :rtype: list
+    '''
+    command = [sys.executable,
+               os.path.join(config.VARS.salometoolsway, "sat"),
+               "-b", "-l", paths_file,
+               # log files names of the process distinct from the others
+               "-o", "VARS.datehour='%s-%d'" % (config.VARS.datehour, index),
+               "-o", "VARS.nb_proc=%d" % nb_proc]
+    if sat.options.output_verbose_level is not None:
+        command += ["-v", str(sat.options.output_verbose_level)]
+    if sat.options.overwrite is not None:
+        for rule in sat.options.overwrite:
+            command += ["-o", rule]
+    if sat.options.debug_mode:
+        command.append("-g")
+    if sat.options.no_config_cache:
+        command.append("--no-config-cache")
+    command += ["compile", config.VARS.application, "--products", p_name]
+    # the clean options have already been applied
+    if options.force:
+        command.append("--force")
+    if options.check:
+        command.append("--check")
+    if options.clean_build_after:
+        command.append("--clean_build_after")
+    if options.incremental:
+        # the product is compiled (it is cleaned), and stores its fingerprint
+        command.append("--incremental")
+    if options.jobserver:
+        command.append("--jobserver") # joins the jobserver of this process
+    if options.makeflags:
+        command += ["--make_flags", options.makeflags]
+    else:
+        command += ["--make_flags", str(nb_proc)]
+    return command
+
+def add_compile_log_link(logger, paths_file, res, command):
+    '''Add in the log of the command the link to the log of a product
+       compiled in a separate sat process.
+
+    :param logger Logger: The logger instance of the command
+    :param paths_file str: The file where the process has written its result
+                           and the paths of its log files
+    :param res int: The result of the process
+    :param command str: The command of the process
+    '''
+    try:
+        with open(paths_file) as f:
+            log_files = [l.strip() for l in f.readlines()[1:] if l.strip()]
+        os.remove(paths_file)
+    except (IOError, OSError):
+        return
+    if log_files:
+        logger.add_link(os.path.basename(log_files[0]), "compile", res, command)
+        logger.l_logFiles += log_files
+
+def compile_all_products_parallel(sat, config, options, products_infos,
+                                  all_products_dict, logger):
+    '''Compile the products in separate sat processes, as soon as their
+       dependencies are compiled, in the limit of options.jobs processors.
+       The processors available are shared between the products that are
+       ready to be compiled (make -j). With the option stop_first_fail,
+       the products depending upon a failing product are cancelled, 
+       the others are compiled.
+
+    :param sat Sat: The Sat instance of the parent command
+    :param config Config: The global configuration
+    :param options Options: The options of the compile command
+    :param products_infos list: List of (product_name, product_info),
+                                in the topological order
+    :param all_products_dict: Dict of all products 
+    :param logger Logger: The logger instance to use for the display and logging
+    :return: the number of failing products.
+    :rtype: int
+    '''
+    res = 0
+    len_end_line = 30
+    # the products to compile, in the topological order
+    waiting = []
+    for p_name, p_info in products_infos:
+        header = _("Compilation of %s") % src.printcolors.printcLabel(p_name)
+        header += " %s " % ("." * (len_end_line - len(p_name)))
+        logger.write(header, 3)
+        logger.flush()
+        p_info, to_compile, nb_errors = check_product_to_compile(
+                                   config, options, p_name, p_info, logger, header)
+        res += nb_errors
+        if to_compile:
+            log_step(logger, header, _("to compile\n"))
+            waiting.append((p_name, p_info, header))
+    if len(waiting) == 0:
+        return res
+
+    compiled = set([p_name for p_name, p_info, header in waiting])
+    depend = {}
+    for p_name, p_info, header in waiting:
+        depend[p_name] = [d for d in p_info.depend_all if d in compiled]
+
+    logger.write(_("\nCompilation of %(nb)d products with %(jobs)d processors"
+                   "\n\n") % {"nb" : len(waiting), "jobs" : options.jobs}, 3)
+    logger.flush()
+    out_dir = os.path.dirname(logger.txtFilePath)
+    out_prefix = os.path.basename(logger.txtFilePath)[:-len(".txt")]
+    done = {} # product name -> 0 if compiled, else 1
+    running = {} # product name -> (process, command, nb_proc, paths file,
+                 #                  start time, header)
+    nb_free = options.jobs
+    index = 0
+    try:
+        while waiting or running:
+            # launch the products whose dependencies are done
+            ready = [w for w in waiting if all(d in done for d in depend[w[0]])]
+            for p_name, p_info, header in ready:
+                failed = [d for d in depend[p_name] if done[d] != 0]
+                if failed and options.stop_first_fail:
+                    waiting.remove((p_name, p_info, header))
+                    done[p_name] = 1
+                    logger.write("%s%s\n" % (header, src.printcolors.printcWarning(
+                                 _("cancelled (%s failed)") % ",".join(failed))), 3)
+                    continue
+                # Check if the dependencies are installed
+                l_depends_not_installed = check_dependencies(config,
+                                                            (p_name, p_info),
+                                                            all_products_dict)
+                if len(l_depends_not_installed) > 0:
+                    waiting.remove((p_name, p_info, header))
+                    done[p_name] = 1
+                    logger.write(header + src.printcolors.printcError(
+                        _("ERROR : the following mandatory product(s) is(are) not installed: ")))
+                    logger.write(src.printcolors.printcError(
+                                 " ".join(l_depends_not_installed)) + "\n")
+                    continue
+                # share the free processors between the ready products
+                make_jobs = None
+                if options.makeflags:
+                    # as in the sequential mode, make_flags is given after -j
+                    make_jobs = src.compilation.get_make_jobs("-j" +
+                                                              options.makeflags)
+                if make_jobs is not None:
+                    nb_proc = max(1, min(make_jobs, options.jobs))
+                else:
+                    nb_ready = len([w for w in ready if w in waiting])
+                    nb_proc = max(1, nb_free // nb_ready)
+                if nb_proc > nb_free:
+                    break
+                waiting.remove((p_name, p_info, header))
+                index += 1
+                paths_file = os.path.join(out_dir, "%s_%s.paths" % (out_prefix, p_name))
+                out_file = os.path.join(out_dir, "%s_%s.txt" % (out_prefix, p_name))
+                command = get_compile_command(sat, config, options, p_name, nb_proc,
+                                              index, paths_file)
+                logger.write("%s%s\n" % (header, _("started (make -j%d)") % nb_proc), 4)
+                logger.write(" ".join(command) + "\n", 5)
+                logger.flush()
+                with open(out_file, "w") as f:
+                    process = subprocess.Popen(command, stdout=f,
+                                               stderr=subprocess.STDOUT,
+                                               cwd=config.LOCAL.workdir)
+                logger.l_logFiles.append(out_file)
+                running[p_name] = (process, "sat " + " ".join(command[2:]),
+                                   nb_proc, paths_file, time.time(), header)
+                nb_free -= nb_proc
+
+            # wait for the end of a product
+            ended = {} # product name -> peak memory of its sat process
+            for p_name in running:
+                returncode, max_rss = src.compilation.wait_with_rusage(
+                                                   running[p_name][0], block=False)
+                if returncode is not None:
+                    ended[p_name] = max_rss
+            if not ended:
+                if running:
+                    time.sleep(0.2)
+                continue
+            for p_name in ended:
+                process, command, nb_proc, paths_file, start, header = \
+                    running.pop(p_name)
+                nb_free += nb_proc
+                res_prod = 0 if process.returncode == 0 else 1
+                done[p_name] = res_prod
+                res += res_prod
+                add_compile_log_link(logger, paths_file, res_prod, command)
+                # installed by the sat process, for the checks of the dependants
+                src.product.set_installation_status(config,
+                                                    all_products_dict[p_name][1],
+                                                    res_prod == 0)
+                duration = time.time() - start
+                # the steps are in the log and the history of the sat process
+                add_step_result(config, logger, p_name, "COMPILE", res_prod,
+                                duration, ended[p_name], history=False,
+                                log_file=os.path.join(out_dir, "%s_%s.txt" %
+                                                      (out_prefix, p_name)))
+                if res_prod == 0:
+                    logger.write("%s%s (%.0fs)\n" % (header, 
+                                 src.printcolors.printcSuccess("OK"), duration), 3)
+                    logger.write(_("INSTALL directory = %s\n") % 
+                                 src.printcolors.printcInfo(
+                                     all_products_dict[p_name][1].install_dir), 4)
+                else:
+                    logger.write("%s%s (%.0fs)\n" % (header, 
+                                 src.printcolors.printcError("KO"), duration), 3)
+                    logger.write(_("See the log of the product: %s\n") % 
+                                 src.printcolors.printcInfo(
+                                   os.path.join(out_dir, "%s_%s.txt" % (out_prefix,
+                                                                        p_name))), 3)
+                logger.flush()
+    finally:
+        # the parent is interrupted (exception, Ctrl+C): stop the children
+        for p_name in running:
+            process = running[p_name][0]
+            if process.poll() is None:
+                process.terminate()
+                process.wait()
+    return res
+
+def compile_product(sat, p_name_info, config, options, logger, header, len_end,
+                    fingerprints=None, build_cache=None):
     '''Execute the proper configuration command(s) 
        in the product build directory.
     
@@ -405,6 +656,11 @@ def compile_product(sat, p_name_info, config, options, logger, header, len_end):
                           and logging
     :param header Str: the header to display when logging
     :param len_end Int: the lenght of the the end of line (used in display)
+    :param fingerprints Fingerprints: The fingerprints of the products, the
+                                      fingerprint of the product is stored
+                                      if it is given (incremental mode)
+    :param build_cache BuildCache: The build cache, shared by the products
+                                   (their keys are computed once)
     :return: 1 if it fails, else 0.
     :rtype: int
     '''
@@ -418,9 +674,24 @@ def compile_product(sat, p_name_info, config, options, logger, header, len_end):
     # build_sources : script    -> script executions
     res = 0
 
-    
+    # restore the installation from the build cache, if it is stored
+    if build_cache is not None and \
+       not src.buildCache.is_cacheable(config, p_info):
+        build_cache = None
+    restored = False
+    if build_cache is not None:
+        t0 = time.time()
+        restored = build_cache.restore(config, p_info, logger)
+        if restored:
+            add_step_result(config, logger, p_name, "BUILD CACHE", 0,
+                            time.time() - t0)
+
+    if restored:
+        log_step(logger, header, "BUILD CACHE")
+        len_end_line = len_end
+        error_step = ""
     # check if pip should be used : the application and product have pip property
-    if (src.appli_test_property(config,"pip", "yes") and 
+    elif (src.appli_test_property(config,"pip", "yes") and 
        src.product.product_test_property(p_info,"pip", "yes")):
             res, len_end_line, error_step = compile_product_pip(sat,
                                                                 p_name_info,
@@ -467,14 +738,23 @@ def compile_product(sat, p_name_info, config, options, logger, header, len_end):
         if src_sha1:
             p_info.git_tag_description=src_sha1
         src.product.add_compile_config_file(p_info, config)
+        src.product.set_installation_status(config, p_info, True)
+        if fingerprints is not None:
+            fingerprints.write_fingerprint(p_info)
+        if build_cache is not None and not restored:
+            build_cache.store(config, p_info, logger)
         
-        if options.check:
+        # the build directory of a restored product is empty
+        if options.check and not restored:
             # Do the unit tests (call the check command)
             log_step(logger, header, "CHECK")
+            t0 = time.time()
             res_check = sat.check(
                               config.VARS.application + " --products " + p_name,
                               verbose = 0,
                               logger_add_link = logger)
+            add_step_result(config, logger, p_name, "CHECK", res_check,
+                            time.time() - t0)
             if res_check != 0:
                 error_step = "CHECK"
                 
@@ -572,12 +852,16 @@ def compile_product_pip(sat,
     len_end_line = len_end + 3
     error_step = ""
 
-    res_pip = (subprocess.call(pip_install_cmd, 
+    t0 = time.time()
+    res_pip, max_rss = src.compilation.call_with_rusage(pip_install_cmd, 
                                shell=True, 
                                cwd=config.LOCAL.workdir,
                                env=build_environ.environ.environ,
                                stdout=logger.logTxtFile, 
-                               stderr=subprocess.STDOUT) == 0)        
+                               stderr=subprocess.STDOUT)
+    add_step_result(config, logger, p_name, "PIP", res_pip, time.time() - t0,
+                    max_rss)
+    res_pip = (res_pip == 0)
     if res_pip:
         res=0
     else:
@@ -590,6 +874,139 @@ def compile_product_pip(sat,
 
 
 
+def open_product_log(logger, p_name):
+    '''Redirect the outputs of the build commands of a product (cmake, make,
+       ...) to its own log file, in the OUT directory of the compile log.
+
+    :param logger Logger: The logger instance of the compile command
+    :param p_name str: The product name
+    :return: The previous (txt file, txt file path) of the logger,
+             to give to close_product_log
+    :rtype: tuple
+    '''
+    previous = (logger.logTxtFile, logger.txtFilePath)
+    if logger.logTxtFile == sys.__stdout__: # all in terminal
+        return previous
+    txt_path = "%s_%s.txt" % (logger.txtFilePath[:-len(".txt")], p_name)
+    logger.logTxtFile = open(txt_path, "w")
+    logger.txtFilePath = txt_path
+    if txt_path not in logger.l_logFiles:
+        logger.l_logFiles.append(txt_path)
+    return previous
+
+def close_product_log(logger, previous):
+    '''Restore the log file of the compile command.
+
+    :param logger Logger: The logger instance of the compile command
+    :param previous tuple: The value returned by open_product_log
+    '''
+    if logger.logTxtFile != previous[0]:
+        logger.logTxtFile.close()
+    logger.logTxtFile, logger.txtFilePath = previous
+
+def add_step_result(config, logger, p_name, step, res, duration, max_rss=0,
+                    history=True, log_file=None):
+    '''Record the result of a build step of a product in the xml log
+       of the compile command, and in the compile history of the application.
+
+    :param config Config: The global configuration
+    :param logger Logger: The logger instance of the compile command
+    :param p_name str: The product name
+    :param step str: The step (CMAKE, MAKE, ...)
+    :param res int: The result of the step, 0 if it is OK
+    :param duration float: The duration of the step, in seconds
+    :param max_rss int: The peak memory of the processes of the step, in KB,
+                        0 if it is unknown
+    :param history boolean: If False, the step is not added in the history
+    :param log_file str: The log file of the step, by default the current
+                         log file of the logger
+    '''
+    if log_file is None:
+        log_file = logger.txtFilePath
+    xml_steps = logger.xmlFile.xmlroot.find("Steps")
+    if xml_steps is None:
+        xml_steps = logger.xmlFile.add_simple_node("Steps")
+    src.xmlManager.add_simple_node(xml_steps, "step",
+                                   text=os.path.join("OUT",
+                                             os.path.basename(log_file)),
+                                   attrib={"product" : p_name,
+                                           "step" : step,
+                                           "passed" : str(res),
+                                           "time" : "%.1f" % duration,
+                                           "max_rss" : str(max_rss)})
+    if history:
+        src.compileHistory.add_record(config, p_name, step, res, duration,
+                                      max_rss)
+
+def add_compiler_cache_result(logger, p_name, stats):
+    '''Record the hits and misses of the compiler cache for a product
+       in the xml log of the compile command.
+
+    :param logger Logger: The logger instance of the compile command
+    :param p_name str: The product name
+    :param stats tuple: (hits, misses), None if the cache is not used
+    '''
+    if stats is None:
+        return
+    xml_cache = logger.xmlFile.xmlroot.find("CompilerCache")
+    if xml_cache is None:
+        xml_cache = logger.xmlFile.add_simple_node("CompilerCache")
+    src.xmlManager.add_simple_node(xml_cache, "product",
+                                   attrib={"name" : p_name,
+                                           "hits" : str(stats[0]),
+                                           "misses" : str(stats[1])})
+
+def get_compiler_cache_results(logger, p_name=None):
+    '''Get the hits and misses of the compiler cache recorded in the xml
+       log of the compile command.
+
+    :param logger Logger: The logger instance of the compile command
+    :param p_name str: The product name, None for all the products
+    :return: (hits, misses), None if the cache was not used
+    :rtype: tuple
+    '''
+    xml_cache = logger.xmlFile.xmlroot.find("CompilerCache")
+    if xml_cache is None:
+        return None
+    res = None
+    for node in xml_cache.findall("product"):
+        if p_name is not None and node.attrib["name"] != p_name:
+            continue
+        if res is None:
+            res = (0, 0)
+        res = (res[0] + int(node.attrib["hits"]),
+               res[1] + int(node.attrib["misses"]))
+    return res
+
+def format_compiler_cache_results(stats):
+    hits, misses = stats
+    rate = 100. * hits / (hits + misses) if hits + misses else 0.
+    return _("%(hits)d hits, %(misses)d misses (%(rate).0f%%)") % {
+             "hits" : hits, "misses" : misses, "rate" : rate}
+
+def run_build_step(logger, builder, step, function, *args):
+    '''Call a build function of the Builder of a product, and record
+       its result, its duration and its peak memory.
+
+    :param logger Logger: The logger instance of the compile command
+    :param builder Builder: The builder of the product
+    :param step str: The step, for the log
+    :param function: The method of the Builder to call, with args
+    :return: The result of the function, 0 if it is OK
+    :rtype: int
+    '''
+    logger.logTxtFile.write("\n==== %s \n" % step)
+    t0 = time.time()
+    builder.max_rss = 0
+    try:
+        res = function(*args)
+    except src.SatException as e:
+        logger.logTxtFile.write("%s\n" % str(e))
+        res = 1
+    add_step_result(builder.config, logger, builder.product_name, step, res,
+                    time.time() - t0, builder.max_rss)
+    return res
+
 def compile_product_cmake_autotools(sat,
                                     p_name_info,
                                     config,
@@ -599,6 +1016,8 @@ def compile_product_cmake_autotools(sat,
                                     len_end):
     '''Execute the proper build procedure for autotools or cmake
        in the product build directory.
+       The steps share the build environment of the product, and 
+       their outputs are written in the log file of the product.
     
     :param p_name_info tuple: (str, Config) => (product_name, product_info)
     :param config Config: The global configuration
@@ -611,23 +1030,33 @@ def compile_product_cmake_autotools(sat,
     '''
     p_name, p_info = p_name_info
     
-    # Execute "sat configure", "sat make" and "sat install"
     res = 0
     error_step = ""
-    
-    # Logging and sat command call for configure step
     len_end_line = len_end
-    log_step(logger, header, "CONFIGURE")
-    res_c = sat.configure(config.VARS.application + " --products " + p_name,
-                          verbose = 0,
-                          logger_add_link = logger)
-    log_res_step(logger, res_c)
-    res += res_c
-    
-    if res_c > 0:
-        error_step = "CONFIGURE"
-    else:
-        # Logging and sat command call for make step
+    previous_log = open_product_log(logger, p_name)
+    builder = None
+    try:
+        # Instantiate the class that manages all the construction commands
+        # and prepare the build environment, once for all the steps
+        builder = src.compilation.Builder(config, logger, p_name, p_info,
+                                          jobserver=options.jobserver)
+        log_step(logger, header, "CONFIGURE")
+        res = run_build_step(logger, builder, "PREPARE ENV", builder.prepare)
+
+        # Execute buildconfigure, configure if the product is autotools
+        # Execute cmake if the product is cmake
+        if res == 0 and src.product.product_is_autotools(p_info):
+            res = run_build_step(logger, builder, "BUILDCONFIGURE",
+                                 builder.build_configure)
+            if res == 0:
+                res = run_build_step(logger, builder, "CONFIGURE",
+                                     builder.configure)
+        if res == 0 and src.product.product_is_cmake(p_info):
+            res = run_build_step(logger, builder, "CMAKE", builder.cmake)
+        log_res_step(logger, res)
+        if res > 0:
+            return res, len_end_line, "CONFIGURE"
+
         # Logging take account of the fact that the product has a compilation 
         # script or not
         if src.product.product_has_script(p_info):
@@ -639,32 +1068,39 @@ def compile_product_cmake_autotools(sat,
             len_end_line = len(scrit_path_display)
         else:
             log_step(logger, header, "MAKE")
-        make_arguments = config.VARS.application + " --products " + p_name
         # Get the make_flags option if there is any
+        make_option = ""
         if options.makeflags:
-            make_arguments += " --option -j" + options.makeflags
-        res_m = sat.make(make_arguments,
-                         verbose = 0,
-                         logger_add_link = logger)
-        log_res_step(logger, res_m)
-        res += res_m
-        
-        if res_m > 0:
-            error_step = "MAKE"
-        else: 
-            # Logging and sat command call for make install step
-            log_step(logger, header, "MAKE INSTALL")
-            res_mi = sat.makeinstall(config.VARS.application + 
-                                     " --products " + 
-                                     p_name,
-                                    verbose = 0,
-                                    logger_add_link = logger)
-
-            log_res_step(logger, res_mi)
-            res += res_mi
-            
-            if res_mi > 0:
-                error_step = "MAKE INSTALL"
+            make_option = "-j" + options.makeflags
+        nb_proc, make_opt_without_j = src.compilation.get_nb_proc(
+                                                    p_info, config, make_option)
+        if src.architecture.is_windows():
+            res = run_build_step(logger, builder, "MAKE",
+                                 builder.wmake, nb_proc, make_opt_without_j)
+        else:
+            res = run_build_step(logger, builder, "MAKE",
+                                 builder.make, nb_proc, make_opt_without_j)
+        log_res_step(logger, res)
+        if res > 0:
+            return res, len_end_line, "MAKE"
+
+        # the make install step
+        log_step(logger, header, "MAKE INSTALL")
+        if not src.product.product_has_script(p_info):
+            res = run_build_step(logger, builder, "MAKE INSTALL",
+                                 builder.install)
+        if res == 0 and src.product.product_has_post_script(p_info):
+            # the product has a post install script we run
+            res = run_build_step(logger, builder, "POST SCRIPT",
+                                 builder.do_script_build, p_info.post_script)
+        log_res_step(logger, res)
+        if res > 0:
+            error_step = "MAKE INSTALL"
+    finally:
+        if builder is not None:
+            add_compiler_cache_result(logger, p_name,
+                                      builder.get_compiler_cache_stats())
+        close_product_log(logger, previous_log)
                 
     return res, len_end_line, error_step 
 
@@ -688,20 +1124,98 @@ def compile_product_script(sat,
     '''
     p_name, p_info = p_name_info
     
-    # Execute "sat configure", "sat make" and "sat install"
     error_step = ""
     
-    # Logging and sat command call for the script step
+    # Logging and call of the builder for the script step
     scrit_path_display = src.printcolors.printcLabel(p_info.compil_script)
     log_step(logger, header, "SCRIPT " + scrit_path_display)
     len_end_line = len_end + len(scrit_path_display)
-    res = sat.script(config.VARS.application + " --products " + p_name,
-                     verbose = 0,
-                     logger_add_link = logger)
+    if not os.path.isfile(p_info.compil_script):
+        msg_err="\n\nError : The compilation script file do not exists!"+\
+                "\n        It was not found by sat!"+\
+                "\n        Please check your salomeTool configuration\n"
+        logger.error(msg_err)
+        return 1, len_end_line, "SCRIPT"
+
+    previous_log = open_product_log(logger, p_name)
+    builder = None
+    try:
+        builder = src.compilation.Builder(config, logger, p_name, p_info,
+                                          jobserver=options.jobserver)
+        res = run_build_step(logger, builder, "PREPARE ENV", builder.prepare)
+        if res == 0:
+            res = run_build_step(logger, builder, "SCRIPT",
+                                 builder.do_script_build, p_info.compil_script)
+        if res == 0 and src.product.product_has_post_script(p_info):
+            # the product has a post install script we run
+            res = run_build_step(logger, builder, "POST SCRIPT",
+                                 builder.do_script_build, p_info.post_script)
+    finally:
+        if builder is not None:
+            add_compiler_cache_result(logger, p_name,
+                                      builder.get_compiler_cache_stats())
+        close_product_log(logger, previous_log)
     log_res_step(logger, res)
               
     return res, len_end_line, error_step 
 
+def show_report(config, products_infos, logger):
+    '''Display the slowest products and the critical path of the
+       compilation, from the compile history of the application.
+
+    :param config Config: The global configuration
+    :param products_infos list: List of (product_name, product_info),
+                                in the topological order, with depend_all
+    :param logger Logger: The logger instance to use for the display
+    :return: 1 if no product compilation was recorded, else 0.
+    :rtype: int
+    '''
+    history = src.compileHistory.get_last_builds(
+                                   src.compileHistory.read_history(config))
+    builds = {}
+    for p_name, p_info in products_infos:
+        if p_name in history:
+            builds[p_name] = history[p_name]
+    if not builds:
+        msg = _("No compilation of the products in %s") % \
+              src.compileHistory.get_history_file(config)
+        logger.write(src.printcolors.printcWarning(msg) + "\n", 1)
+        return 1
+
+    def write_product(p_name, build):
+        step, step_time = max(build["steps"], key=lambda s: s[1])
+        logger.write("  %s %s %8.1fs  %-22s %8s  %s %s\n" % (
+                     src.printcolors.printcLabel(p_name),
+                     "." * (30 - len(p_name)),
+                     build["time"],
+                     "%s %.1fs" % (step, step_time),
+                     ("%.0f MB" % (build["max_rss"] / 1024.)
+                      if build["max_rss"] else "-"),
+                     build["date"],
+                     "" if build["passed"] == 0 else
+                     src.printcolors.printcError("KO")), 1)
+
+    logger.write(_("Slowest products (total, slowest step, peak memory, "
+                   "date of the compilation):\n"), 1)
+    slowest = sorted(builds, key=lambda p_name: builds[p_name]["time"],
+                     reverse=True)
+    for p_name in slowest[:NB_REPORTED_PRODUCTS]:
+        write_product(p_name, builds[p_name])
+
+    total, path = src.compileHistory.get_critical_path(products_infos, builds)
+    logger.write(_("\nCritical path: %(path).1fs (sum of the products: "
+                   "%(sum).1fs)\n") % {
+                 "path" : total,
+                 "sum" : sum([b["time"] for b in builds.values()])}, 1)
+    for p_name in path:
+        if p_name in builds:
+            write_product(p_name, builds[p_name])
+        else:
+            logger.write("  %s %s %8s\n" % (src.printcolors.printcLabel(p_name),
+                                            "." * (30 - len(p_name)),
+                                            _("not compiled")), 1)
+    return 0
+
     
 def description():
     '''method that is called when salomeTools is called with --help option.
@@ -719,6 +1233,13 @@ def run(args, runner, logger):
     # Parse the options
     (options, args) = parser.parse_args(args)
 
+    if options.jobs is not None and options.jobs < 1:
+        msg = _("Error: the number of processors of --jobs must be at "
+                "least 1 (%d given)") % options.jobs
+        logger.write(src.printcolors.printcError(msg), 1)
+        logger.write("\n", 1)
+        return 1
+
     # Warn the user if he invoked the clean_all option 
     # without --products option
     if (options.clean_all and 
@@ -731,6 +1252,8 @@ def run(args, runner, logger):
         
     if options.update and (options.clean_all or options.force or options.clean_install):
         options.update=False  # update is useless in this case
+    if options.incremental and (options.clean_all or options.force or options.clean_install):
+        options.incremental=False  # incremental is useless in this case
 
     # check that the command has been called with an application
     src.check_config_has_application( runner.cfg )
@@ -755,9 +1278,10 @@ def run(args, runner, logger):
     # Get the list of all application products, and create its dependency graph
     all_products_infos = src.product.get_products_infos(runner.cfg.APPLICATION.products,
                                                         runner.cfg)
-    all_products_graph=get_dependencies_graph(all_products_infos)
+    all_products_graph = src.product.get_products_graph(runner.cfg)
     #logger.write("Dependency graph of all application products : %s\n" % all_products_graph, 6)
-    DBG.write("Dependency graph of all application products : ", all_products_graph)
+    DBG.write("Dependency graph of all application products : ",
+              all_products_graph.get_graph_dict())
 
     # Get the list of products we have to compile
     products_infos = src.product.get_products_list(options, runner.cfg, logger)
@@ -766,33 +1290,19 @@ def run(args, runner, logger):
     logger.write("Product we have to compile (as specified by user) : %s\n" % products_list, 5)
     if options.fathers:
         # Extend the list with all recursive dependencies of the given products
-        visited=[]
-        for p_name in products_list:
-            visited=depth_search_graph(all_products_graph, p_name, visited)
-        products_list = visited
+        products_list = all_products_graph.depth_search(products_list)
 
     logger.write("Product list to compile with fathers : %s\n" % products_list, 5)
     if options.children:
         # Extend the list with all products that depends upon the given products
-        children=[]
-        for n in all_products_graph:
-            # for all products (that are not in products_list):
-            # if we we find a path from the product to the product list,
-            # then we product is a child and we add it to the children list 
-            if (n not in children) and (n not in products_list):
-                if find_path_graph(all_products_graph, n, products_list):
-                    children = children + [n]
+        children = all_products_graph.get_all_dependants(products_list)
         # complete products_list (the products we have to compile) with the list of children
         products_list = products_list + children
         logger.write("Product list to compile with children : %s\n" % products_list, 5)
 
     # Sort the list of all products (topological sort).
     # the products listed first do not depend upon products listed after
-    visited_nodes=[]
-    sorted_nodes=[]
-    for n in all_products_graph:
-        if n not in visited_nodes:
-            visited_nodes,sorted_nodes=depth_first_topo_graph(all_products_graph, n, visited_nodes,sorted_nodes)
+    sorted_nodes = all_products_graph.topological_sort()
     logger.write("Complete dependency graph topological search (sorting): %s\n" % sorted_nodes, 6)
 
     #  Create a dict of all products to facilitate products_infos sorting
@@ -819,17 +1329,53 @@ def run(args, runner, logger):
     # for all products to compile, store in "depend_all" field the complete dependencies (recursive) 
     # (will be used by check_dependencies function)
     for pi in products_infos:
-        dep_prod=[]
-        dep_prod=depth_search_graph(all_products_graph,pi[0], dep_prod)
-        pi[1]["depend_all"]=dep_prod[1:]
-        
+        pi[1]["depend_all"] = all_products_graph.get_all_dependencies(pi[0])
+    # the product configurations completed with depend_all are still valid
+    src.product.update_product_config_cache(runner.cfg)
+
+
+    if options.report:
+        return show_report(runner.cfg, products_infos, logger)
+
+    # Replace the jobserver option by the jobserver given to the builders
+    if options.jobserver and not src.jobserver.is_available():
+        logger.write(src.printcolors.printcWarning(
+                      _("The jobserver is not available on this platform")) +
+                     "\n", 1)
+        options.jobserver = None
+    elif options.jobserver:
+        nb_jobs = runner.cfg.VARS.nb_proc
+        if options.jobs:
+            nb_jobs = options.jobs
+        elif options.makeflags:
+            # make_flags is given to make after -j
+            nb_jobs = (src.compilation.get_make_jobs("-j" + options.makeflags)
+                       or nb_jobs)
+        options.jobserver = src.jobserver.JobServer(
+                        src.jobserver.get_fifo_path(runner.cfg), nb_jobs)
+        options.jobserver.open()
+        logger.write(_("Jobserver %(path)s (%(status)s)\n\n") % {
+                     "path" : options.jobserver.fifo_path,
+                     "status" : (_("created with %d jobs") % nb_jobs
+                                 if options.jobserver.hosted
+                                 else _("shared"))}, 3)
+    else:
+        options.jobserver = None
 
     # Call the function that will loop over all the products and execute
     # the right command(s)
-    res = compile_all_products(runner, runner.cfg, options, products_infos, all_products_dict, all_products_graph, logger)
+    try:
+        res = compile_all_products(runner, runner.cfg, options, products_infos, all_products_dict, all_products_graph, logger)
+    finally:
+        if options.jobserver is not None:
+            options.jobserver.close()
     
     # Print the final state
     nb_products = len(products_infos)
+    cache_stats = get_compiler_cache_results(logger)
+    if cache_stats is not None:
+        logger.write(_("\nCompiler cache: %s\n") %
+                     format_compiler_cache_results(cache_stats), 1)
     if res == 0:
         final_status = "OK"
     else:
@@ -22,6 +22,9 @@ import platform
 import datetime
 import shutil
 import gettext
+import hashlib
+import pickle
+import multiprocessing
 import pprint as PP
 
 import src
@@ -87,12 +90,15 @@ class ConfigOpener:
     '''Class that helps to find an application pyconf 
        in all the possible directories (pathList)
     '''
-    def __init__(self, pathList):
+    def __init__(self, pathList, read_files=None):
         '''Initialization
         
         :param pathList list: The list of paths where to search a pyconf.
+        :param read_files list: If not None, the list where to record
+                                the paths of the opened pyconf.
         '''
         self.pathList = pathList
+        self.read_files = read_files
         if verbose:
           for path in pathList:
             if not os.path.isdir(path):
@@ -100,10 +106,13 @@ class ConfigOpener:
 
     def __call__(self, name):
         if os.path.isabs(name):
-            return src.pyconf.ConfigInputStream(open(name, 'rb'))
+            path = name
         else:
-            return src.pyconf.ConfigInputStream(open(osJoin(self.get_path(name), name), 'rb'))
-        raise IOError(_("Configuration file '%s' not found") % name)
+            path = osJoin(self.get_path(name), name)
+        stream = src.pyconf.ConfigInputStream(open(path, 'rb'))
+        if self.read_files is not None:
+            self.read_files.append(path)
+        return stream
 
     def get_path( self, name ):
         '''The method that returns the entire path of the pyconf searched
@@ -111,16 +120,174 @@ class ConfigOpener:
 
         :param name str: The name of the searched pyconf.
         '''
+        if os.path.basename(name) == name:
+            # use the index of the directories (see src.pathIndex)
+            path_index = src.pathIndex.get_path_index()
+            for path in self.pathList:
+                if path_index.find_file(name, [path]):
+                    return path
         for path in self.pathList:
             if os.path.exists(osJoin(path, name)):
                 return path
         raise IOError(_("Configuration file '%s' not found") % name)
 
+class ProductConfigLoader:
+    '''Class that reads the pyconf of a product, used to read it
+       only when the product is accessed in the PRODUCTS section
+       (see src.pyconf.DeferredConfig)
+    '''
+    def __init__(self, product_name, product_file_path, products_dir, opener):
+        '''Initialization
+
+        :param product_name str: The name of the product.
+        :param product_file_path str: The path of the product pyconf.
+        :param products_dir str: The directory of the product pyconf (PWD).
+        :param opener ConfigOpener: The opener of the pyconf included
+                                    in the product pyconf.
+        '''
+        self.product_name = product_name
+        self.product_file_path = product_file_path
+        self.products_dir = products_dir
+        self.opener = opener
+
+    def __repr__(self):
+        return "ProductConfigLoader(%s)" % self.product_file_path
+
+    def __call__(self):
+        '''Read the product pyconf.
+
+        :return: The product config, or None if the file is not valid.
+        :rtype: class 'src.pyconf.Config'
+        '''
+        try:
+            return self.read()
+        except Exception as e:
+            sys.stdout.write(self.get_error_message(e))
+            return None
+
+    def read(self):
+        '''Read the product pyconf, raise an exception if it is not valid.
+
+        :return: The product config.
+        :rtype: class 'src.pyconf.Config'
+        '''
+        opener_save = src.pyconf.streamOpener
+        src.pyconf.streamOpener = self.opener
+        try:
+            prod_cfg = src.pyconf.Config(open(self.product_file_path),
+                                         PWD=("", self.products_dir))
+            prod_cfg.from_file = self.product_file_path
+            return prod_cfg
+        finally:
+            src.pyconf.streamOpener = opener_save
+
+    def get_error_message(self, error):
+        '''Get the warning given when the product pyconf is not valid.
+
+        :param error Exception: The exception raised when reading the pyconf.
+        :return: The message.
+        :rtype: str
+        '''
+        return _("WARNING: Error in configuration file"
+                 ": %(prod)s\n  %(error)s" % \
+                 {'prod' :  self.product_name, 'error': str(error) })
+
+def read_product_config(task):
+    '''Read a product pyconf in a process of the pool
+       (see load_product_configs).
+
+    :param task tuple: The product name, the path of its pyconf, the
+                       directory of the pyconf and the PRODUCTPATH.
+    :return: The product config (or None if it is not valid), the list of
+             the read pyconf files and the warning message (or None).
+    :rtype: tuple
+    '''
+    product_name, product_file_path, products_dir, path_list = task
+    read_files = [product_file_path]
+    loader = ProductConfigLoader(product_name,
+                                 product_file_path,
+                                 products_dir,
+                                 ConfigOpener(path_list, read_files))
+    try:
+        return loader.read(), read_files, None
+    except Exception as e:
+        return None, read_files, loader.get_error_message(e)
+
+def load_product_configs(cfg, nb_jobs):
+    '''Read in a pool of processes all the product pyconf of the PRODUCTS
+       section that are not read yet. The configs are sent back pickled
+       and set in the application order. Nothing is done if the pool
+       cannot be used, the products are then read on first access.
+
+    :param cfg class 'src.pyconf.Config': The global config.
+    :param nb_jobs int: The number of processes.
+    :return: The list of the read pyconf files.
+    :rtype: list
+    '''
+    if "PRODUCTS" not in cfg:
+        return []
+    data = object.__getattribute__(cfg.PRODUCTS, 'data')
+    l_deferred = []
+    l_tasks = []
+    for product_name in data:
+        value = data[product_name]
+        if (not isinstance(value, src.pyconf.DeferredConfig) or
+                value.loaded or
+                not isinstance(value.loader, ProductConfigLoader)):
+            continue
+        loader = value.loader
+        l_deferred.append(value)
+        l_tasks.append((product_name,
+                        loader.product_file_path,
+                        loader.products_dir,
+                        [str(path) for path in loader.opener.pathList]))
+    if len(l_tasks) < 2:
+        return []
+
+    try:
+        pool = multiprocessing.Pool(min(nb_jobs, len(l_tasks)))
+        try:
+            chunksize = max(1, len(l_tasks) // (4 * nb_jobs))
+            l_results = pool.map(read_product_config, l_tasks, chunksize)
+        finally:
+            pool.close()
+            pool.join()
+    except Exception as e:
+        DBG.write("cannot read the product pyconf in parallel", str(e))
+        return []
+
+    read_files = []
+    for task, deferred, result in zip(l_tasks, l_deferred, l_results):
+        prod_cfg, prod_files, msg = result
+        read_files += prod_files
+        if msg is not None:
+            # as for a product without pyconf
+            sys.stdout.write(msg)
+            cfg.PRODUCTS.__delitem__(task[0])
+            continue
+        deferred.value = prod_cfg
+        deferred.loaded = True
+    return read_files
+
 class ConfigManager:
     '''Class that manages the read of all the configuration files of salomeTools
     '''
     def __init__(self, datadir=None):
-        pass
+        # the pyconf files read by get_config, for the config cache
+        self.read_files = []
+        # "hit", "miss" or "disabled", see get_config
+        self.cache_status = "disabled"
+
+    def _open(self, path):
+        '''Open a pyconf file and record it in the files read.
+
+        :param path str: The path of the pyconf file.
+        :return: The opened file.
+        :rtype: file
+        '''
+        res = open(path)
+        self.read_files.append(path)
+        return res
 
     def _create_vars(self, application=None, command=None, datadir=None):
         '''Create a dictionary that stores all information about machine,
@@ -263,13 +430,14 @@ class ConfigManager:
         # Load INTERNAL config
         # read src/internal_config/salomeTools.pyconf
         src.pyconf.streamOpener = ConfigOpener([
-                             osJoin(cfg.VARS.srcDir, 'internal_config')])
+                             osJoin(cfg.VARS.srcDir, 'internal_config')],
+                             self.read_files)
         try:
             if src.architecture.is_windows(): # special internal config for windows
-                internal_cfg = src.pyconf.Config(open( osJoin(cfg.VARS.srcDir,
+                internal_cfg = src.pyconf.Config(self._open( osJoin(cfg.VARS.srcDir,
                                         'internal_config', 'salomeTools_win.pyconf')))
             else:
-                internal_cfg = src.pyconf.Config(open( osJoin(cfg.VARS.srcDir,
+                internal_cfg = src.pyconf.Config(self._open( osJoin(cfg.VARS.srcDir,
                                         'internal_config', 'salomeTools.pyconf')))
         except src.pyconf.ConfigError as e:
             raise src.SatException(_("Error in configuration file:"
@@ -285,9 +453,10 @@ class ConfigManager:
         # =====================================================================
         # Load LOCAL config file
         # search only in the data directory
-        src.pyconf.streamOpener = ConfigOpener([cfg.VARS.datadir])
+        src.pyconf.streamOpener = ConfigOpener([cfg.VARS.datadir],
+                                               self.read_files)
         try:
-            local_cfg = src.pyconf.Config(open( osJoin(cfg.VARS.datadir,
+            local_cfg = src.pyconf.Config(self._open( osJoin(cfg.VARS.datadir,
                                                            'local.pyconf')),
                                          PWD = ('LOCAL', cfg.VARS.datadir) )
         except src.pyconf.ConfigError as e:
@@ -313,7 +482,8 @@ class ConfigManager:
         # if the sat tag was not set permanently by user
         if cfg.LOCAL.tag == "unknown":
             # get the tag with git, and store it
-            sat_version=src.system.git_describe(cfg.VARS.salometoolsway) 
+            sat_version=src.system.git_describe(cfg.VARS.salometoolsway,
+                                    self.get_git_describe_cache_file(cfg, options))
             if sat_version == False:
                 sat_version=cfg.INTERNAL.sat_version
             cfg.LOCAL.tag=sat_version
@@ -322,6 +492,22 @@ class ConfigManager:
         # apply overwrite from command line if needed
         for rule in self.get_command_line_overrides(options, ["LOCAL"]):
             exec('cfg.' + rule) # this cannot be factorized because of the exec
+
+        # =====================================================================
+        # Use the cached merged config if none of the pyconf files changed
+        config_cache = None
+        if self.use_config_cache(application, options):
+            config_cache = ConfigCache(cfg, application, options)
+            # the index of the PATHS directories is saved next to it
+            src.pathIndex.get_path_index().set_cache_file(
+                os.path.join(config_cache.cache_dir, "path_index.pickle"))
+            cached_cfg = config_cache.load()
+            if cached_cfg is not None:
+                self.cache_status = "hit"
+                cfg = self.refresh_cached_config(cached_cfg, var, options)
+                self.load_products(cfg, options)
+                return cfg
+            self.cache_status = "miss"
         
         # =====================================================================
         # Load the PROJECTS
@@ -347,7 +533,7 @@ class ConfigManager:
                                     project_pyconf_path)[:-len(".pyconf")]
             try:
                 project_pyconf_dir = os.path.dirname(project_pyconf_path)
-                project_cfg = src.pyconf.Config(open(project_pyconf_path),
+                project_cfg = src.pyconf.Config(self._open(project_pyconf_path),
                                                 PWD=("", project_pyconf_dir))
             except Exception as e:
                 msg = _("ERROR: Error in configuration file: "
@@ -362,7 +548,9 @@ class ConfigManager:
             projects_cfg.PROJECTS.projects[project_name]["file_path"] = \
                                                         project_pyconf_path
             # store the project tag if any
-            product_project_git_tag = src.system.git_describe(os.path.dirname(project_pyconf_path))
+            product_project_git_tag = src.system.git_describe(
+                                    os.path.dirname(project_pyconf_path),
+                                    self.get_git_describe_cache_file(cfg, options))
             if product_project_git_tag:
                 projects_cfg.PROJECTS.projects[project_name]["git_tag"] = product_project_git_tag
             else:
@@ -427,7 +615,7 @@ class ConfigManager:
         if application is not None:
             # search APPLICATION file in all directories in configPath
             cp = cfg.PATHS.APPLICATIONPATH
-            src.pyconf.streamOpener = ConfigOpener(cp)
+            src.pyconf.streamOpener = ConfigOpener(cp, self.read_files)
             do_merge = True
             try:
                 application_cfg = src.pyconf.Config(application + '.pyconf')
@@ -474,7 +662,8 @@ class ConfigManager:
                                 src.pyconf.Mapping(products_cfg),
                                 "The products\n")
         if application is not None:
-            src.pyconf.streamOpener = ConfigOpener(cfg.PATHS.PRODUCTPATH)
+            src.pyconf.streamOpener = ConfigOpener(cfg.PATHS.PRODUCTPATH,
+                                                   self.read_files)
             for product_name in application_cfg.APPLICATION.products.keys():
                 # Loop on all files that are in softsDir directory
                 # and read their config
@@ -486,17 +675,13 @@ class ConfigManager:
                     if not os.path.isabs(products_dir):
                         products_dir = os.path.join(cfg.VARS.salometoolsway,
                                                     products_dir)
-                    try:
-                        prod_cfg = src.pyconf.Config(open(product_file_path),
-                                                     PWD=("", products_dir))
-                        prod_cfg.from_file = product_file_path
-                        products_cfg.PRODUCTS[product_name] = prod_cfg
-                    except Exception as e:
-                        msg = _(
-                            "WARNING: Error in configuration file"
-                            ": %(prod)s\n  %(error)s" % \
-                            {'prod' :  product_name, 'error': str(e) })
-                        sys.stdout.write(msg)
+                    # the product pyconf is read on first access
+                    loader = ProductConfigLoader(product_name,
+                                                 product_file_path,
+                                                 products_dir,
+                                                 src.pyconf.streamOpener)
+                    products_cfg.PRODUCTS[product_name] = \
+                                            src.pyconf.DeferredConfig(loader)
             
             merger.merge(cfg, products_cfg)
             
@@ -522,7 +707,7 @@ class ConfigManager:
         # load USER config
         self.set_user_config_file(cfg)
         user_cfg_file = self.get_user_config_file()
-        user_cfg = src.pyconf.Config(open(user_cfg_file))
+        user_cfg = src.pyconf.Config(self._open(user_cfg_file))
         merger.merge(cfg, user_cfg)
 
         # apply overwrite from command line if needed
@@ -535,6 +720,75 @@ class ConfigManager:
                 cfg.APPLICATION.products.__delitem__(prod_to_remove)
             # remove rm_products section after usage
             cfg.APPLICATION.__delitem__("rm_products")
+
+        # read the product pyconf in parallel if asked
+        self.load_products(cfg, options)
+
+        # store the merged config for the next calls
+        if config_cache is not None and do_merge:
+            config_cache.save(cfg, self.read_files)
+        return cfg
+
+    def use_config_cache(self, application, options):
+        '''Check if the on disk cache of the merged config has to be used.
+           It is only used for an application, unless the --no-config-cache
+           option is given.
+
+        :param application str: The application for which salomeTools is called.
+        :param options class Options: The general salomeToos options
+        :return: True if the cache has to be used.
+        :rtype: bool
+        '''
+        if application is None or options is None:
+            return False
+        return not getattr(options, "no_config_cache", False)
+
+    def get_git_describe_cache_file(self, cfg, options):
+        '''Get the file where the results of src.system.git_describe are
+           saved, next to the cache of the merged config.
+
+        :param cfg class 'src.pyconf.Config': The global config.
+        :param options class Options: The general salomeToos options
+        :return: The path of the file, or None if the cache is not used.
+        :rtype: str
+        '''
+        if getattr(options, "no_config_cache", False):
+            return None
+        return os.path.join(cfg.LOCAL.workdir, ".sat_config_cache",
+                            "git_describe.pickle")
+
+    def load_products(self, cfg, options):
+        '''Read all the product pyconf in a pool of processes if the
+           --config-jobs option is given (useful for the commands that
+           use all the products, as package or jobs).
+
+        :param cfg class 'src.pyconf.Config': The global config.
+        :param options class Options: The general salomeToos options
+        '''
+        nb_jobs = getattr(options, "config_jobs", None)
+        if nb_jobs is None or nb_jobs <= 1:
+            return
+        self.read_files += load_product_configs(cfg, nb_jobs)
+
+    def refresh_cached_config(self, cfg, var, options):
+        '''Update a config read from the cache with the VARS of the
+           current call (command, date, ...).
+
+        :param cfg class 'src.pyconf.Config': The config read from the cache.
+        :param var dict: The VARS of the current call (see _create_vars).
+        :param options class Options: The general salomeToos options
+        :return: The updated config.
+        :rtype: class 'src.pyconf.Config'
+        '''
+        for variable in var:
+            cfg.VARS[variable] = var[variable]
+
+        # apply overwrite from command line if needed
+        for rule in self.get_command_line_overrides(options, ["VARS"]):
+            exec('cfg.' + rule) # this cannot be factorized because of the exec
+
+        self.set_user_config_file(cfg)
+        src.pyconf.streamOpener = ConfigOpener(cfg.PATHS.PRODUCTPATH)
         return cfg
 
     def set_user_config_file(self, config):
@@ -610,7 +864,258 @@ class ConfigManager:
         if not self.user_config_file_path:
             raise src.SatException(_("Error in get_user_config_file: "
                                      "missing user config file path"))
-        return self.user_config_file_path     
+        return self.user_config_file_path
+
+class ConfigSession:
+    '''Class that keeps the merged configuration of a top level sat command,
+       so that the micro-commands it launches (sat.configure, sat.make, ...)
+       do not read and merge all the pyconf files again.
+       Each micro-command gets its own copy of the configuration,
+       with its own VARS section.
+    '''
+    def __init__(self):
+        '''Initialization
+        '''
+        self.key = None
+        self.pristine_cfg = None
+        self.nb_load = 0
+        self.nb_reuse = 0
+        # where the last config comes from: "session", or the status
+        # of the config cache ("hit", "miss" or "disabled")
+        self.origin = None
+
+    def get_key(self, application, options, datadir):
+        '''Get the key that identifies a configuration in the session.
+
+        :param application str: The application for which salomeTools is called.
+        :param options class Options: The general salomeToos options
+        :param datadir str: The repository that contain external data
+                            for salomeTools.
+        :return: The key
+        :rtype: tuple
+        '''
+        overwrite = ()
+        if options is not None and options.overwrite is not None:
+            overwrite = tuple(options.overwrite)
+        return (application, datadir, overwrite)
+
+    def get_config(self, cfgManager, application=None, options=None,
+                   command=None, datadir=None, nested=False):
+        '''Get the config of a command. A top level command (nested False)
+           loads the configuration from the pyconf files and starts
+           the session, a nested command reuses it when the application
+           and the overwrites are the same.
+
+        :param cfgManager ConfigManager: The manager used to load the config
+        :param application str: The application for which salomeTools is called.
+        :param options class Options: The general salomeToos options
+        :param command str: The command that is called.
+        :param datadir str: The repository that contain external data
+                            for salomeTools.
+        :param nested bool: True if the command is launched by another one.
+        :return: The config of the command.
+        :rtype: class 'src.pyconf.Config'
+        '''
+        key = self.get_key(application, options, datadir)
+        if nested and self.pristine_cfg is not None and key == self.key:
+            self.nb_reuse += 1
+            self.origin = "session"
+            return self.get_view(cfgManager, options, command)
+
+        cfg = cfgManager.get_config(application=application,
+                                    options=options,
+                                    command=command,
+                                    datadir=datadir)
+        self.nb_load += 1
+        self.origin = cfgManager.cache_status
+        if not nested or self.pristine_cfg is None:
+            # keep an untouched copy, the command may modify its config
+            self.key = key
+            self.pristine_cfg = src.pyconf.copyContainer(cfg)
+        return cfg
+
+    def get_view(self, cfgManager, options, command):
+        '''Get a copy of the session config for a nested command.
+           The VARS specific to the command (command name and date) are updated.
+
+        :param cfgManager ConfigManager: The manager used to load the config
+        :param options class Options: The general salomeToos options
+        :param command str: The command that is called.
+        :return: The config of the command.
+        :rtype: class 'src.pyconf.Config'
+        '''
+        cfg = src.pyconf.copyContainer(self.pristine_cfg)
+        dt = datetime.datetime.now()
+        cfg.VARS.date = dt.strftime('%Y%m%d')
+        cfg.VARS.datehour = dt.strftime('%Y%m%d_%H%M%S')
+        cfg.VARS.hour = dt.strftime('%H%M%S')
+        cfg.VARS.command = str(command)
+
+        # apply overwrite from command line if needed
+        for rule in cfgManager.get_command_line_overrides(options, ["VARS"]):
+            exec('cfg.' + rule) # this cannot be factorized because of the exec
+        return cfg
+
+def get_file_signature(path):
+    '''Get the signature of a file: its modification time, size and md5.
+
+    :param path str: The path of the file.
+    :return: (mtime, size, md5), or None if the file does not exist.
+    :rtype: tuple
+    '''
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime, st.st_size, get_file_md5(path))
+
+def get_file_md5(path):
+    '''Get the md5 checksum of a file, read by chunks.
+
+    :param path str: The path of the file.
+    :return: The hexadecimal md5 checksum.
+    :rtype: str
+    '''
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+def get_git_files(path):
+    '''Get the git files that define the version of the git repository
+       containing path (HEAD, the current branch ref and packed-refs).
+
+    :param path str: A path in the git repository.
+    :return: The list of the git files, empty if path is not in a repository.
+    :rtype: list
+    '''
+    git_dir = src.system.get_git_dir(path)
+    if git_dir is None:
+        return []
+    return src.system.get_git_files(git_dir)
+
+class ConfigCache:
+    '''Class that stores on disk the merged config of an application,
+       in order not to read and merge all the pyconf files again
+       when none of them has changed.
+       The cache is stored in the LOCAL.workdir directory. It is identified
+       by the application, the overwrites of the command line, the user and
+       the personal directory (~/.salomeTools), and the salomeTools
+       version. It is valid as long as the pyconf files read,
+       and the directories where the application and the products
+       pyconf files are searched, have not changed.
+    '''
+    def __init__(self, cfg, application, options):
+        '''Initialization
+
+        :param cfg class 'src.pyconf.Config': The config, with its VARS,
+                                              INTERNAL and LOCAL sections.
+        :param application str: The application for which salomeTools is called.
+        :param options class Options: The general salomeToos options
+        '''
+        overwrite = []
+        if options is not None and options.overwrite is not None:
+            # the overwrites of the date and of the number of processors
+            # (sub-processes of compile --jobs) are applied at each call
+            overwrite = [rule for rule in options.overwrite
+                         if not rule.startswith(("VARS.datehour=",
+                                                 "VARS.nb_proc="))]
+        key = repr((application,
+                    overwrite,
+                    cfg.VARS.user,
+                    cfg.VARS.personalDir,
+                    cfg.VARS.salometoolsway,
+                    cfg.VARS.datadir,
+                    cfg.INTERNAL.sat_version,
+                    cfg.LOCAL.tag,
+                    sys.version_info[:2]))
+        key_md5 = hashlib.md5(key.encode()).hexdigest()
+        self.cache_dir = os.path.join(cfg.LOCAL.workdir, ".sat_config_cache")
+        self.cache_path = os.path.join(self.cache_dir,
+                                       "%s_%s.pickle" % (application, key_md5))
+
+    def load(self):
+        '''Load the cached config if it is up to date.
+
+        :return: The cached config, or None if there is no valid cache.
+        :rtype: class 'src.pyconf.Config'
+        '''
+        if not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, "rb") as f:
+                files, dirs, cfg = pickle.load(f)
+        except Exception as e:
+            DBG.write("ConfigCache cannot read %s" % self.cache_path, str(e))
+            return None
+
+        for path in files:
+            signature = files[path]
+            try:
+                st = os.stat(path)
+            except OSError:
+                if signature is None:
+                    continue
+                return None
+            if signature is None or st.st_size != signature[1]:
+                return None
+            # the content is checked only if the file was touched
+            if (st.st_mtime != signature[0] and
+                get_file_md5(path) != signature[2]):
+                return None
+
+        for path in dirs:
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                mtime = None
+            if mtime != dirs[path]:
+                return None
+        return cfg
+
+    def save(self, cfg, read_files):
+        '''Store the merged config in the cache.
+
+        :param cfg class 'src.pyconf.Config': The merged config.
+        :param read_files list: The pyconf files read to build the config.
+        '''
+        l_files = list(read_files)
+        l_files += get_git_files(cfg.VARS.salometoolsway)
+        # the product pyconf not read yet are read when accessed,
+        # the ones read during the merge are part of the cache
+        if "PRODUCTS" in cfg:
+            products = object.__getattribute__(cfg.PRODUCTS, 'data')
+            for product_name in products:
+                prod_cfg = products[product_name]
+                if isinstance(prod_cfg, src.pyconf.DeferredConfig):
+                    prod_cfg = prod_cfg.value
+                if prod_cfg is not None and "from_file" in prod_cfg:
+                    l_files.append(prod_cfg.from_file)
+        for project in cfg.PROJECTS.projects:
+            project_dir = os.path.dirname(
+                                cfg.PROJECTS.projects[project].file_path)
+            l_files += get_git_files(project_dir)
+        files = {}
+        for path in l_files:
+            files[path] = get_file_signature(path)
+
+        dirs = {}
+        for path in (list(cfg.PATHS.APPLICATIONPATH) +
+                     list(cfg.PATHS.PRODUCTPATH)):
+            try:
+                dirs[path] = os.stat(path).st_mtime
+            except OSError:
+                dirs[path] = None
+
+        try:
+            src.ensure_path_exists(self.cache_dir)
+            tmp_path = "%s.%d.tmp" % (self.cache_path, os.getpid())
+            with open(tmp_path, "wb") as f:
+                pickle.dump((files, dirs, cfg), f, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_path, self.cache_path)
+        except Exception as e:
+            DBG.write("ConfigCache cannot write %s" % self.cache_path, str(e))
 
 def check_path(path, ext=[]):
     '''Construct a text with the input path and "not found" if it does not
@@ -863,37 +1368,25 @@ def show_dependencies(config, products, logger):
     :param logger Logger: The logger instance to use for the display
     '''
 
-    from compile import get_dependencies_graph,depth_search_graph,find_path_graph
-    # Get the list of all application products, and create its dependency graph
-    all_products_infos = src.product.get_products_infos(config.APPLICATION.products,config)
-    all_products_graph=get_dependencies_graph(all_products_infos, compile_time=False)
+    # Get the dependency graph of all application products
+    all_products_graph = src.product.get_products_graph(config,
+                                                        compile_time=False)
 
     products_list=[]
     product_liste_name=""
     if products is None:
         products_list=config.APPLICATION.products
-        products_graph = all_products_graph
+        products_graph = all_products_graph.get_graph_dict()
     else:
         # 1. Extend the list with all products that depends upon the given list of products
         products_list=products
         product_liste_name="_".join(products)
-        visited=[]
-        for p_name in products_list:
-            visited=depth_search_graph(all_products_graph, p_name, visited)
-        products_infos = src.product.get_products_infos(visited, config)
-        products_graph = get_dependencies_graph(products_infos, compile_time=False)
+        visited = all_products_graph.depth_search(products_list)
+        products_graph = all_products_graph.get_graph_dict(visited)
 
         # 2. Extend the list with all the dependencies of the given list of products
-        children=[]
-        for n in all_products_graph:
-            # for all products (that are not in products_list):
-            # if we we find a path from the product to the product list,
-            # then we product is a child and we add it to the children list 
-            if (n not in children) and (n not in products_list):
-                if find_path_graph(all_products_graph, n, products_list):
-                    children = children + [n]
-        products_infos_rev = src.product.get_products_infos(children, config)
-        products_graph_rev = get_dependencies_graph(products_infos_rev, compile_time=False)
+        children = all_products_graph.get_all_dependants(products_list)
+        products_graph_rev = all_products_graph.get_graph_dict(children)
 
     logger.write("Dependency graph (python format)\n%s\n" % products_graph, 3)
 
@@ -41,6 +41,22 @@ parser.add_option('t', 'tag', 'string', 'tag',
                   _('Optional: The tag of SAT (only informative)'))
 parser.add_option('l', 'log_dir', 'string', 'log_dir', 
                   _('Optional: The directory where to put all the logs of SAT'))
+parser.add_option('', 'build_cache', 'string', 'build_cache', 
+                  _("Optional: The directory of the cache of the compiled "
+                    "products, shared between the applications ('none' to "
+                    "disable the cache)"))
+parser.add_option('', 'build_cache_max_size', 'int', 'build_cache_max_size', 
+                  _("Optional: The maximum size of the build cache in MB, "
+                    "the products the least recently used are removed "
+                    "(0 for no limit)"))
+parser.add_option('', 'git_mirror', 'string', 'git_mirror', 
+                  _("Optional: The directory of the local mirror of the git "
+                    "repositories of the products, shared between the "
+                    "applications ('none' to disable the mirror)"))
+parser.add_option('', 'compiler_cache_dir', 'string', 'compiler_cache_dir', 
+                  _("Optional: The directory of the compiler cache (ccache) "
+                    "used by the products with the compiler_cache property "
+                    "('default' for the directory of ccache)"))
 
 def set_local_value(config, key, value, logger):
     """ Edit the site.pyconf file and change a value.
@@ -132,6 +148,18 @@ def reset_local_projects(config, logger):
     return 0
 
 
+def get_local_value(config, key, default):
+    """ Get a value of the local configuration, which may be missing
+        in the local.pyconf files of the previous versions.
+
+    :param config Config: The global configuration.
+    :param key Str: The key of the value.
+    :param default: The value if the key is missing.
+    """
+    if key in config.LOCAL:
+        return config.LOCAL[key]
+    return default
+
 def display_local_values(config, logger):
     """ Display the base path
 
@@ -143,6 +171,12 @@ def display_local_values(config, logger):
             ("workdir", config.LOCAL.workdir),
             ("log_dir", config.LOCAL.log_dir),
             ("archive_dir", config.LOCAL.archive_dir),
+            ("build_cache", get_local_value(config, "build_cache", "none")),
+            ("build_cache_max_size",
+             get_local_value(config, "build_cache_max_size", 0)),
+            ("compiler_cache_dir",
+             get_local_value(config, "compiler_cache_dir", "default")),
+            ("git_mirror", get_local_value(config, "git_mirror", "none")),
             ("VCS", config.LOCAL.VCS),
             ("tag", config.LOCAL.tag),
             ("projects", config.PROJECTS.project_file_paths)]
@@ -216,6 +250,39 @@ def run(args, runner, logger):
                 res_set = set_local_value(runner.cfg, key, value, logger)
                 res += res_set
 
+    # Set the options of the build cache
+    if options.build_cache:
+        res_check = 0
+        if options.build_cache != "none":
+            res_check = check_path(options.build_cache, logger)
+            res += res_check
+        if res_check == 0:
+            res += set_local_value(runner.cfg, "build_cache",
+                                   options.build_cache, logger)
+    if options.build_cache_max_size is not None:
+        res += set_local_value(runner.cfg, "build_cache_max_size",
+                               options.build_cache_max_size, logger)
+
+    # Set the directory of the compiler cache
+    if options.compiler_cache_dir:
+        res_check = 0
+        if options.compiler_cache_dir != "default":
+            res_check = check_path(options.compiler_cache_dir, logger)
+            res += res_check
+        if res_check == 0:
+            res += set_local_value(runner.cfg, "compiler_cache_dir",
+                                   options.compiler_cache_dir, logger)
+
+    # Set the directory of the git mirror
+    if options.git_mirror:
+        res_check = 0
+        if options.git_mirror != "none":
+            res_check = check_path(options.git_mirror, logger)
+            res += res_check
+        if res_check == 0:
+            res += set_local_value(runner.cfg, "git_mirror",
+                                   options.git_mirror, logger)
+
     # set the options corresponding to projects file names
     if options.add_project:
         res_add=add_local_project(runner.cfg, options.add_project, logger)
@@ -61,7 +61,8 @@ def get_binary_from_archive(config, product_name, product_info, install_dir, log
         # search on ftp site
         logger.write("\n   The bin archive is not found on local file system, we try ftp\n", 3)
         ret=src.find_file_in_ftppath(archive_name, config.PATHS.ARCHIVEFTP, 
-                                     config.LOCAL.archive_dir, logger, "bin")
+                                     config.LOCAL.archive_dir, logger, "bin",
+                                     src.checksum.get_index(config))
         
         if ret:
             # archive was found on ftp and stored in ret
@@ -77,8 +78,10 @@ def get_binary_from_archive(config, product_name, product_info, install_dir, log
                  3, 
                  False)
     logger.flush()
-    # Call the system function that do the extraction in archive mode
-    retcode, NameExtractedDirectory = src.system.archive_extract(arch_path,
+    # Call the system function that do the extraction in archive mode,
+    # the archive is verified with its checksum file (see sat package)
+    retcode, NameExtractedDirectory = src.checksum.extract_verified_archive(
+                                      config, arch_path,
                                       install_dir.dir(), logger)
     
     # Rename the source directory if 
@@ -151,7 +154,6 @@ def get_all_product_binaries(config, products, logger):
         # in product information
         if retcode:
             pass
-            # CNC TODO check md5sum
             #check_OK, wrong_path = check_sources(product_info, logger)
             #if not check_OK:
             #    # Print the missing file path
@@ -237,10 +239,10 @@ def run(args, runner, logger):
     # Get the list of all application products, and create its dependency graph
     all_products_infos = src.product.get_products_infos(runner.cfg.APPLICATION.products,
                                                         runner.cfg)
-    from compile import get_dependencies_graph,depth_search_graph
-    all_products_graph=get_dependencies_graph(all_products_infos)
+    all_products_graph = src.product.get_products_graph(runner.cfg)
     #logger.write("Dependency graph of all application products : %s\n" % all_products_graph, 6)
-    DBG.write("Dependency graph of all application products : ", all_products_graph)
+    DBG.write("Dependency graph of all application products : ",
+              all_products_graph.get_graph_dict())
 
     products_infos=[]
     if options.products is None:
@@ -252,10 +254,7 @@ def run(args, runner, logger):
         # we evaluate the complete list including dependencies (~ to the --with-fathers of sat compile)
 
         # Extend the list with all recursive dependencies of the given products
-        visited=[]
-        for p_name in products_list:
-            visited=depth_search_graph(all_products_graph, p_name, visited)
-        products_list = visited
+        products_list = all_products_graph.depth_search(products_list)
         logger.write("Product we have to compile (as specified by user) : %s\n" % products_list, 5)
 
         #  Create a dict of all products to facilitate products_infos sorting
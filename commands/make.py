@@ -17,7 +17,6 @@
 #  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
 
 import os
-import re
 
 import src
 
@@ -133,31 +132,7 @@ def make_product(p_name_info, make_option, config, logger):
     return res
 
 def get_nb_proc(product_info, config, make_option):
-    
-    opt_nb_proc = None
-    new_make_option = make_option
-    if "-j" in make_option:
-        oExpr = re.compile("-j[0-9]+")
-        found = oExpr.search(make_option)
-        opt_nb_proc = int(re.findall('\d+', found.group())[0])
-        new_make_option = make_option.replace(found.group(), "")
-    
-    nbproc = -1
-    if "nb_proc" in product_info:
-        # nb proc is specified in module definition
-        nbproc = product_info.nb_proc
-        if opt_nb_proc and opt_nb_proc < product_info.nb_proc:
-            # use command line value only if it is lower than module definition
-            nbproc = opt_nb_proc
-    else:
-        # nb proc is not specified in module definition
-        if opt_nb_proc:
-            nbproc = opt_nb_proc
-        else:
-            nbproc = config.VARS.nb_proc
-    
-    assert nbproc > 0
-    return nbproc, new_make_option
+    return src.compilation.get_nb_proc(product_info, config, make_option)
 
 def description():
     '''method that is called when salomeTools is called with --help option.
@@ -631,14 +631,12 @@ def bin_products_archives(config, logger, only_vcs):
         bin_path = prod_info.install_dir
         targz_prod.add(bin_path)
         targz_prod.close()
-        # Python program to find MD5 hash value of a file
-        import hashlib
-        with open(path_targz_prod,"rb") as f:
-            bytes = f.read() # read file as bytes
-            readable_hash = hashlib.md5(bytes).hexdigest();
-            with open(path_targz_prod+".md5", "w") as md5sum:
-               md5sum.write("%s  %s" % (readable_hash, os.path.basename(path_targz_prod)))
-            logger.write("   archive : %s   (md5sum = %s)\n" % (path_targz_prod, readable_hash))
+        # the md5 checksum, read by chunks, is checked by sat install
+        readable_hash = src.checksum.get_file_checksum(path_targz_prod, "md5")
+        with open(path_targz_prod+".md5", "w") as md5sum:
+            md5sum.write("%s  %s" % (readable_hash, os.path.basename(path_targz_prod)))
+        src.checksum.get_index(config).set(path_targz_prod, "md5", readable_hash)
+        logger.write("   archive : %s   (md5sum = %s)\n" % (path_targz_prod, readable_hash))
 
     return 0
 
@@ -35,6 +35,9 @@ parser.add_option('', 'force_patch', 'boolean', 'force_patch',
 parser.add_option('c', 'complete', 'boolean', 'complete',
     _("Optional: completion mode, only prepare products not present in SOURCES dir."),
     False)
+parser.add_option('', 'offline', 'boolean', 'offline',
+    _("Optional: get the sources of the git products from the git mirror only "
+      "(see sat source --offline)."), False)
 
 
 def find_products_already_prepared(l_products):
@@ -155,6 +158,8 @@ Use the --force_patch option to overwrite it.
     # Construct the final commands arguments
     args_clean = args_appli + args_product_opt_clean + " --sources"
     args_source = args_appli + args_product_opt  
+    if options.offline:
+        args_source += " --offline"
     args_patch = args_appli + args_product_opt_patch
       
     # Initialize the results to a running status
@@ -19,18 +19,37 @@
 import os
 import shutil
 import re
+import time
+import threading
 import subprocess
 
 import src
 import prepare
 import src.debug as DBG
 
+# the default numbers of products whose sources are got at the same time
+NETWORK_JOBS = 4
+DISK_JOBS = 2
+
 # Define all possible option for patch command :  sat patch <options>
 parser = src.options.Options()
 parser.add_option('p', 'products', 'list2', 'products',
     _('Optional: products from which to get the sources. This option accepts a comma separated list.'))
-
-def get_source_for_dev(config, product_info, source_dir, logger, pad):
+parser.add_option('', 'network_jobs', 'int', 'network_jobs',
+    _('Optional: the maximum number of products whose sources are got at '
+      'the same time from the network (git, svn, cvs, ftp), %d by default.')
+    % NETWORK_JOBS)
+parser.add_option('', 'offline', 'boolean', 'offline',
+    _('Optional: get the sources of the git products from the git mirror '
+      '(see sat init --git_mirror) only, without fetching the remote '
+      'repositories.'))
+parser.add_option('', 'disk_jobs', 'int', 'disk_jobs',
+    _('Optional: the maximum number of products whose sources are got at '
+      'the same time from the disk (archives, directories), %d by default.')
+    % DISK_JOBS)
+
+def get_source_for_dev(config, product_info, source_dir, logger, pad,
+                       retry_wait=None, git_mirror=None):
     '''The method called if the product is in development mode
     
     :param config Config: The global configuration
@@ -40,6 +59,9 @@ def get_source_for_dev(config, product_info, source_dir, logger, pad):
                             directory where to put the sources
     :param logger Logger: The logger instance to use for the display and logging
     :param pad int: The gap to apply for the terminal display
+    :param retry_wait function: The function called with the delay before
+                                a new try of a failing command
+    :param git_mirror GitMirror: The git mirror, None if it is not used
     :return: True if it succeed, else False
     :rtype: boolean
     '''
@@ -51,7 +73,9 @@ def get_source_for_dev(config, product_info, source_dir, logger, pad):
                                  source_dir,
                                  logger, 
                                  pad, 
-                                 checkout=True)
+                                 checkout=True,
+                                 retry_wait=retry_wait,
+                                 git_mirror=git_mirror)
     logger.write("\n", 3, False)
     # +2 because product name is followed by ': '
     logger.write(" " * (pad+2), 3, False) 
@@ -68,7 +92,9 @@ def get_source_from_git(config,
                         logger,
                         pad,
                         is_dev=False,
-                        environ = None):
+                        environ = None,
+                        retry_wait=None,
+                        git_mirror=None):
     '''The method called if the product is to be get in git mode
     
     :param product_info Config: The configuration specific to 
@@ -80,6 +106,9 @@ def get_source_from_git(config,
     :param is_dev boolean: True if the product is in development mode
     :param environ src.environment.Environ: The environment to source when
                                                 extracting.
+    :param retry_wait function: The function called with the delay before
+                                a new try of a failing git command
+    :param git_mirror GitMirror: The git mirror, None if it is not used
     :return: True if it succeed, else False
     :rtype: boolean
     '''
@@ -130,17 +159,35 @@ def get_source_from_git(config,
     if not is_dev and "sub_dir" in product_info.git_info:
         sub_dir = product_info.git_info.sub_dir
 
+    if git_mirror is not None and git_mirror.can_extract(git_options):
+      # Get the sources from the local mirror of the repository
+      if sub_dir is None:
+        return git_mirror.extract(repo_git, product_info.git_info.tag,
+                                  source_dir, logger, environ,
+                                  not is_dev, retry_wait)
+      logger.write("sub_dir:%s " % sub_dir, 3)
+      return git_mirror.extract_sub_dir(repo_git, product_info.git_info.tag,
+                                        source_dir, sub_dir, logger, environ,
+                                        retry_wait)
+
+    if git_mirror is not None and git_mirror.offline:
+      logger.error(_("The git options of %s are not supported by the git "
+                     "mirror, it cannot be got offline") % product_info.name)
+      return False
+
     if sub_dir is None:
       # Call the system function that do the extraction in git mode
       retcode = src.system.git_extract(repo_git,
                                    product_info.git_info.tag, git_options,
-                                   source_dir, logger, environ)
+                                   source_dir, logger, environ,
+                                   retry_wait)
     else:
       # Call the system function that do the extraction of a sub_dir in git mode
       logger.write("sub_dir:%s " % sub_dir, 3)
       retcode = src.system.git_extract_sub_dir(repo_git,
                                    product_info.git_info.tag,git_options,
-                                   source_dir, sub_dir, logger, environ)
+                                   source_dir, sub_dir, logger, environ,
+                                   retry_wait)
 
 
     return retcode
@@ -171,7 +218,8 @@ def get_source_from_archive(config, product_info, source_dir, logger):
         # We try ftp!
         logger.write("\n   The archive is not found on local file system, we try ftp\n", 3)
         ret=src.find_file_in_ftppath(product_info.archive_info.archive_name, 
-                                     config.PATHS.ARCHIVEFTP, config.LOCAL.archive_dir, logger)
+                                     config.PATHS.ARCHIVEFTP, config.LOCAL.archive_dir, logger,
+                                     checksum_index=src.checksum.get_index(config))
         if ret:
             # archive was found on ftp and stored in ret
             product_info.archive_info.archive_name=ret
@@ -184,8 +232,10 @@ def get_source_from_archive(config, product_info, source_dir, logger):
                  3, 
                  False)
     logger.flush()
-    # Call the system function that do the extraction in archive mode
-    retcode, NameExtractedDirectory = src.system.archive_extract(
+    # Call the system function that do the extraction in archive mode,
+    # the archive is verified if it has a checksum file
+    retcode, NameExtractedDirectory = src.checksum.extract_verified_archive(
+                                    config,
                                     product_info.archive_info.archive_name,
                                     source_dir.dir(), logger)
     
@@ -344,7 +394,9 @@ def get_product_sources(config,
                        source_dir,
                        logger, 
                        pad, 
-                       checkout=False):
+                       checkout=False,
+                       retry_wait=None,
+                       git_mirror=None):
     '''Get the product sources.
     
     :param config Config: The global configuration
@@ -356,6 +408,9 @@ def get_product_sources(config,
     :param logger Logger: The logger instance to use for the display and logging
     :param pad int: The gap to apply for the terminal display
     :param checkout boolean: If True, get the source in checkout mode
+    :param retry_wait function: The function called with the delay before
+                                a new try of a failing command
+    :param git_mirror GitMirror: The git mirror, None if it is not used
     :return: True if it succeed, else False
     :rtype: boolean
     '''
@@ -372,11 +427,14 @@ def get_product_sources(config,
                                    product_info, 
                                    source_dir, 
                                    logger, 
-                                   pad)
+                                   pad,
+                                   retry_wait,
+                                   git_mirror)
 
     if product_info.get_source == "git":
         return get_source_from_git(config, product_info, source_dir, logger, pad, 
-                                    is_dev, env_appli)
+                                    is_dev, env_appli, retry_wait,
+                                    git_mirror)
 
     if product_info.get_source == "archive":
         return get_source_from_archive(config, product_info, source_dir, logger)
@@ -433,12 +491,115 @@ def get_product_sources(config,
     logger.flush()
     return False
 
-def get_all_product_sources(config, products, logger):
-    '''Get all the product sources.
+def get_source_kind(product_info):
+    '''Get the kind of resource used to get the sources of a product.
+
+    :param product_info Config: The configuration specific to the product
+    :return: "network" for git, svn, cvs and the archives which are not
+             in the ARCHIVEPATH (downloaded from ARCHIVEFTP), "disk" for
+             the other products
+    :rtype: str
+    '''
+    if product_info.get_source in ["git", "svn", "cvs"]:
+        return "network"
+    if product_info.get_source == "archive" and \
+       "archive_info" in product_info and \
+       not os.path.exists(product_info.archive_info.archive_name):
+        return "network"
+    return "disk"
+
+class SourceTask(threading.Thread):
+    """
+    The getting of the sources of a product, in its own thread. The task
+    waits for a free slot (a semaphore limiting the tasks using the network
+    or the disk), its messages are kept by a BufferLogger.
+    """
+    def __init__(self, config, product_info, source_dir, logger, pad, slot,
+                 cancel, git_mirror=None):
+        """\
+        :param config Config: The global configuration
+        :param product_info Config: The configuration specific to the product
+        :param source_dir Path: The directory where to put the sources
+        :param logger Logger: The logger of the command
+        :param pad int: The gap to apply for the terminal display
+        :param slot threading.Semaphore: The slots of the kind of the product
+        :param cancel threading.Event: If set, the tasks which are not
+                                       started do nothing
+        :param git_mirror GitMirror: The git mirror, None if it is not used
+        """
+        threading.Thread.__init__(self, name=product_info.name)
+        self.daemon = True
+        self.config = config
+        self.product_info = product_info
+        self.source_dir = source_dir
+        self.logger = src.logger.BufferLogger(logger)
+        self.pad = pad
+        self.slot = slot
+        self.cancel = cancel
+        self.git_mirror = git_mirror
+        self.retcode = False
+        self.exception = None
+
+    def run(self):
+        self.slot.acquire()
+        try:
+            if self.cancel.is_set():
+                return
+            is_dev = src.product.product_is_dev(self.product_info)
+            retcode = get_product_sources(self.config, self.product_info,
+                                          is_dev, self.source_dir,
+                                          self.logger, self.pad,
+                                          checkout=False,
+                                          retry_wait=self.retry_wait,
+                                          git_mirror=self.git_mirror)
+            # Check that the sources are correctly get using the files
+            # to be tested in product information
+            if retcode:
+                check_OK, wrong_path = check_sources(self.product_info,
+                                                     self.logger)
+                if not check_OK:
+                    # Print the missing file path
+                    msg = _("The required file %s does not exists. " % wrong_path)
+                    self.logger.write(src.printcolors.printcError("\nERROR: ") + msg, 3)
+                    retcode = False
+            self.retcode = retcode
+        except Exception as e:
+            DBG.write("exception getting the sources of %s" %
+                      self.product_info.name, DBG.format_exception(""))
+            self.exception = e
+        finally:
+            self.slot.release()
+
+    def retry_wait(self, delay):
+        '''Wait before a new try of a failing command, the slot of the task
+           being free for the other products.'''
+        self.slot.release()
+        try:
+            time.sleep(delay)
+        finally:
+            self.slot.acquire()
+
+    def wait(self):
+        '''Wait for the end of the task.'''
+        while self.is_alive():
+            self.join(0.5) # a join without timeout cannot be interrupted
+
+def get_all_product_sources(config, products, logger,
+                            network_jobs=NETWORK_JOBS, disk_jobs=DISK_JOBS,
+                            git_mirror=None):
+    '''Get all the product sources. The sources are got in parallel,
+       in the limit of network_jobs products using the network and of
+       disk_jobs products using the disk, and displayed in the order of
+       the products.
     
     :param config Config: The global configuration
     :param products List: The list of tuples (product name, product informations)
     :param logger Logger: The logger instance to be used for the logging
+    :param network_jobs int: The maximum number of products whose sources
+                             are got at the same time from the network
+    :param disk_jobs int: The maximum number of products whose sources
+                          are got at the same time from the disk
+    :param git_mirror GitMirror: The git mirror, None if it is not used
     :return: the tuple (number of success, dictionary product_name/success_fail)
     :rtype: (int,dict)
     '''
@@ -452,8 +613,13 @@ def get_all_product_sources(config, products, logger):
     if len(products) > 0:
         max_product_name_len = max(map(lambda l: len(l), products[0])) + 4
     
-    # The loop on all the products from which to get the sources
+    slots = {"network" : threading.BoundedSemaphore(max(1, network_jobs)),
+             "disk" : threading.BoundedSemaphore(max(1, disk_jobs))}
+    cancel = threading.Event()
+
+    # Start the tasks getting the sources of the products
     # DBG.write("source.get_all_product_sources config id", id(config), True)
+    tasks = [] # (product name, product info, source dir, task)
     for product_name, product_info in products:
         # get product name, product informations and the directory where to put
         # the sources
@@ -463,6 +629,18 @@ def get_all_product_sources(config, products, logger):
         else:
             source_dir = src.Path('')
 
+        # Do not get the sources if the source directory exists
+        task = None
+        if not source_dir.exists():
+            task = SourceTask(config, product_info, source_dir, logger,
+                              max_product_name_len,
+                              slots[get_source_kind(product_info)], cancel,
+                              git_mirror)
+            task.start()
+        tasks.append((product_name, product_info, source_dir, task))
+
+    # The loop on all the products, in their order
+    for product_name, product_info, source_dir, task in tasks:
         # display and log
         logger.write('%s: ' % src.printcolors.printcLabel(product_name), 3)
         logger.write(' ' * (max_product_name_len - len(product_name)), 3, False)
@@ -470,8 +648,7 @@ def get_all_product_sources(config, products, logger):
         
         # Remove the existing source directory if 
         # the product is not in development mode
-        is_dev = src.product.product_is_dev(product_info)
-        if source_dir.exists():
+        if task is None:
             logger.write('%s  ' % src.printcolors.printc(src.OK_STATUS), 3, False)
             msg = _("INFO : Not doing anything because the source directory already exists:\n    %s\n") % source_dir
             logger.write(msg, 3)
@@ -479,26 +656,22 @@ def get_all_product_sources(config, products, logger):
             # Do not get the sources and go to next product
             continue
 
-        # Call to the function that get the sources for one product
-        retcode = get_product_sources(config, product_info, is_dev, 
-                                     source_dir, logger, max_product_name_len, 
-                                     checkout=False)
-        
+        task.wait()
+        task.logger.replay()
+        if task.exception is not None:
+            # stop the other tasks as soon as their commands are finished
+            cancel.set()
+            for t in tasks:
+                if t[3] is not None:
+                    t[3].wait()
+            raise task.exception
+        retcode = task.retcode
+
         '''
         if 'no_rpath' in product_info.keys():
             if product_info.no_rpath:
                 hack_no_rpath(config, product_info, logger)
         '''
-        
-        # Check that the sources are correctly get using the files to be tested
-        # in product information
-        if retcode:
-            check_OK, wrong_path = check_sources(product_info, logger)
-            if not check_OK:
-                # Print the missing file path
-                msg = _("The required file %s does not exists. " % wrong_path)
-                logger.write(src.printcolors.printcError("\nERROR: ") + msg, 3)
-                retcode = False
 
         # show results
         results[product_name] = retcode
@@ -568,11 +741,31 @@ def run(args, runner, logger):
                                 runner.cfg.APPLICATION.workdir, 2)
     logger.write("\n", 2, False)
        
+    # Get the local mirror of the git repositories
+    git_mirror = src.gitMirror.GitMirror.from_config(runner.cfg,
+                                                     options.offline)
+    if git_mirror is None and options.offline:
+        msg = _("There is no git mirror, set it with sat init --git_mirror")
+        logger.write(src.printcolors.printcError(msg) + "\n", 1)
+        return 1
+    if git_mirror is not None:
+        src.printcolors.print_value(logger, 'git mirror',
+                                    git_mirror.mirror_dir, 2)
+        logger.write("\n", 2, False)
+
     # Get the products list with products informations regarding the options
     products_infos = src.product.get_products_list(options, runner.cfg, logger)
     
     # Call to the function that gets all the sources
-    good_result, results = get_all_product_sources(runner.cfg, products_infos, logger)
+    network_jobs = NETWORK_JOBS
+    if options.network_jobs:
+        network_jobs = options.network_jobs
+    disk_jobs = DISK_JOBS
+    if options.disk_jobs:
+        disk_jobs = options.disk_jobs
+    good_result, results = get_all_product_sources(runner.cfg, products_infos,
+                                                   logger, network_jobs,
+                                                   disk_jobs, git_mirror)
 
     # Display the results (how much passed, how much failed, etc...)
     status = src.OK_STATUS
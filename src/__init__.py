@@ -26,8 +26,8 @@ import shutil
 import errno
 import stat
 import fnmatch
+import hashlib
 import pprint as PP
-from ftplib import FTP
 
 from . import pyconf
 from . import architecture
@@ -42,6 +42,15 @@ from . import fileEnviron
 from . import compilation
 from . import test_module
 from . import template
+from . import pathIndex
+from . import productGraph
+from . import fingerprint
+from . import buildCache
+from . import jobserver
+from . import compileHistory
+from . import gitMirror
+from . import checksum
+from . import ftpPool
 
 import platform
 if platform.system() == "Windows" :
@@ -456,17 +465,13 @@ def find_file_in_lpath(file_name, lpath, additional_dir = ""):
     :return: the full path of the file or False if not found
     :rtype: str
     """
-    for directory in lpath:
-        dir_complete = os.path.join(directory, additional_dir)
-        if not os.path.isdir(directory) or not os.path.isdir(dir_complete):
-            continue
-        l_files = os.listdir(dir_complete)
-        for file_n in l_files:
-            if file_n == file_name:
-                return os.path.join(dir_complete, file_name)
-    return False
+    # the directories are listed once, see src.pathIndex
+    return pathIndex.get_path_index().find_file(file_name,
+                                                lpath,
+                                                additional_dir)
 
-def find_file_in_ftppath(file_name, ftppath, installation_dir, logger, additional_dir = ""):
+def find_file_in_ftppath(file_name, ftppath, installation_dir, logger,
+                         additional_dir = "", checksum_index = None):
     """\
     Find in all ftp servers in ftppath the file called file_name
     If it is found then return the destination path of the file
@@ -478,6 +483,9 @@ def find_file_in_ftppath(file_name, ftppath, installation_dir, logger, additiona
     :param installation_dir str: The name of the installation directory
     :return: the full path of the file or False if not found
     :param logger Logger: The logging instance to use for the prints.
+    :param checksum_index src.checksum.ChecksumIndex: If given, the checksum
+                          of the file (see its checksum file) is computed
+                          during the download and recorded in the index.
     :rtype: str
     """
 
@@ -494,41 +502,49 @@ def find_file_in_ftppath(file_name, ftppath, installation_dir, logger, additiona
         splpath=ipath.split(":")
         bigftppath+=splpath
 
+    # the connections are shared by the downloads, see src.ftpPool
+    pool = ftpPool.get_pool()
     for ftp_archive in bigftppath:
+       # ftp_archive has the form ftp.xxx.yyy/dir1/dir2/...
+       ftp_archive_split=ftp_archive.split("/")
+       ftp_server=ftp_archive_split[0]
+       directories=ftp_archive_split[1:]
+       if additional_dir:
+           directories.append(additional_dir)
+
+       # get the checksum files if they exist (sha256, md5)
        try:
-           # ftp_archive has the form ftp.xxx.yyy/dir1/dir2/...
-           ftp_archive_split=ftp_archive.split("/")
-           ftp_server=ftp_archive_split[0]
-           ftp = FTP(ftp_server)
-           logger.write("   Connect to ftp server %s\n" % ftp_server, 3)
-           ftp.login()
-           for directory in ftp_archive_split[1:]:
-               logger.write("   Change directory to %s\n" % directory, 3)
-               ftp.cwd(directory)
-           if additional_dir:
-               ftp.cwd(additional_dir)
+           for algorithm in checksum.ALGORITHMS:
+               destination_checksum=destination + "." + algorithm
+               if os.path.exists(destination_checksum):
+                   os.remove(destination_checksum)
+               pool.download(ftp_server, directories,
+                             file_name + "." + algorithm,
+                             destination_checksum, logger)
        except:
            logger.error("while connecting to ftp server %s\n" % ftp_server)
            continue
 
-       try:  # get md5 file if it exists
-           file_name_md5=file_name + ".md5"
-           destination_md5=destination + ".md5"
-           if ftp.size(file_name_md5) > 0:
-               with open(destination_md5,'wb') as dest_file_md5:
-                   ftp.retrbinary("RETR "+file_name_md5, dest_file_md5.write)
-       except:
-           pass
-
+       expected = None
+       if checksum_index is not None:
+           expected = checksum.read_checksum_file(destination)
+       hashes = []
+       if expected is not None:
+           hashes.append(hashlib.new(expected[0]))
        try:
-           if ftp.size(file_name) > 0:
-               # if file exists and is non empty
-               with open(destination,'wb') as dest_file:
-                   ftp.retrbinary("RETR "+file_name, dest_file.write)
+           # if file exists and is non empty, an interrupted download is
+           # resumed
+           if pool.download(ftp_server, directories, file_name, destination,
+                            logger, hashes):
                logger.write("   Archive %s was retrieved and stored in %s\n" % (file_name, destination), 3)
+               if hashes:
+                   # the archive is verified before its extraction
+                   checksum_index.set(destination, expected[0],
+                                      hashes[0].hexdigest())
                return destination
-       except:
-           logger.error("File not found in ftp_archive %s\n" % ftp_server)
+       except Exception as e:
+           logger.write("   %s\n" % e, 3)
+       logger.error("File not found in ftp_archive %s\n" % ftp_server)
 
     return False
 
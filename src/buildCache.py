@@ -0,0 +1,474 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+"""
+Cache of the installation directories of the compiled products.
+
+The cache is a directory, set by LOCAL.build_cache in data/local.pyconf
+(see sat init --build_cache), which can be shared between the
+applications and the users (NFS). The installation of a product is stored
+under a key computed from its name, version, evaluated configuration (the
+paths of the workdir excepted), the platform (VARS.dist), the keys of its
+dependencies, its sources (the checksum of the archive, or the contents of
+the git or source directory) and the contents of its patches.
+
+The absolute paths of the workdir written in the installed files (cmake
+and pkg-config files, .la files, scripts, symbolic links) are replaced by
+the workdir of the application when an installation is restored in another
+workdir. An installation whose binary files contain the workdir (rpaths) is
+not relocatable: it is restored only in the same workdir.
+
+| <build_cache>/<key[:2]>/<key>/info.pyconf : product, version, dist,
+|                                             workdir, relocatable, size,
+|                                             hits
+| <build_cache>/<key[:2]>/<key>/install : the installation directory
+
+The date of the last use of an entry is the date of its info.pyconf file,
+the entries the least recently used are removed first when the size of
+the cache exceeds LOCAL.build_cache_max_size (in MB, 0 for no limit).
+
+| Usage:
+| >> import src.buildCache as BCACHE
+| >> cache = BCACHE.BuildCache.from_config(config)
+| >> if cache is not None and not cache.restore(config, p_info, logger): ...
+"""
+
+import os
+import re
+import time
+import shutil
+import hashlib
+
+import src
+import src.debug as DBG
+import src.fingerprint as FGP
+
+INFO_FILENAME = "info.pyconf"
+INSTALL_DIRNAME = "install"
+
+# the keys of the product configuration which are not in the installation
+# or are set by the compile and clean commands
+_EXCLUDED_KEYS = ["source_dir", "build_dir", "from_file", "depend_all",
+                  "git_tag_description", "install_dir_save"]
+
+# the files written by sat in the installation directory after the
+# compilation, not stored
+_SAT_FILES = [src.product.CONFIG_FILENAME, src.product.PRODUCT_FILENAME,
+              FGP.FINGERPRINT_FILENAME]
+
+# the compiled python files contain the path of their source, only used in
+# the tracebacks: they are not relocated
+_NOT_RELOCATED = (".pyc", ".pyo")
+
+def is_cacheable(config, p_info):
+    '''Check if the installation of a product can be stored in the cache:
+       the product is compiled by sat in its own installation directory.
+
+    :param config Config: The global configuration.
+    :param p_info Config: The specific config of the product.
+    :rtype: boolean
+    '''
+    if not src.product.product_compiles(p_info) or \
+       src.product.product_is_native(p_info) or \
+       src.product.product_is_fixed(p_info):
+        return False
+    if src.appli_test_property(config, "pip", "yes") and \
+       src.product.product_test_property(p_info, "pip", "yes"):
+        return False
+    if src.appli_test_property(config, "single_install_dir", "yes") and \
+       src.product.product_test_property(p_info, "single_install_dir", "yes"):
+        return False
+    return True
+
+def get_dir_size(path):
+    '''Get the size of the files of a directory, in bytes.'''
+    size = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            size += os.lstat(os.path.join(root, name)).st_size
+    return size
+
+def raise_error(error):
+    '''The onerror function of os.walk: a directory removed during the walk
+       is an error.'''
+    raise error
+
+def get_prefix_pattern(prefix):
+    '''Get the regular expression of a path prefix in the contents of a
+       file: /a/w1 is not found in /a/w10.
+
+    :param prefix str: The path.
+    :rtype: a compiled regular expression of bytes
+    '''
+    return re.compile(re.escape(prefix.encode("utf-8")) + b"(?![\\w.+-])")
+
+def is_relocatable(path, prefix):
+    '''Check if a prefix can be replaced in the files of a directory: it is
+       not written in its binary files (rpaths for example).
+
+    :param path str: The directory.
+    :param prefix str: The path to replace.
+    :rtype: boolean
+    '''
+    pattern = get_prefix_pattern(prefix)
+    for root, dirs, files in os.walk(path, onerror=raise_error):
+        for name in files:
+            file_path = os.path.join(root, name)
+            if os.path.islink(file_path) or name.endswith(_NOT_RELOCATED):
+                continue
+            with open(file_path, "rb") as f:
+                data = f.read()
+            if b"\0" in data and pattern.search(data):
+                return False
+    return True
+
+def relocate_tree(path, old_prefix, new_prefix):
+    '''Replace a prefix by another one in the text files and the symbolic
+       links of a directory (see is_relocatable). The files are replaced,
+       not modified: the hard links to the cache are broken.
+
+    :param path str: The directory.
+    :param old_prefix str: The path to replace.
+    :param new_prefix str: The new path.
+    '''
+    pattern = get_prefix_pattern(old_prefix)
+    new_bytes = new_prefix.encode("utf-8")
+    for root, dirs, files in os.walk(path, onerror=raise_error):
+        for name in dirs:
+            if os.path.islink(os.path.join(root, name)):
+                files.append(name)
+        for name in files:
+            file_path = os.path.join(root, name)
+            if os.path.islink(file_path):
+                target = os.readlink(file_path).encode("utf-8")
+                new_target = pattern.sub(lambda m: new_bytes, target)
+                if new_target != target:
+                    os.remove(file_path)
+                    os.symlink(new_target.decode("utf-8"), file_path)
+                continue
+            if name.endswith(_NOT_RELOCATED):
+                continue
+            with open(file_path, "rb") as f:
+                data = f.read()
+            new_data = pattern.sub(lambda m: new_bytes, data)
+            if new_data == data:
+                continue
+            tmp_path = "%s.%d" % (file_path, os.getpid())
+            with open(tmp_path, "wb") as f:
+                f.write(new_data)
+            shutil.copystat(file_path, tmp_path)
+            os.rename(tmp_path, file_path)
+
+def copy_tree(source, target, link):
+    '''Copy the files of a directory into another one, which may exist,
+       with hard links if link is True and if possible. An error is raised
+       if a file or a directory is removed during the copy.
+
+    :param source str: The directory to copy.
+    :param target str: The target directory, created if needed.
+    :param link boolean: If True, the files are hard linked.
+    '''
+    for root, dirs, files in os.walk(source, onerror=raise_error):
+        target_root = os.path.join(target, os.path.relpath(root, source))
+        if not os.path.isdir(target_root):
+            os.makedirs(target_root)
+        for name in dirs:
+            path = os.path.join(root, name)
+            if os.path.islink(path): # not followed by os.walk
+                files.append(name)
+        for name in files:
+            path = os.path.join(root, name)
+            target_path = os.path.join(target_root, name)
+            if os.path.lexists(target_path):
+                os.remove(target_path)
+            if os.path.islink(path):
+                os.symlink(os.readlink(path), target_path)
+                continue
+            if link:
+                try:
+                    os.link(path, target_path)
+                    continue
+                except OSError: # another file system
+                    link = False
+            shutil.copy2(path, target_path)
+
+class BuildCache(object):
+    """
+    The cache of the installation directories of the products.
+    """
+    def __init__(self, cache_dir, max_size=0, link=False):
+        """\
+        :param cache_dir str: The directory of the cache.
+        :param max_size int: The maximum size of the cache in MB, 0 if
+                             there is no limit.
+        :param link boolean: If True the installations are restored with
+                             hard links, else they are copied.
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.link = link
+        self.keys = {} # product name -> key
+
+    @classmethod
+    def from_config(cls, config):
+        """\
+        Get the build cache set in the LOCAL section of the configuration.
+
+        :param config Config: The global configuration.
+        :return: The build cache, None if there is no build cache.
+        :rtype: BuildCache
+        """
+        if "build_cache" not in config.LOCAL or \
+           config.LOCAL.build_cache in ["none", "no", ""]:
+            return None
+        max_size = 0
+        if "build_cache_max_size" in config.LOCAL:
+            max_size = int(config.LOCAL.build_cache_max_size)
+        link = ("build_cache_link" in config.LOCAL and
+                config.LOCAL.build_cache_link == "yes")
+        return cls(config.LOCAL.build_cache, max_size, link)
+
+    def get_key(self, config, p_name):
+        '''Get the key of the installation of a product in the cache.
+
+        :param config Config: The global configuration.
+        :param p_name str: The product name.
+        :return: The key.
+        :rtype: str
+        '''
+        if p_name in self.keys:
+            return self.keys[p_name]
+        p_info = src.product.get_product_config(config, p_name)
+        text = "%s:%s:%s" % (p_name, p_info.version, config.VARS.dist)
+        if src.product.product_is_native(p_info) or \
+           src.product.product_is_fixed(p_info):
+            text += ":%s:%s" % (p_info.get_source, p_info.install_dir)
+        else:
+            text += FGP.config_to_text(p_info, _EXCLUDED_KEYS).replace(
+                                   config.APPLICATION.workdir, "$WORKDIR")
+            text += self.get_sources_text(config, p_info)
+            depend = list(p_info.depend)
+            if "build_depend" in p_info:
+                depend += list(p_info.build_depend)
+            for dep in sorted(set(depend)):
+                if dep in config.APPLICATION.products:
+                    text += ",%s:%s" % (dep, self.get_key(config, dep))
+        key = hashlib.sha1(text.encode("utf-8", "replace")).hexdigest()
+        self.keys[p_name] = key
+        return key
+
+    def get_sources_text(self, config, p_info):
+        '''Get the part of the key identifying the sources of a product
+           and its patches, the version is not enough.
+
+        :param config Config: The global configuration.
+        :param p_info Config: The specific config of the product.
+        :rtype: str
+        '''
+        text = ""
+        archive = None
+        if p_info.get_source == "archive" and "archive_info" in p_info:
+            archive = p_info.archive_info.archive_name
+        if archive is not None and os.path.isfile(archive):
+            # read once per archive, see src.checksum
+            index = src.checksum.get_index(config)
+            checksum = index.get(archive, "sha256")
+            if checksum is None:
+                checksum = src.checksum.get_file_checksum(archive, "sha256")
+                index.set(archive, "sha256", checksum)
+            text += ",archive:%s" % checksum
+        elif "source_dir" in p_info:
+            text += "," + FGP.get_source_hash(p_info.source_dir)
+        if src.product.product_has_patches(p_info):
+            for patch in p_info.patches:
+                if os.path.isfile(patch):
+                    text += ",patch:%s" % src.checksum.get_file_checksum(
+                                                            patch, "sha256")
+                else:
+                    text += ",patch:%s" % patch
+        return text
+
+    def get_entry_dir(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def read_info(self, entry_dir):
+        '''Read the info.pyconf file of an entry.
+
+        :return: The info, None if the entry is not valid.
+        :rtype: Config
+        '''
+        try:
+            return src.pyconf.Config(os.path.join(entry_dir, INFO_FILENAME))
+        except Exception:
+            return None
+
+    def write_info(self, entry_dir, info):
+        '''Write the info.pyconf file of an entry (atomically, the cache
+           can be shared).
+
+        :param info dict: The information on the entry.
+        '''
+        res = src.pyconf.Config()
+        for key in ["product", "version", "dist", "workdir", "relocatable",
+                    "size", "hits"]:
+            res.addMapping(key, info[key], "")
+        path = os.path.join(entry_dir, INFO_FILENAME)
+        tmp_path = "%s.%d" % (path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            res.__save__(f)
+        os.rename(tmp_path, path)
+
+    def restore(self, config, p_info, logger):
+        '''Restore the installation of a product from the cache.
+
+        :param config Config: The global configuration.
+        :param p_info Config: The specific config of the product.
+        :param logger Logger: The logger instance to use for the display.
+        :return: True if the installation was found in the cache.
+        :rtype: boolean
+        '''
+        entry_dir = self.get_entry_dir(self.get_key(config, p_info.name))
+        info = self.read_info(entry_dir)
+        if info is None or "workdir" not in info: # stored by an old sat
+            return False
+        workdir = config.APPLICATION.workdir
+        if info.workdir != workdir and info.relocatable != "yes":
+            logger.write(_("The installation of %(name)s in the build cache "
+                           "%(dir)s is not relocatable in %(workdir)s\n") %
+                         {"name" : p_info.name, "dir" : entry_dir,
+                          "workdir" : workdir}, 5)
+            return False
+        t0 = time.time()
+        try:
+            copy_tree(os.path.join(entry_dir, INSTALL_DIRNAME),
+                      p_info.install_dir, self.link)
+            if info.workdir != workdir:
+                relocate_tree(p_info.install_dir, info.workdir, workdir)
+        except (IOError, OSError) as e:
+            # removed by a sat cache --prune during the copy
+            DBG.write("build cache restore problem", (entry_dir, str(e)))
+            logger.write(_("Cannot restore %(name)s from the build cache "
+                           "%(dir)s: %(error)s\n") % {"name" : p_info.name,
+                                                     "dir" : entry_dir,
+                                                     "error" : str(e)}, 5)
+            shutil.rmtree(p_info.install_dir, ignore_errors=True)
+            return False
+        # the date of the info file is the date of the last use
+        try:
+            self.write_info(entry_dir, {"product" : info.product,
+                                        "version" : info.version,
+                                        "dist" : info.dist,
+                                        "workdir" : info.workdir,
+                                        "relocatable" : info.relocatable,
+                                        "size" : info.size,
+                                        "hits" : info.hits + 1})
+        except (IOError, OSError): # read only cache
+            pass
+        logger.write(_("Restored %(name)s from the build cache %(dir)s "
+                       "in %(time).1fs\n") % {"name" : p_info.name,
+                                              "dir" : entry_dir,
+                                              "time" : time.time() - t0}, 5)
+        return True
+
+    def store(self, config, p_info, logger):
+        '''Store the installation of a product in the cache, if it is not
+           already stored, and remove the oldest entries if the cache is
+           too big.
+
+        :param config Config: The global configuration.
+        :param p_info Config: The specific config of the product.
+        :param logger Logger: The logger instance to use for the display.
+        '''
+        entry_dir = self.get_entry_dir(self.get_key(config, p_info.name))
+        if os.path.exists(entry_dir):
+            return
+        tmp_dir = "%s.tmp%d" % (entry_dir, os.getpid())
+        try:
+            copy_tree(p_info.install_dir,
+                      os.path.join(tmp_dir, INSTALL_DIRNAME), False)
+            install_dir = os.path.join(tmp_dir, INSTALL_DIRNAME)
+            for name in os.listdir(install_dir):
+                for prefix in _SAT_FILES:
+                    if name.startswith(prefix):
+                        os.remove(os.path.join(install_dir, name))
+                        break
+            workdir = config.APPLICATION.workdir
+            relocatable = is_relocatable(install_dir, workdir)
+            self.write_info(tmp_dir, {"product" : p_info.name,
+                                      "version" : p_info.version,
+                                      "dist" : config.VARS.dist,
+                                      "workdir" : workdir,
+                                      "relocatable" : ("yes" if relocatable
+                                                       else "no"),
+                                      "size" : get_dir_size(install_dir),
+                                      "hits" : 0})
+            os.rename(tmp_dir, entry_dir)
+        except (IOError, OSError) as e:
+            # stored by another process, or not writable
+            DBG.write("build cache store problem", (entry_dir, str(e)))
+            return
+        finally:
+            if os.path.exists(tmp_dir):
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        logger.write(_("Stored %(name)s in the build cache %(dir)s\n") %
+                     {"name" : p_info.name, "dir" : entry_dir}, 5)
+        if self.max_size > 0:
+            self.prune(self.max_size)
+
+    def get_entries(self):
+        '''Get the entries of the cache, the least recently used first.
+
+        :return: The list of (last use date, entry directory, info).
+        :rtype: list
+        '''
+        res = []
+        if not os.path.isdir(self.cache_dir):
+            return res
+        for prefix in os.listdir(self.cache_dir):
+            prefix_dir = os.path.join(self.cache_dir, prefix)
+            if len(prefix) != 2 or not os.path.isdir(prefix_dir):
+                continue
+            for key in os.listdir(prefix_dir):
+                entry_dir = os.path.join(prefix_dir, key)
+                info = self.read_info(entry_dir)
+                if info is None: # being stored
+                    continue
+                date = os.path.getmtime(os.path.join(entry_dir, INFO_FILENAME))
+                res.append((date, entry_dir, info))
+        res.sort(key=lambda entry: entry[0])
+        return res
+
+    def prune(self, max_size):
+        '''Remove the least recently used entries, until the size of the
+           cache is lower than max_size.
+
+        :param max_size int: The maximum size, in MB.
+        :return: The removed entries (see get_entries).
+        :rtype: list
+        '''
+        entries = self.get_entries()
+        size = sum([info.size for date, entry_dir, info in entries])
+        removed = []
+        for date, entry_dir, info in entries:
+            if size <= max_size * 1024 * 1024:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            size -= info.size
+            removed.append((date, entry_dir, info))
+        return removed
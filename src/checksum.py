@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+"""
+Checksums of the archives of the products, used by sat source, sat install
+and sat package.
+
+An archive can come with a checksum file, <archive>.sha256 or <archive>.md5
+(written by sha256sum or md5sum: "<checksum>  <file name>"). The archive is
+then verified: its checksum is computed by chunks while it is extracted (or
+downloaded from ARCHIVEFTP), and compared to the expected one.
+
+The computed checksums are recorded in an index, keyed by the path, the size
+and the modification time of the archives: an archive already verified is
+not read again, an archive whose checksum is wrong fails before its
+extraction.
+
+| <LOCAL.workdir>/.sat_archive_checksums.pickle
+
+| Usage:
+| >> import src.checksum as CHECKSUM
+| >> res, prefix = CHECKSUM.extract_verified_archive(config, path, where,
+| >>                                                 logger)
+"""
+
+import os
+import shutil
+import pickle
+import hashlib
+import threading
+
+import src
+import src.debug as DBG
+
+CHUNK_SIZE = 1024 * 1024
+# the algorithms of the checksum files, the first found is used
+ALGORITHMS = ["sha256", "md5"]
+INDEX_FILENAME = ".sat_archive_checksums.pickle"
+
+def get_file_checksum(path, algorithm="md5"):
+    '''Get the checksum of a file, read by chunks.
+
+    :param path str: The path of the file.
+    :param algorithm str: The algorithm (md5, sha256).
+    :return: The hexadecimal checksum.
+    :rtype: str
+    '''
+    checksum = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+def read_checksum_file(path):
+    '''Get the expected checksum of an archive, in its checksum file.
+
+    :param path str: The path of the archive.
+    :return: (algorithm, checksum), None if there is no checksum file.
+    :rtype: tuple
+    '''
+    for algorithm in ALGORITHMS:
+        checksum_file = "%s.%s" % (path, algorithm)
+        if not os.path.isfile(checksum_file):
+            continue
+        with open(checksum_file) as f:
+            words = f.read().split()
+        if words:
+            return algorithm, words[0].lower()
+    return None
+
+class HashingReader(object):
+    """
+    A file whose bytes update checksums when they are read.
+    """
+    def __init__(self, fileobj, checksums):
+        """\
+        :param fileobj file: The file, opened in binary mode.
+        :param checksums list: The hashlib objects to update.
+        """
+        self.fileobj = fileobj
+        self.checksums = checksums
+
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        for checksum in self.checksums:
+            checksum.update(data)
+        return data
+
+    def read_all(self):
+        '''Read the end of the file, for the checksums.'''
+        while self.read(CHUNK_SIZE):
+            pass
+
+class ChecksumIndex(object):
+    """
+    The checksums of the archives already computed.
+    """
+    def __init__(self, path):
+        """\
+        :param path str: The file of the index.
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            return {}
+
+    def get_key(self, archive):
+        st = os.stat(archive)
+        return (os.path.realpath(archive), st.st_size, st.st_mtime)
+
+    def get(self, archive, algorithm):
+        '''Get the checksum of an archive, if it is known.
+
+        :param archive str: The path of the archive.
+        :param algorithm str: The algorithm.
+        :return: The checksum, None if it is not known.
+        :rtype: str
+        '''
+        with self.lock:
+            return self.entries.get(self.get_key(archive), {}).get(algorithm)
+
+    def set(self, archive, algorithm, checksum):
+        '''Record the checksum of an archive, and save the index.
+
+        :param archive str: The path of the archive.
+        :param algorithm str: The algorithm.
+        :param checksum str: The checksum.
+        '''
+        key = self.get_key(archive)
+        with self.lock:
+            # the index is shared by the sat processes
+            entries = self.load()
+            entries.update(self.entries)
+            # the entries of the previous versions of the archive are useless
+            for other in list(entries):
+                if other[0] == key[0] and other != key:
+                    del entries[other]
+            entries.setdefault(key, {})[algorithm] = checksum
+            self.entries = entries
+            tmp_path = "%s.%d.%d" % (self.path, os.getpid(),
+                                     threading.current_thread().ident)
+            try:
+                src.ensure_path_exists(os.path.dirname(self.path))
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(entries, f, pickle.HIGHEST_PROTOCOL)
+                os.rename(tmp_path, self.path)
+            except (IOError, OSError) as e:
+                DBG.write("cannot write the checksum index %s" % self.path,
+                          str(e))
+
+def get_index(config):
+    '''Get the index of the checksums of the archives, shared by the
+       commands of the configuration.
+
+    :param config Config: The global configuration.
+    :rtype: ChecksumIndex
+    '''
+    path = os.path.join(config.LOCAL.workdir, INDEX_FILENAME)
+    cache = src.pyconf.getRootCache(config, "checksum_index")
+    if cache is None:
+        return ChecksumIndex(path)
+    if "index" not in cache:
+        cache["index"] = ChecksumIndex(path)
+    return cache["index"]
+
+def check_checksum(archive, algorithm, expected, checksum):
+    '''Raise an exception if the checksum of an archive is wrong.
+
+    :param archive str: The path of the archive.
+    :param algorithm str: The algorithm.
+    :param expected str: The checksum of the checksum file.
+    :param checksum str: The checksum of the archive.
+    '''
+    if checksum != expected:
+        raise src.SatException(
+            _("The %(algorithm)s checksum of the archive %(archive)s is "
+              "%(checksum)s, %(expected)s is expected: the archive is "
+              "corrupted") % {"algorithm" : algorithm, "archive" : archive,
+                              "checksum" : checksum, "expected" : expected})
+
+def extract_verified_archive(config, archive, where, logger):
+    '''Extract an archive (see src.system.archive_extract), and verify it
+       if it has a checksum file: the checksum is computed during the
+       extraction, unless it is in the index, the archive is then verified
+       before its extraction. An exception is raised if the checksum is
+       wrong, the extracted files and directories are removed.
+
+    :param config Config: The global configuration.
+    :param archive str: The path of the archive.
+    :param where str: The path where to extract.
+    :param logger Logger: The logger instance to use.
+    :return: True if the extraction is successful, and the common prefix
+             of the names of the members of the archive
+    :rtype: (boolean, str)
+    '''
+    expected = read_checksum_file(archive)
+    if expected is None:
+        return src.system.archive_extract(archive, where, logger)
+    algorithm, expected = expected
+    index = get_index(config)
+    checksum = index.get(archive, algorithm)
+    if checksum is not None:
+        check_checksum(archive, algorithm, expected, checksum)
+        logger.write(_("%s checksum of %s already verified\n") %
+                     (algorithm, os.path.basename(archive)), 5)
+        return src.system.archive_extract(archive, where, logger)
+
+    checksums = [hashlib.new(algorithm)]
+    members = []
+    res, prefix = src.system.archive_extract(archive, where, logger,
+                                             checksums, members)
+    if not res:
+        return res, prefix
+    checksum = checksums[0].hexdigest()
+    index.set(archive, algorithm, checksum)
+    if checksum != expected:
+        for member in members:
+            path = os.path.join(str(where), member)
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.lexists(path):
+                os.remove(path)
+    check_checksum(archive, algorithm, expected, checksum)
+    logger.write(_("%s checksum of %s verified\n") %
+                 (algorithm, os.path.basename(archive)), 5)
+    return res, prefix
@@ -17,6 +17,8 @@
 #  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
 
 import os
+import re
+import errno
 import subprocess
 import sys
 import shutil
@@ -32,6 +34,152 @@ C_COMPILE_ENV_LIST = ["CC",
                       "LIBS",
                       "LDFLAGS"]
 
+# the statistics log of the compiler cache, in the build directory
+COMPILER_CACHE_STATS_FILENAME = "sat-compiler-cache-stats.log"
+
+def get_make_jobs(make_option):
+    '''Get the number of jobs of the -j<n> option of make.
+
+    :param make_option str: The options of make.
+    :return: The number of jobs, None if there is no -j<n> option.
+    :rtype: int
+    '''
+    found = re.search("-j([0-9]+)", make_option)
+    if found is None:
+        return None
+    return int(found.group(1))
+
+def get_nb_proc(product_info, config, make_option):
+    '''Get the number of processors to give to make for a product, and the
+       make options without the -j option.
+
+    :param product_info Config: The specific config of the product.
+    :param config Config: The global configuration.
+    :param make_option str: The options of make, with -j<n> or not.
+    :return: The number of processors and the other options.
+    :rtype: (int, str)
+    '''
+    opt_nb_proc = get_make_jobs(make_option)
+    new_make_option = make_option
+    if opt_nb_proc is not None:
+        new_make_option = re.sub("-j[0-9]+", "", make_option, 1)
+    
+    nbproc = -1
+    if "nb_proc" in product_info:
+        # nb proc is specified in module definition
+        nbproc = product_info.nb_proc
+        if opt_nb_proc and opt_nb_proc < product_info.nb_proc:
+            # use command line value only if it is lower than module definition
+            nbproc = opt_nb_proc
+    else:
+        # nb proc is not specified in module definition
+        if opt_nb_proc:
+            nbproc = opt_nb_proc
+        else:
+            nbproc = config.VARS.nb_proc
+    
+    assert nbproc > 0
+    return nbproc, new_make_option
+
+def uses_compiler_cache(config, product_info):
+    '''Check if the compilations of a product use the compiler cache
+       (ccache): the compiler_cache property of the product if it is set,
+       else the compiler_cache property of the application.
+
+    :param config Config: The global configuration.
+    :param product_info Config: The specific config of the product.
+    :rtype: boolean
+    '''
+    if "properties" in product_info and \
+       "compiler_cache" in product_info.properties:
+        return src.product.product_test_property(product_info,
+                                                 "compiler_cache", "yes")
+    return src.appli_test_property(config, "compiler_cache", "yes")
+
+def find_program(name):
+    '''Get the path of a program, searched in the PATH if it is not a path.
+
+    :param name str: The program name or path.
+    :return: The path, None if it is not found.
+    :rtype: str
+    '''
+    if os.path.dirname(name):
+        paths = [name]
+    else:
+        paths = [os.path.join(d, name)
+                 for d in os.environ.get("PATH", "").split(os.pathsep)]
+    for path in paths:
+        if os.path.isfile(path) and os.access(path, os.X_OK):
+            return path
+    return None
+
+def read_compiler_cache_stats(stats_file):
+    '''Read the statistics log of ccache (CCACHE_STATSLOG): a line
+       "# <source file>" followed by the result of each compilation.
+
+    :param stats_file str: The statistics log.
+    :return: (number of hits, number of misses), None if there is no log.
+    :rtype: tuple
+    '''
+    if not os.path.exists(stats_file):
+        return None
+    hits = misses = 0
+    with open(stats_file) as f:
+        for line in f:
+            line = line.strip()
+            if line.endswith("cache_hit"): # direct, preprocessed, remote
+                hits += 1
+            elif line == "cache_miss":
+                misses += 1
+    return hits, misses
+
+def wait_with_rusage(process, block=True):
+    '''Wait for the end of a process and get its peak memory, with the
+       peak memory of the processes it waited for.
+
+    :param process subprocess.Popen: The process.
+    :param block boolean: If False, do not wait if the process is running.
+    :return: (the return code of the process, None if it is running,
+              the peak resident set size in KB, 0 if it is unknown)
+    :rtype: tuple
+    '''
+    if not hasattr(os, "wait4"): # windows
+        if block:
+            process.wait()
+        else:
+            process.poll()
+        return process.returncode, 0
+    if process.returncode is not None:
+        return process.returncode, 0
+    while True:
+        try:
+            pid, status, rusage = os.wait4(process.pid,
+                                           0 if block else os.WNOHANG)
+            break
+        except OSError as e:
+            if e.errno != errno.EINTR:
+                raise
+    if pid == 0:
+        return None, 0
+    if os.WIFSIGNALED(status):
+        process.returncode = -os.WTERMSIG(status)
+    else:
+        process.returncode = os.WEXITSTATUS(status)
+    max_rss = rusage.ru_maxrss
+    if sys.platform == "darwin": # in bytes
+        max_rss //= 1024
+    return process.returncode, max_rss
+
+def call_with_rusage(command, **kwargs):
+    '''Run a command like subprocess.call, and get its peak memory.
+
+    :param command str: The command, with the arguments of subprocess.call.
+    :return: (the return code, the peak resident set size in KB, 0 if it
+              is unknown)
+    :rtype: tuple
+    '''
+    return wait_with_rusage(subprocess.Popen(command, **kwargs))
+
 class Builder:
     """Class to handle all construction steps, like cmake, configure, make, ...
     """
@@ -41,7 +189,8 @@ class Builder:
                  product_name,
                  product_info,
                  options = src.options.OptResult(),
-                 check_src=True):
+                 check_src=True,
+                 jobserver=None):
         self.config = config
         self.logger = logger
         self.options = options
@@ -57,6 +206,12 @@ class Builder:
         self.verbose_mode = False
         if "verbose" in self.product_info and self.product_info.verbose == "yes":
             self.verbose_mode = True
+        # the src.jobserver.JobServer shared by the build commands, if any
+        self.jobserver = jobserver
+        # the peak resident set size of the commands, in KB
+        self.max_rss = 0
+        # the compiler launcher (ccache), None if it is not used
+        self.compiler_launcher = None
 
     ##
     # Shortcut method to log in log file.
@@ -70,6 +225,29 @@ class Builder:
     def log_command(self, command):
         self.log("> %s\n" % command, 5)
 
+    ##
+    # Runs a command (subprocess.call arguments), and keeps the peak memory
+    # of the processes in max_rss.
+    def call(self, command, **kwargs):
+        res, max_rss = call_with_rusage(command, **kwargs)
+        self.max_rss = max(self.max_rss, max_rss)
+        return res
+
+    ##
+    # Runs a build command (make, build script), which takes its jobs
+    # from the jobserver if there is one.
+    def call_build_command(self, command):
+        kwargs = {"shell" : True,
+                  "cwd" : str(self.build_dir),
+                  "env" : self.build_environ.environ.environ,
+                  "stdout" : self.logger.logTxtFile,
+                  "stderr" : subprocess.STDOUT}
+        if self.jobserver is None:
+            return self.call(command, **kwargs)
+        kwargs["env"] = dict(kwargs["env"])
+        kwargs["env"]["MAKEFLAGS"] = self.jobserver.get_makeflags()
+        return self.jobserver.call(command, function=self.call, **kwargs)
+
     ##
     # Prepares the environment.
     # Build two environment: one for building and one for testing (launch).
@@ -104,6 +282,9 @@ class Builder:
             self.launch_environ.silent = True # no need to show here
             self.launch_environ.set_full_environ(self.logger, environ_info)
 
+        if uses_compiler_cache(self.config, self.product_info):
+            self.set_compiler_cache()
+
         for ee in C_COMPILE_ENV_LIST:
             vv = self.build_environ.get(ee)
             if len(vv) > 0:
@@ -111,6 +292,48 @@ class Builder:
 
         return 0
 
+    ##
+    # Sets the compiler launcher (ccache) in the build environment: the
+    # CMAKE_<LANG>_COMPILER_LAUNCHER variables, used by cmake >= 3.17 (and
+    # passed by the cmake step), and the cache directory.
+    # The results of the compilations are logged in the build directory.
+    def set_compiler_cache(self):
+        launcher = "ccache"
+        if "compiler_cache_launcher" in self.config.LOCAL:
+            launcher = self.config.LOCAL.compiler_cache_launcher
+        self.compiler_launcher = find_program(launcher)
+        if self.compiler_launcher is None:
+            self.log(src.printcolors.printcWarning(
+                     _("WARNING: the compiler cache %s is not found, "
+                       "the product is compiled without it\n") % launcher), 3)
+            return
+        for lang in ["C", "CXX"]:
+            self.build_environ.set("CMAKE_%s_COMPILER_LAUNCHER" % lang,
+                                   self.compiler_launcher)
+        if "compiler_cache_dir" in self.config.LOCAL and \
+           self.config.LOCAL.compiler_cache_dir not in ["default", ""]:
+            self.build_environ.set("CCACHE_DIR",
+                                   self.config.LOCAL.compiler_cache_dir)
+        # the paths relative to the workdir: hits between the applications
+        self.build_environ.set("CCACHE_BASEDIR",
+                               self.config.APPLICATION.workdir)
+        stats_file = self.get_compiler_cache_stats_file()
+        if os.path.exists(stats_file):
+            os.remove(stats_file)
+        self.build_environ.set("CCACHE_STATSLOG", stats_file)
+        self.log("  compiler cache = %s\n" % self.compiler_launcher, 4, False)
+
+    def get_compiler_cache_stats_file(self):
+        return os.path.join(str(self.build_dir),
+                            COMPILER_CACHE_STATS_FILENAME)
+
+    ##
+    # Gets the (hits, misses) of the compiler cache, None if it is not used.
+    def get_compiler_cache_stats(self):
+        if self.compiler_launcher is None:
+            return None
+        return read_compiler_cache_stats(self.get_compiler_cache_stats_file())
+
     ##
     # Runs cmake with the given options.
     def cmake(self, options=""):
@@ -131,6 +354,12 @@ class Builder:
         if self.verbose_mode:
             cmake_option += " -DCMAKE_VERBOSE_MAKEFILE=ON"
 
+        # use the compiler cache if it is enabled
+        if self.compiler_launcher is not None:
+            for lang in ["C", "CXX"]:
+                cmake_option += " -DCMAKE_%s_COMPILER_LAUNCHER=%s" % (
+                                                lang, self.compiler_launcher)
+
         # In case CMAKE_GENERATOR is defined in environment, 
         # use it in spite of automatically detect it
         if 'cmake_generator' in self.config.APPLICATION:
@@ -142,12 +371,12 @@ class Builder:
         self.log_command(command)
         # for key in sorted(self.build_environ.environ.environ.keys()):
             # print key, "  ", self.build_environ.environ.environ[key]
-        res = subprocess.call(command,
-                              shell=True,
-                              cwd=str(self.build_dir),
-                              env=self.build_environ.environ.environ,
-                              stdout=self.logger.logTxtFile,
-                              stderr=subprocess.STDOUT)
+        res = self.call(command,
+                        shell=True,
+                        cwd=str(self.build_dir),
+                        env=self.build_environ.environ.environ,
+                        stdout=self.logger.logTxtFile,
+                        stderr=subprocess.STDOUT)
 
         self.put_txt_log_in_appli_log_dir("cmake")
         if res == 0:
@@ -166,12 +395,12 @@ class Builder:
         command = command + " " + options
         self.log_command(command)
 
-        res = subprocess.call(command,
-                              shell=True,
-                              cwd=str(self.build_dir),
-                              env=self.build_environ.environ.environ,
-                              stdout=self.logger.logTxtFile,
-                              stderr=subprocess.STDOUT)
+        res = self.call(command,
+                        shell=True,
+                        cwd=str(self.build_dir),
+                        env=self.build_environ.environ.environ,
+                        stdout=self.logger.logTxtFile,
+                        stderr=subprocess.STDOUT)
         self.put_txt_log_in_appli_log_dir("build_configure")
         if res == 0:
             return res
@@ -191,12 +420,20 @@ class Builder:
         command = command + " " + options
         self.log_command(command)
 
-        res = subprocess.call(command,
-                              shell=True,
-                              cwd=str(self.build_dir),
-                              env=self.build_environ.environ.environ,
-                              stdout=self.logger.logTxtFile,
-                              stderr=subprocess.STDOUT)
+        if self.compiler_launcher is not None:
+            # the compilers are called through the launcher
+            for var, compiler in [("CC", "cc"), ("CXX", "c++")]:
+                value = self.build_environ.get(var) or compiler
+                if not value.startswith(self.compiler_launcher):
+                    self.build_environ.set(var, "%s %s" % (
+                                               self.compiler_launcher, value))
+
+        res = self.call(command,
+                        shell=True,
+                        cwd=str(self.build_dir),
+                        env=self.build_environ.environ.environ,
+                        stdout=self.logger.logTxtFile,
+                        stderr=subprocess.STDOUT)
         
         self.put_txt_log_in_appli_log_dir("configure")
         if res == 0:
@@ -240,15 +477,12 @@ CC=\\"hack_libtool\\"%g" libtool'''
 
         # make
         command = 'make'
-        command = command + " -j" + str(nb_proc)
+        if self.jobserver is None:
+            # else -j would make it start its own jobserver
+            command = command + " -j" + str(nb_proc)
         command = command + " " + make_opt
         self.log_command(command)
-        res = subprocess.call(command,
-                              shell=True,
-                              cwd=str(self.build_dir),
-                              env=self.build_environ.environ.environ,
-                              stdout=self.logger.logTxtFile,
-                              stderr=subprocess.STDOUT)
+        res = self.call_build_command(command)
         self.put_txt_log_in_appli_log_dir("make")
         if res == 0:
             return res
@@ -272,12 +506,12 @@ CC=\\"hack_libtool\\"%g" libtool'''
         command = command + " ALL_BUILD.vcxproj"
 
         self.log_command(command)
-        res = subprocess.call(command,
-                              shell=True,
-                              cwd=str(self.build_dir),
-                              env=self.build_environ.environ.environ,
-                              stdout=self.logger.logTxtFile,
-                              stderr=subprocess.STDOUT)
+        res = self.call(command,
+                        shell=True,
+                        cwd=str(self.build_dir),
+                        env=self.build_environ.environ.environ,
+                        stdout=self.logger.logTxtFile,
+                        stderr=subprocess.STDOUT)
         
         self.put_txt_log_in_appli_log_dir("make")
         if res == 0:
@@ -298,12 +532,12 @@ CC=\\"hack_libtool\\"%g" libtool'''
             command = 'make install'
         self.log_command(command)
 
-        res = subprocess.call(command,
-                              shell=True,
-                              cwd=str(self.build_dir),
-                              env=self.build_environ.environ.environ,
-                              stdout=self.logger.logTxtFile,
-                              stderr=subprocess.STDOUT)
+        res = self.call(command,
+                        shell=True,
+                        cwd=str(self.build_dir),
+                        env=self.build_environ.environ.environ,
+                        stdout=self.logger.logTxtFile,
+                        stderr=subprocess.STDOUT)
         
         res_check=self.check_install()
         if res_check > 0 :
@@ -353,12 +587,12 @@ CC=\\"hack_libtool\\"%g" libtool'''
         self.log_command(cmd)
         self.log_command("For more detailed logs, see test logs in %s" % self.build_dir)
 
-        res = subprocess.call(cmd,
-                              shell=True,
-                              cwd=str(self.build_dir),
-                              env=self.launch_environ.environ.environ,
-                              stdout=self.logger.logTxtFile,
-                              stderr=subprocess.STDOUT)
+        res = self.call(cmd,
+                        shell=True,
+                        cwd=str(self.build_dir),
+                        env=self.launch_environ.environ.environ,
+                        stdout=self.logger.logTxtFile,
+                        stderr=subprocess.STDOUT)
 
         self.put_txt_log_in_appli_log_dir("makecheck")
         if res == 0:
@@ -481,18 +715,15 @@ CC=\\"hack_libtool\\"%g" libtool'''
 
         if src.architecture.is_windows():
             make_options = "/maxcpucount:%s" % nb_proc
+        elif self.jobserver is not None:
+            make_options = "" # the jobs are given by MAKEFLAGS
         else :
             make_options = "-j%s" % nb_proc
 
         self.log_command("  " + _("Run build script %s\n") % script)
         self.complete_environment(make_options)
         
-        res = subprocess.call(script, 
-                              shell=True,
-                              stdout=self.logger.logTxtFile,
-                              stderr=subprocess.STDOUT,
-                              cwd=str(self.build_dir),
-                              env=self.build_environ.environ.environ)
+        res = self.call_build_command(script)
 
         res_check=self.check_install()
         if res_check > 0 :
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+"""
+History of the compilation steps of the products of an application,
+used by sat compile --report.
+
+The compile command appends a line per build step (CONFIGURE, MAKE, ...)
+to <workdir>/LOGS/compile_history.txt:
+
+| <datehour> <product> <step> <result, 0 if OK> <time in s> <peak RSS in KB>
+
+separated by tabulations. The steps of a compilation of a product share the
+datehour of the compile command (the parallel compilations have their own
+datehour). The processes append to the file (and remove its oldest records)
+under a lock on compile_history.txt.lock.
+
+| Usage:
+| >> import src.compileHistory as HIST
+| >> builds = HIST.get_last_builds(HIST.read_history(config))
+| >> total, path = HIST.get_critical_path(products_infos, builds)
+"""
+
+import os
+
+try:
+    import fcntl
+except ImportError: # windows
+    fcntl = None
+
+import src
+import src.debug as DBG
+
+HISTORY_FILENAME = "compile_history.txt"
+MAX_RECORDS = 20000 # the oldest records are removed beyond
+
+def get_history_file(config):
+    '''Get the path of the history file of the application.
+
+    :param config Config: The global configuration.
+    :rtype: str
+    '''
+    return os.path.join(config.APPLICATION.workdir, "LOGS", HISTORY_FILENAME)
+
+def add_record(config, p_name, step, res, duration, max_rss):
+    '''Append the record of a build step to the history file.
+
+    :param config Config: The global configuration.
+    :param p_name str: The product name.
+    :param step str: The step (CMAKE, MAKE, ...).
+    :param res int: The result of the step, 0 if it is OK.
+    :param duration float: The duration of the step, in seconds.
+    :param max_rss int: The peak resident set size of the processes of the
+                        step, in KB, 0 if it is unknown.
+    '''
+    path = get_history_file(config)
+    line = "\t".join([config.VARS.datehour, p_name, step, str(res),
+                      "%.2f" % duration, str(max_rss)]) + "\n"
+    try:
+        src.ensure_path_exists(os.path.dirname(path))
+        # the file is replaced by trim_history: the lock is another file
+        with open(path + ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            with open(path, "a") as f:
+                f.write(line)
+            if os.path.getsize(path) > MAX_RECORDS * 100:
+                trim_history(path)
+    except (IOError, OSError) as e:
+        DBG.write("compile history problem", (path, str(e)))
+
+def trim_history(path):
+    '''Keep the MAX_RECORDS last records of the history file, the lock
+       of the file being taken (see add_record).'''
+    with open(path) as f:
+        lines = f.readlines()
+    if len(lines) <= MAX_RECORDS:
+        return
+    tmp_path = "%s.%d" % (path, os.getpid())
+    with open(tmp_path, "w") as f:
+        f.writelines(lines[-MAX_RECORDS:])
+    os.rename(tmp_path, path)
+
+def read_history(config):
+    '''Read the records of the history file of the application.
+
+    :param config Config: The global configuration.
+    :return: The list of (datehour, product, step, result, time, max_rss),
+             the oldest first.
+    :rtype: list
+    '''
+    path = get_history_file(config)
+    res = []
+    if not os.path.exists(path):
+        return res
+    with open(path) as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            try:
+                res.append((fields[0], fields[1], fields[2], int(fields[3]),
+                            float(fields[4]), int(fields[5])))
+            except (IndexError, ValueError): # truncated line
+                continue
+    return res
+
+def get_last_builds(records):
+    '''Get the last compilation of each product from the records.
+
+    :param records list: The records (see read_history).
+    :return: product name -> {"date", "time" (sum of the steps), "max_rss",
+             "passed" (0 if all the steps are OK), "steps" : [(step, time)]}
+    :rtype: dict
+    '''
+    res = {}
+    for date, p_name, step, passed, duration, max_rss in records:
+        build = res.get(p_name)
+        if build is None or build["date"] != date:
+            # the records are in the order of the compilations
+            build = {"date" : date, "time" : 0., "max_rss" : 0, "passed" : 0,
+                     "steps" : []}
+            res[p_name] = build
+        build["time"] += duration
+        build["max_rss"] = max(build["max_rss"], max_rss)
+        build["passed"] = max(build["passed"], passed)
+        build["steps"].append((step, duration))
+    return res
+
+def get_critical_path(products_infos, builds):
+    '''Get the critical path of the compilation of the products: the chain
+       of dependencies whose compilation is the longest, which cannot be
+       shortened by compiling the products in parallel.
+
+    :param products_infos list: List of (product_name, product_info),
+                                in the topological order, with depend_all.
+    :param builds dict: The last compilations (see get_last_builds), the
+                        products which are not in it count for 0s.
+    :return: (the duration of the path, the product names of the path,
+             the first compiled first)
+    :rtype: tuple
+    '''
+    names = set([p_name for p_name, p_info in products_infos])
+    end = {} # product name -> the end of its compilation on the path
+    previous = {} # product name -> the previous product on its path
+    for p_name, p_info in products_infos:
+        start = 0.
+        previous[p_name] = None
+        if "depend_all" in p_info:
+            for dep in p_info.depend_all:
+                if dep in names and end[dep] > start:
+                    start = end[dep]
+                    previous[p_name] = dep
+        duration = builds[p_name]["time"] if p_name in builds else 0.
+        end[p_name] = start + duration
+    if not end:
+        return 0., []
+    last = max(end, key=lambda p_name: end[p_name])
+    path = []
+    p_name = last
+    while p_name is not None:
+        path.insert(0, p_name)
+        p_name = previous[p_name]
+    return end[last], path
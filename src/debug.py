@@ -270,15 +270,20 @@ def _saveConfigRecursiveDbg(config, aStream, indent, path, nb):
     '''
     
     try: #type config, mapping
-      order = object.__getattribute__(config, 'order')
       data = object.__getattribute__(config, 'data')
     except:
       aStream.write("%s%s : '%s'\n" % (indstr, path, str(config)))
       return     
-    for key in sorted(data): #order): # data as sort alphabetical, order as initial order
+    for key in sorted(data): # data as sort alphabetical, not as initial order
       value = data[key]
       strType = str(type(value))
       if debug: print('strType %s %s %s' % (path, key, strType))
+      if "DeferredConfig" in strType:
+        try: # read on first access
+          value = config[key]
+          strType = str(type(value))
+        except AttributeError:
+          continue
       if "Config" in strType:
         _saveConfigRecursiveDbg(value, aStream, indentp, path+"."+key, nbp)
         continue
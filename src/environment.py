@@ -229,23 +229,10 @@ class SalomeEnviron:
         return "%s(\n%s\n)" % (self.__class__.__name__, PP.pformat(res))
 
     def __set_sorted_products_list(self):
-        all_products_infos = src.product.get_products_infos(
-                                 self.cfg.APPLICATION.products,
-                                 self.cfg)
-        
-        from compile import get_dependencies_graph,depth_first_topo_graph
-        all_products_graph=get_dependencies_graph(all_products_infos, self.forBuild)
-        visited_nodes=[]
-        sorted_nodes=[]
-        for n in all_products_graph:
-            if n not in visited_nodes:
-                visited_nodes,sorted_nodes=depth_first_topo_graph(
-                                               all_products_graph, 
-                                               n, 
-                                               visited_nodes,
-                                               sorted_nodes)
-        self.sorted_product_list=sorted_nodes
-        self.all_products_graph=all_products_graph
+        all_products_graph = src.product.get_products_graph(self.cfg,
+                                                            self.forBuild)
+        self.sorted_product_list = all_products_graph.topological_sort()
+        self.all_products_graph = all_products_graph
 
 
     def append(self, key, value, sep=os.pathsep):
@@ -786,10 +773,7 @@ class SalomeEnviron:
 
         # use the sorted list of all products to sort the list of products 
         # we have to set
-        visited=[]
-        from compile import depth_search_graph # to get the dependencies
-        for p_name in env_info:
-            visited=depth_search_graph(self.all_products_graph, p_name, visited)
+        visited = set(self.all_products_graph.depth_search(env_info))
         sorted_product_list=[]
         for n in self.sorted_product_list:
             if n in visited:
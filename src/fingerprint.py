@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+"""
+Build fingerprints of the products, used by sat compile --incremental.
+
+The fingerprint of a product is a hash of:
+
+- its sources: the git tree id of the source directory (with the
+  uncommitted modifications) when it is a git repository, else a hash
+  of the names, modes and contents of the files,
+- its evaluated configuration,
+- the compilation environment (environ of the application, distribution,
+  compiler variables of the shell),
+- the fingerprints of the products it depends upon.
+
+It is stored in the installation directory of the product, next to the
+sat-config-<product>.pyconf file, when the product is compiled.
+Unlike the dates of the directories, it does not change after a git checkout
+of the same commit, an extraction of the same archive or a copy.
+
+| Usage:
+| >> import src.fingerprint as FGP
+| >> fingerprints = FGP.Fingerprints(config)
+| >> fingerprints.get_changes("KERNEL")
+| ['sources changed']
+"""
+
+import os
+import stat
+import shutil
+import hashlib
+import tempfile
+import subprocess as SP
+
+import src
+import src.debug as DBG
+
+FINGERPRINT_FILENAME = "sat-fingerprint-" # the fingerprint of a compilation
+
+# the keys of the product configuration set by the compile command
+_VOLATILE_KEYS = ["depend_all", "git_tag_description", "install_dir_save"]
+
+# the variables of the shell used by the compilers and build systems
+_COMPILE_VARIABLES = ["CC", "CXX", "FC", "F77", "CPP", "CFLAGS", "CXXFLAGS",
+                      "CPPFLAGS", "FFLAGS", "FCFLAGS", "LDFLAGS", "LIBS",
+                      "CMAKE_GENERATOR", "CMAKE_BUILD_TYPE"]
+
+def get_git_tree(source_dir):
+    '''Get the id of the git tree of a source directory, with the modified
+       and the untracked (not ignored) files, without modifying the index
+       of the repository.
+
+    :param source_dir str: The source directory, root of a git repository.
+    :return: The tree id, or None if it cannot be computed by git.
+    :rtype: str
+    '''
+    try:
+        p = SP.Popen(["git", "rev-parse", "--git-path", "index"],
+                     cwd=source_dir, stdout=SP.PIPE, stderr=SP.PIPE)
+        out, __ = p.communicate()
+        if p.returncode != 0:
+            return None
+        index = os.path.join(source_dir, out.decode("utf-8").strip())
+        tmp_dir = tempfile.mkdtemp(prefix="sat_fingerprint_")
+        try:
+            env = dict(os.environ)
+            env["GIT_INDEX_FILE"] = os.path.join(tmp_dir, "index")
+            if os.path.exists(index):
+                shutil.copy(index, env["GIT_INDEX_FILE"])
+            p = SP.Popen(["git", "add", "-A", "."], cwd=source_dir, env=env,
+                         stdout=SP.PIPE, stderr=SP.PIPE)
+            p.communicate()
+            if p.returncode != 0:
+                return None
+            p = SP.Popen(["git", "write-tree"], cwd=source_dir, env=env,
+                         stdout=SP.PIPE, stderr=SP.PIPE)
+            out, __ = p.communicate()
+            if p.returncode != 0:
+                return None
+            return "git:" + out.decode("utf-8").strip()
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except OSError: # no git
+        return None
+
+def get_tree_hash(source_dir):
+    '''Get a hash of the relative paths, the executable mode and the contents
+       of the files of a directory (the targets of the symbolic links).
+
+    :param source_dir str: The directory.
+    :return: The hash.
+    :rtype: str
+    '''
+    h = hashlib.sha1()
+    for root, dirs, files in os.walk(source_dir):
+        dirs.sort()
+        rel_root = os.path.relpath(root, source_dir)
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            h.update(os.path.join(rel_root, name).encode("utf-8", "replace"))
+            st = os.lstat(path)
+            if stat.S_ISLNK(st.st_mode):
+                h.update(b"l" + os.readlink(path).encode("utf-8", "replace"))
+                continue
+            h.update(b"x" if st.st_mode & stat.S_IXUSR else b"f")
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(chunk)
+    return "files:" + h.hexdigest()
+
+def get_source_hash(source_dir):
+    '''Get the hash of the sources of a product: the git tree id if the
+       source directory is a git repository, else the hash of the files.
+
+    :param source_dir str: The source directory.
+    :return: The hash, or "" if there are no sources.
+    :rtype: str
+    '''
+    if not os.path.isdir(source_dir):
+        return ""
+    if os.path.exists(os.path.join(source_dir, ".git")):
+        tree = get_git_tree(source_dir)
+        if tree is not None:
+            return tree
+    return get_tree_hash(source_dir)
+
+def config_to_text(value, excluded=()):
+    '''Get a text representation of an evaluated pyconf value, the keys of
+       the mappings being sorted.
+
+    :param value: The pyconf Mapping, Sequence or value.
+    :param excluded list: The keys of the mapping to ignore.
+    :rtype: str
+    '''
+    if isinstance(value, src.pyconf.Mapping):
+        items = []
+        for key in sorted(value.keys()):
+            if key in excluded:
+                continue
+            try:
+                item = config_to_text(value[key])
+            except Exception:
+                # some information cannot be evaluated (see
+                # add_compile_config_file), they are used as written
+                item = str(object.__getattribute__(value, "data").get(key))
+            items.append("%s:%s" % (key, item))
+        return "{%s}" % ",".join(items)
+    if isinstance(value, src.pyconf.Sequence):
+        return "[%s]" % ",".join([config_to_text(v) for v in value])
+    return repr(value)
+
+def get_hash(text):
+    return hashlib.sha1(text.encode("utf-8", "replace")).hexdigest()
+
+class Fingerprints(object):
+    """
+    The fingerprints of the products of an application, computed once.
+    """
+    def __init__(self, config):
+        """\
+        :param config Config: The global configuration.
+        """
+        self.config = config
+        self.fingerprints = {} # product name -> fingerprint dict
+
+    def get_environ_hash(self):
+        '''Get the hash of the compilation environment common to the products.
+        '''
+        text = "dist:%s" % self.config.VARS.dist
+        if "environ" in self.config.APPLICATION:
+            text += config_to_text(self.config.APPLICATION.environ)
+        for var in _COMPILE_VARIABLES:
+            text += ",%s=%s" % (var, os.environ.get(var, ""))
+        return get_hash(text)
+
+    def get_fingerprint(self, p_name):
+        '''Get the fingerprint of a product and of its components.
+
+        :param p_name str: The product name.
+        :return: {"fingerprint", "sources", "config", "environ" : hash,
+                  "depend" : {product name : fingerprint}}
+        :rtype: dict
+        '''
+        if p_name in self.fingerprints:
+            return self.fingerprints[p_name]
+        p_info = src.product.get_product_config(self.config, p_name)
+        res = {"depend" : {}}
+        if src.product.product_is_native(p_info) or \
+           src.product.product_is_fixed(p_info):
+            # not compiled by sat: only the version and the location matter
+            res["sources"] = ""
+            res["environ"] = ""
+            res["config"] = get_hash("%s:%s:%s" % (p_info.get_source,
+                                     p_info.version, p_info.install_dir))
+        else:
+            res["sources"] = get_source_hash(p_info.source_dir)
+            res["environ"] = self.get_environ_hash()
+            res["config"] = get_hash(config_to_text(p_info, _VOLATILE_KEYS))
+            depend = list(p_info.depend)
+            if "build_depend" in p_info:
+                depend += list(p_info.build_depend)
+            for dep in depend:
+                if dep in self.config.APPLICATION.products:
+                    res["depend"][dep] = self.get_fingerprint(dep)["fingerprint"]
+        text = "%(sources)s,%(config)s,%(environ)s" % res
+        for dep in sorted(res["depend"]):
+            text += ",%s:%s" % (dep, res["depend"][dep])
+        res["fingerprint"] = get_hash(text)
+        self.fingerprints[p_name] = res
+        return res
+
+    def get_fingerprint_file(self, p_info):
+        return os.path.join(p_info.install_dir,
+                            FINGERPRINT_FILENAME + p_info.name + ".pyconf")
+
+    def read_fingerprint(self, p_info):
+        '''Read the fingerprint stored at the compilation of a product.
+
+        :param p_info Config: The specific config of the product.
+        :return: The fingerprint dict (see get_fingerprint), None if there
+                 is no stored fingerprint.
+        :rtype: dict
+        '''
+        path = self.get_fingerprint_file(p_info)
+        if not os.path.exists(path):
+            return None
+        try:
+            cfg = src.pyconf.Config(path)
+            res = {"depend" : {}}
+            for key in ["fingerprint", "sources", "config", "environ"]:
+                res[key] = cfg[key]
+            for dep in cfg.depend:
+                res["depend"][dep] = cfg.depend[dep]
+        except Exception as e:
+            DBG.write("read_fingerprint problem", (path, str(e)))
+            return None
+        return res
+
+    def write_fingerprint(self, p_info):
+        '''Write the fingerprint of a product in its installation directory.
+
+        :param p_info Config: The specific config of the product.
+        '''
+        fingerprint = self.get_fingerprint(p_info.name)
+        res = src.pyconf.Config()
+        for key in ["fingerprint", "sources", "config", "environ"]:
+            res.addMapping(key, fingerprint[key], "")
+        res.addMapping("depend", src.pyconf.Mapping(res), "")
+        for dep in sorted(fingerprint["depend"]):
+            res.depend.addMapping(dep, fingerprint["depend"][dep], "")
+        with open(self.get_fingerprint_file(p_info), 'w') as f:
+            res.__save__(f)
+
+    def get_changes(self, p_name):
+        '''Get the reasons why a product has to be compiled again.
+
+        :param p_name str: The product name.
+        :return: The reasons, empty if the fingerprint of the installed
+                 product is the current one.
+        :rtype: list
+        '''
+        p_info = src.product.get_product_config(self.config, p_name)
+        # computed before the compilation, which modifies the environment
+        current = self.get_fingerprint(p_name)
+        if not src.product.check_installation(self.config, p_info):
+            return [_("not installed")]
+        stored = self.read_fingerprint(p_info)
+        if stored is None:
+            return [_("no fingerprint")]
+        if stored["fingerprint"] == current["fingerprint"]:
+            return []
+        res = []
+        if stored["sources"] != current["sources"]:
+            res.append(_("sources changed"))
+        if stored["config"] != current["config"]:
+            res.append(_("configuration changed"))
+        if stored["environ"] != current["environ"]:
+            res.append(_("compilation environment changed"))
+        for dep in current["depend"]:
+            if dep not in stored["depend"]:
+                res.append(_("new dependency %s") % dep)
+            elif stored["depend"][dep] != current["depend"][dep]:
+                res.append(_("dependency %s changed") % dep)
+        for dep in stored["depend"]:
+            if dep not in current["depend"]:
+                res.append(_("dependency %s removed") % dep)
+        return res
@@ -0,0 +1,319 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+"""
+Downloads of the archives from the ftp servers of PATHS.ARCHIVEFTP, used by
+sat source and sat install (see src.find_file_in_ftppath).
+
+The connections to the servers are kept in a pool for the whole sat command:
+the next downloads from a server reuse a connection already logged in, which
+changes its directory only when needed. The parallel downloads (sat source
+--network_jobs) open at most MAX_CONNECTIONS connections per server, the
+others wait for a free connection: the bandwidth of a server is shared by a
+few transfers rather than split between all of them.
+
+A file is downloaded into <file>.part, renamed when it is complete. An
+interrupted download (broken connection, sat interrupted) is resumed where it
+stopped, with the REST command of ftp, by the next try or the next sat
+command. The checksum files of the archives (see src.checksum) detect the
+files which changed on the server between two tries.
+
+| Usage:
+| >> import src.ftpPool as FTPP
+| >> FTPP.get_pool().download("ftp.xxx.yyy", ["dir1", "dir2"], "P-1.0.tgz",
+| >>                          "/tmp/P-1.0.tgz", logger)
+"""
+
+import os
+import time
+import atexit
+import socket
+import ftplib
+import threading
+
+import src
+import src.debug as DBG
+
+# the maximum number of simultaneous connections to a server
+MAX_CONNECTIONS = 2
+TIMEOUT = 60 # s, without any data
+TRIES = 3
+RETRY_WAIT = 5 # s
+CHUNK_SIZE = 1024 * 1024
+PART_EXT = ".part"
+
+# the errors of a connection, the download is tried again
+NETWORK_ERRORS = (ftplib.error_temp, ftplib.error_reply, ftplib.error_proto,
+                  socket.error, EOFError)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    '''Get the pool of ftp connections shared by the downloads of the
+       sat command.
+
+    :rtype: FtpPool
+    '''
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = FtpPool()
+            atexit.register(_pool.close)
+        return _pool
+
+class FtpConnection(object):
+    """
+    A connection to a ftp server, logged in.
+    """
+    def __init__(self, server, timeout=TIMEOUT):
+        """\
+        :param server str: The server, host[:port].
+        :param timeout float: The timeout of the socket operations.
+        """
+        self.server = server
+        host, __, port = server.partition(":")
+        self.ftp = ftplib.FTP()
+        self.ftp.connect(host, int(port) if port else 0, timeout)
+        self.ftp.login()
+        self.ftp.voidcmd("TYPE I") # SIZE is refused in ascii mode
+        self.home = self.ftp.pwd()
+        self.directories = []
+
+    def cwd(self, directories, logger):
+        '''Change the directory, if it is not the current one.
+
+        :param directories list: The directories, from the login directory.
+        :param logger Logger: The logger instance to use.
+        '''
+        if directories == self.directories:
+            return
+        self.directories = None # unknown if a cwd fails
+        self.ftp.cwd(self.home)
+        for directory in directories:
+            logger.write("   Change directory to %s\n" % directory, 3)
+            self.ftp.cwd(directory)
+        self.directories = list(directories)
+
+    def size(self, file_name):
+        '''Get the size of a file of the current directory.
+
+        :param file_name str: The file name.
+        :return: The size, None if the file is not found.
+        :rtype: int
+        '''
+        try:
+            return self.ftp.size(file_name)
+        except ftplib.error_perm:
+            return None
+
+    def is_alive(self):
+        try:
+            self.ftp.voidcmd("NOOP")
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        try:
+            self.ftp.quit()
+        except Exception:
+            self.ftp.close()
+
+class FtpPool(object):
+    """
+    The connections to the ftp servers, shared by the threads.
+    """
+    def __init__(self, max_connections=MAX_CONNECTIONS, timeout=TIMEOUT,
+                 tries=TRIES, retry_wait=RETRY_WAIT):
+        """\
+        :param max_connections int: The maximum number of simultaneous
+                                    connections to a server.
+        :param timeout float: The timeout of the connections.
+        :param tries int: The number of tries of a download.
+        :param retry_wait float: The time to wait between two tries.
+        """
+        self.max_connections = max(1, max_connections)
+        self.timeout = timeout
+        self.tries = max(1, tries)
+        self.retry_wait = retry_wait
+        self.lock = threading.Lock()
+        self.idle = {} # server -> the connections not used
+        self.slots = {} # server -> semaphore of the connections
+        self.file_locks = {} # destination -> lock
+        self.nb_connections = 0 # the connections opened
+
+    def get_slot(self, server):
+        with self.lock:
+            if server not in self.slots:
+                self.slots[server] = threading.BoundedSemaphore(
+                                                         self.max_connections)
+            return self.slots[server]
+
+    def get_file_lock(self, destination):
+        with self.lock:
+            return self.file_locks.setdefault(destination, threading.Lock())
+
+    def acquire(self, server, logger):
+        '''Get a connection to a server, from the pool or new, waits if
+           MAX_CONNECTIONS connections to the server are used.
+
+        :param server str: The server, host[:port].
+        :param logger Logger: The logger instance to use.
+        :rtype: FtpConnection
+        '''
+        slot = self.get_slot(server)
+        slot.acquire()
+        try:
+            while True:
+                with self.lock:
+                    idle = self.idle.get(server, [])
+                    connection = idle.pop() if idle else None
+                if connection is None:
+                    break
+                if connection.is_alive():
+                    return connection
+                connection.close() # closed by the server
+            logger.write("   Connect to ftp server %s\n" % server, 3)
+            connection = FtpConnection(server, self.timeout)
+            with self.lock:
+                self.nb_connections += 1
+            return connection
+        except:
+            slot.release()
+            raise
+
+    def release(self, connection, broken=False):
+        '''Give back a connection taken with acquire.
+
+        :param connection FtpConnection: The connection.
+        :param broken boolean: If True, the connection is closed.
+        '''
+        if broken:
+            connection.close()
+        else:
+            with self.lock:
+                self.idle.setdefault(connection.server, []).append(connection)
+        self.get_slot(connection.server).release()
+
+    def close(self):
+        '''Close the connections not used.'''
+        with self.lock:
+            connections = [c for l in self.idle.values() for c in l]
+            self.idle = {}
+        for connection in connections:
+            connection.close()
+
+    def download(self, server, directories, file_name, destination, logger,
+                 checksums=None):
+        '''Download a file, into destination.part renamed when it is
+           complete. The download is resumed if destination.part exists,
+           and tried again if the connection is broken.
+
+        :param server str: The server, host[:port].
+        :param directories list: The directories of the file, from the
+                                 login directory.
+        :param file_name str: The name of the file.
+        :param destination str: The path of the downloaded file.
+        :param logger Logger: The logger instance to use.
+        :param checksums list: The hashlib objects to update with the bytes
+                               of the file.
+        :return: True if the file is downloaded, False if it is not found
+                 (or empty).
+        :rtype: boolean
+        '''
+        with self.get_file_lock(destination):
+            return self._download(server, directories, file_name, destination,
+                                  logger, checksums or [])
+
+    def _download(self, server, directories, file_name, destination, logger,
+                  checksums):
+        part = destination + PART_EXT
+        hashed = [0] # the bytes of the part given to the checksums
+        for nbtry in range(self.tries):
+            if nbtry > 0:
+                time.sleep(self.retry_wait)
+            try:
+                connection = self.acquire(server, logger)
+            except NETWORK_ERRORS as e:
+                error = e
+                continue
+            broken = True
+            try:
+                connection.cwd(directories, logger)
+                size = connection.size(file_name)
+                if not size:
+                    broken = False
+                    return False
+                offset = os.path.getsize(part) if os.path.exists(part) else 0
+                if offset > size or offset < hashed[0]:
+                    if hashed[0] > 0:
+                        os.remove(part)
+                        raise src.SatException(
+                            _("%s changed on the ftp server %s during its "
+                              "download") % (file_name, server))
+                    offset = 0 # another file
+                if offset > 0:
+                    logger.write("   Resume the download of %s at %.1f MB\n" %
+                                 (file_name, offset / 1e6), 3)
+                t0 = time.time()
+                with open(part, "ab" if offset else "wb") as f:
+                    # the bytes of a previous download
+                    self.update_checksums(part, hashed, offset, checksums)
+                    def write(data):
+                        f.write(data)
+                        for checksum in checksums:
+                            checksum.update(data)
+                        hashed[0] += len(data)
+                    if offset < size:
+                        connection.ftp.retrbinary("RETR " + file_name, write,
+                                                  CHUNK_SIZE, offset or None)
+                if os.path.getsize(part) != size:
+                    raise EOFError("%s: %d bytes received, %d expected" %
+                                   (file_name, os.path.getsize(part), size))
+                os.rename(part, destination)
+                broken = False
+                duration = max(time.time() - t0, 0.001)
+                logger.write("   Downloaded %s: %.1f MB in %.1fs (%.1f MB/s)\n" %
+                             (file_name, (size - offset) / 1e6, duration,
+                              (size - offset) / 1e6 / duration), 5)
+                return True
+            except NETWORK_ERRORS as e:
+                error = e
+                DBG.write("ftp download interrupted", (file_name, str(e)))
+                logger.write("   Download of %s interrupted: %s\n" %
+                             (file_name, e), 3)
+            finally:
+                self.release(connection, broken)
+        raise error
+
+    def update_checksums(self, part, hashed, offset, checksums):
+        '''Update the checksums with the bytes of the part file which are
+           not given to them yet, up to offset.'''
+        if not checksums or hashed[0] >= offset:
+            return
+        with open(part, "rb") as f:
+            f.seek(hashed[0])
+            while hashed[0] < offset:
+                data = f.read(min(CHUNK_SIZE, offset - hashed[0]))
+                if not data:
+                    break
+                for checksum in checksums:
+                    checksum.update(data)
+                hashed[0] += len(data)
@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+"""
+Local mirror of the git repositories of the products, used by sat source.
+
+The mirror is a directory, set by LOCAL.git_mirror in data/local.pyconf
+(see sat init --git_mirror), containing a bare copy (git clone --mirror)
+of each remote repository:
+
+| <git_mirror>/<name of the repository>-<hash of the url>.git
+
+A repository is fetched at most once per sat command, and not at all when
+the tag of the product is already in the mirror (a tag does not move).
+The sources are then got from the mirror, without the network:
+
+- a tag is cloned with --depth 1 --branch <tag>, only its files are copied,
+- a branch (or the development mode) is a full clone of the mirror, whose
+  objects are hard links to the ones of the mirror (the git clones of a
+  local repository), the origin of the clone is the remote repository,
+- a sub_dir of a product is extracted with git archive.
+
+With sat source --offline, the repositories are not fetched, the products
+which are not in the mirror fail.
+
+| Usage:
+| >> import src.gitMirror as MIRROR
+| >> mirror = MIRROR.GitMirror.from_config(config)
+| >> if mirror is not None and mirror.can_extract(git_options):
+| >>     res = mirror.extract(remote, tag, where, logger, environ)
+"""
+
+import os
+import re
+import time
+import shutil
+import hashlib
+import threading
+import subprocess as SP
+
+try:
+    import fcntl
+except ImportError: # windows
+    fcntl = None
+
+import src
+import src.debug as DBG
+import src.utilsSat as UTS
+
+def get_repo_name(remote):
+    '''Get the name of the mirror of a remote repository.
+
+    :param remote str: The url of the remote repository.
+    :rtype: str
+    '''
+    name = re.sub(r"\.git$", "", remote.rstrip("/")).split("/")[-1]
+    name = re.sub(r"[^\w.-]", "_", name.split(":")[-1]) or "repo"
+    key = hashlib.sha1(remote.encode("utf-8", "replace")).hexdigest()
+    return "%s-%s.git" % (name, key[:12])
+
+def get_ref_type(git_dir, tag):
+    '''Get the type of a tag of a product in a git repository.
+
+    :param git_dir str: The git directory of the repository.
+    :param tag str: The tag (a tag, a branch or a commit).
+    :return: "tag", "branch", "commit", or None if it is not in the repository
+    :rtype: str
+    '''
+    for ref_type, ref in [("tag", "refs/tags/%s" % tag),
+                          ("branch", "refs/heads/%s" % tag),
+                          ("commit", "%s^{commit}" % tag)]:
+        p = SP.Popen(["git", "--git-dir=%s" % git_dir, "rev-parse", "--verify",
+                      "-q", ref], stdout=SP.PIPE, stderr=SP.PIPE)
+        p.communicate()
+        if p.returncode == 0:
+            return ref_type
+    return None
+
+class GitMirror(object):
+    """
+    The local mirror of the git repositories.
+    """
+    def __init__(self, mirror_dir, offline=False):
+        """\
+        :param mirror_dir str: The directory of the mirror.
+        :param offline boolean: If True, the repositories are not fetched.
+        """
+        self.mirror_dir = mirror_dir
+        self.offline = offline
+        self.updated = {} # remote -> True if the mirror can be used
+        self.locks = {} # remote -> lock of the threads using the remote
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, offline=False):
+        """\
+        Get the git mirror set in the LOCAL section of the configuration.
+
+        :param config Config: The global configuration.
+        :param offline boolean: If True, the repositories are not fetched.
+        :return: The git mirror, None if there is no git mirror.
+        :rtype: GitMirror
+        """
+        if "git_mirror" not in config.LOCAL or \
+           config.LOCAL.git_mirror in ["none", "no", ""]:
+            return None
+        return cls(config.LOCAL.git_mirror, offline)
+
+    def can_extract(self, git_options):
+        '''Check if the sources of a product can be got from the mirror:
+           the specific git options (submodules, ...) are not supported.
+
+        :param git_options str: The git_options of the product.
+        :rtype: boolean
+        '''
+        return git_options.strip() == ""
+
+    def get_repo_path(self, remote):
+        return os.path.join(self.mirror_dir, get_repo_name(remote))
+
+    def get_lock(self, remote):
+        with self.lock:
+            return self.locks.setdefault(remote, threading.Lock())
+
+    def update(self, remote, tag, logger, environment=None, retry_wait=None):
+        '''Create or fetch the mirror of a remote repository, if it is needed
+           for the tag, once per command.
+
+        :param remote str: The url of the remote repository.
+        :param tag str: The tag of the product.
+        :param logger Logger: The logger instance to use.
+        :param environment src.environment.Environ: The environment to
+                                                    source when fetching.
+        :param retry_wait function: The function called with the delay
+                                    in seconds before a new try.
+        :return: True if the mirror of the repository can be used.
+        :rtype: boolean
+        '''
+        with self.get_lock(remote):
+            repo_path = self.get_repo_path(remote)
+            if remote in self.updated:
+                return self.updated[remote]
+            if os.path.isdir(repo_path) and \
+               get_ref_type(repo_path, tag) in ["tag", "commit"]:
+                # the tags and the commits do not change: no fetch
+                return True
+            if self.offline:
+                if not os.path.isdir(repo_path):
+                    logger.error(_("The repository %(remote)s is not in the "
+                                   "git mirror %(dir)s, it cannot be got "
+                                   "offline") % {"remote" : remote,
+                                                 "dir" : self.mirror_dir})
+                    self.updated[remote] = False
+                else:
+                    self.updated[remote] = True
+                return self.updated[remote]
+            try:
+                os.makedirs(self.mirror_dir)
+            except OSError: # exists, or created by another thread
+                pass
+            lock_file = None
+            if fcntl is not None: # the mirror is shared by the sat processes
+                lock_file = open(repo_path + ".lock", "a")
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self.updated[remote] = self._fetch(remote, repo_path, logger,
+                                                   environment, retry_wait)
+            finally:
+                if lock_file is not None:
+                    lock_file.close()
+            return self.updated[remote]
+
+    def _fetch(self, remote, repo_path, logger, environment, retry_wait):
+        '''Clone or fetch the mirror of a repository, with 3 tries.'''
+        tmp_path = "%s.tmp%d" % (repo_path, os.getpid())
+        exists = os.path.isdir(repo_path)
+        if exists:
+            cmd = "git --git-dir=%s fetch --prune origin" % repo_path
+        else:
+            cmd = "rm -rf %(tmp)s && git clone --mirror %(remote)s %(tmp)s" % {
+                  "tmp" : tmp_path, "remote" : remote}
+        logger.write(_("Update the git mirror %s\n") % repo_path, 5)
+        logger.logTxtFile.write("\n" + cmd + "\n")
+        logger.logTxtFile.flush()
+        if retry_wait is None:
+            retry_wait = time.sleep
+        t0 = time.time()
+        env = environment.environ.environ if environment is not None else None
+        for i_try in range(3):
+            rc = UTS.Popen(cmd, cwd=self.mirror_dir, env=env, logger=logger)
+            if rc.isOk() or i_try == 2:
+                break
+            logger.write(_('\ngit command failed! Wait %d seconds and give an '
+                           'other try (%d/%d)\n') % (30, i_try + 2, 3), 3)
+            retry_wait(30)
+        if not exists:
+            if rc.isOk():
+                os.rename(tmp_path, repo_path)
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        elif not rc.isOk():
+            # the mirror is used as it is, the tag may be in it
+            logger.warning(_("The git mirror %s cannot be fetched") % repo_path)
+            return True
+        DBG.write("git mirror %s updated in %.1fs" % (repo_path,
+                                                     time.time() - t0), rc.isOk())
+        return rc.isOk()
+
+    def extract(self, remote, tag, where, logger, environment=None,
+                shallow=True, retry_wait=None):
+        '''Get the sources of a product from the mirror, as git_extract.
+
+        :param remote str: The remote git repository.
+        :param tag str: The tag.
+        :param where Path: The path where to extract.
+        :param logger Logger: The logger instance to use.
+        :param environment src.environment.Environ: The environment to
+                                                    source when extracting.
+        :param shallow boolean: If True, a tag is cloned without its history.
+        :param retry_wait function: The function called with the delay
+                                    in seconds before a new try.
+        :return: True if the extraction is successful
+        :rtype: boolean
+        '''
+        if not self.update(remote, tag, logger, environment, retry_wait):
+            return False
+        repo_path = self.get_repo_path(remote)
+        ref_type = get_ref_type(repo_path, tag)
+        if ref_type is None and tag not in ["master", "HEAD"]:
+            logger.error(_("The tag %(tag)s is not in the repository %(remote)s") %
+                         {"tag" : tag, "remote" : remote})
+            return False
+        aDict = {"mirror" : repo_path,
+                 "remote" : remote,
+                 "tag" : tag,
+                 "where" : str(where),
+                 "where_git" : os.path.join(str(where), ".git")}
+        if shallow and ref_type == "tag":
+            # the files of the tag only
+            cmd = r"""
+set -x
+rm -rf %(where)s
+git clone --depth 1 --branch %(tag)s file://%(mirror)s %(where)s && \
+git --git-dir=%(where_git)s remote set-url origin %(remote)s
+"""
+        elif tag in ["master", "HEAD"]:
+            cmd = r"""
+set -x
+rm -rf %(where)s
+git clone %(mirror)s %(where)s && \
+git --git-dir=%(where_git)s remote set-url origin %(remote)s
+res=$?
+if [ $res -eq 0 ]; then
+  touch -d "$(git --git-dir=%(where_git)s  log -1 --format=date_format)" %(where)s
+fi
+exit $res
+"""
+        else:
+            # for sat compile --update : changes the date of directory,
+            # only for branches, not tag
+            cmd = r"""
+set -x
+rm -rf %(where)s
+git clone %(mirror)s %(where)s && \
+git --git-dir=%(where_git)s remote set-url origin %(remote)s && \
+git --git-dir=%(where_git)s --work-tree=%(where)s checkout %(tag)s
+res=$?
+git --git-dir=%(where_git)s status | grep HEAD
+if [ $res -eq 0 -a $? -ne 0 ]; then
+  touch -d "$(git --git-dir=%(where_git)s  log -1 --format=date_format)" %(where)s
+fi
+exit $res
+"""
+        cmd = (cmd % aDict).replace('date_format', '"%ai"')
+        parentWhere = os.path.dirname(str(where))
+        try:
+            os.makedirs(parentWhere)
+        except OSError: # exists, or created by another product
+            pass
+        return self.run_command(cmd, parentWhere, logger, environment)
+
+    def extract_sub_dir(self, remote, tag, where, sub_dir, logger,
+                        environment=None, retry_wait=None):
+        '''Extract a subtree of a repository from the mirror with git archive,
+           as git_extract_sub_dir.
+
+        :param remote str: The remote git repository.
+        :param tag str: The tag.
+        :param where Path: The path where to extract.
+        :param sub_dir str: The relative path of subtree to extract.
+        :param logger Logger: The logger instance to use.
+        :param environment src.environment.Environ: The environment to
+                                                    source when extracting.
+        :param retry_wait function: The function called with the delay
+                                    in seconds before a new try.
+        :return: True if the extraction is successful
+        :rtype: boolean
+        '''
+        strWhere = str(where)
+        parentWhere = os.path.dirname(strWhere)
+        if not os.path.exists(parentWhere):
+            logger.error("not existing directory: %s" % parentWhere)
+            return False
+        if os.path.isdir(strWhere):
+            logger.error("do not override existing directory: %s" % strWhere)
+            return False
+        if not self.update(remote, tag, logger, environment, retry_wait):
+            return False
+        aDict = {"mirror" : self.get_repo_path(remote),
+                 "tag" : tag,
+                 "sub_dir" : sub_dir,
+                 "where" : strWhere,
+                 "tmpWhere" : strWhere + "_tmp"}
+        cmd = r"""
+set -x
+rm -rf %(tmpWhere)s && mkdir %(tmpWhere)s && \
+git --git-dir=%(mirror)s archive -o %(tmpWhere)s/sources.tar %(tag)s %(sub_dir)s && \
+tar -xf %(tmpWhere)s/sources.tar -C %(tmpWhere)s && \
+mv %(tmpWhere)s/%(sub_dir)s %(where)s && \
+git --git-dir=%(mirror)s log -1 %(tag)s > %(where)s/README_git_log.txt
+res=$?
+rm -rf %(tmpWhere)s
+exit $res
+""" % aDict
+        return self.run_command(cmd, parentWhere, logger, environment)
+
+    def run_command(self, cmd, cwd, logger, environment):
+        logger.logTxtFile.write("\n" + cmd + "\n")
+        logger.logTxtFile.flush()
+        DBG.write("cmd", cmd)
+        env = environment.environ.environ if environment is not None else None
+        rc = UTS.Popen(cmd, cwd=cwd, env=env, logger=logger)
+        return rc.isOk()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+"""
+GNU make jobserver shared by the compilations, used by sat compile --jobserver.
+
+The jobserver is a named pipe (fifo) containing one token (one byte) per job
+which can run on the machine. All the sat processes of a user share the same
+fifo, the first one fills it with the tokens, the others join it: the
+compilations started by several sat commands (or by sat compile --jobs) then
+never run more jobs than there are tokens.
+
+The make, ninja and cmake --build commands find the jobserver in the MAKEFLAGS
+variable of the environment (--jobserver-auth=R,W with the file descriptors
+of the fifo for GNU make < 4.4, --jobserver-auth=fifo:PATH else). They must
+be called without -jN, which would make them start their own jobserver.
+Before each build command, sat takes a token for the implicit job of make,
+and gives it back when the command is finished.
+
+The processes using the fifo hold a shared lock on <fifo>.lock, the one which
+gets an exclusive lock is alone and (re)creates the fifo with its tokens. The
+processes join the jobserver one at a time, with an exclusive lock on
+<fifo>.create.lock: the conversion of the exclusive lock of the creator into
+a shared lock is not atomic, another process must not create a second fifo
+in the meantime.
+
+| Usage:
+| >> import src.jobserver as JOBS
+| >> jobserver = JOBS.JobServer(JOBS.get_fifo_path(config), 8)
+| >> jobserver.open()
+| >> builder = src.compilation.Builder(config, logger, p_name, p_info,
+| >>                                   jobserver=jobserver)
+"""
+
+import os
+import re
+import stat
+import errno
+import tempfile
+import subprocess as SP
+
+try:
+    import fcntl
+except ImportError: # windows
+    fcntl = None
+
+import src
+import src.debug as DBG
+
+TOKEN = b"+"
+
+def is_available():
+    '''Check if the jobserver can be used on this platform.
+
+    :rtype: boolean
+    '''
+    return fcntl is not None and not src.architecture.is_windows()
+
+def get_fifo_path(config):
+    '''Get the path of the fifo shared by the sat processes of the user.
+
+    :param config Config: The global configuration.
+    :rtype: str
+    '''
+    return os.path.join(tempfile.gettempdir(),
+                        "sat-jobserver-%s" % config.VARS.user)
+
+def get_make_version():
+    '''Get the version of GNU make, as a tuple of integers.
+
+    :return: The version, (0,) if make is not found.
+    :rtype: tuple
+    '''
+    try:
+        p = SP.Popen(["make", "--version"], stdout=SP.PIPE, stderr=SP.PIPE)
+        out, __ = p.communicate()
+    except OSError:
+        return (0,)
+    match = re.search(r"GNU Make (\d+)\.(\d+)", out.decode("utf-8", "replace"))
+    if match is None:
+        return (0,)
+    return (int(match.group(1)), int(match.group(2)))
+
+class JobServer(object):
+    """
+    The client, and possibly the server, of the jobserver of the user.
+    """
+    def __init__(self, fifo_path, nb_jobs):
+        """\
+        :param fifo_path str: The path of the fifo.
+        :param nb_jobs int: The number of tokens, if the fifo is created
+                            by this process.
+        """
+        self.fifo_path = fifo_path
+        self.nb_jobs = max(1, nb_jobs)
+        self.lock_file = None
+        self.fd_read = None
+        self.fd_write = None
+        self.hosted = False # True if the tokens were written by this process
+        self.use_fifo_auth = None
+
+    def open(self):
+        '''Join the jobserver of the user, or create it with nb_jobs tokens
+           if no other process uses it.
+        '''
+        with open(self.fifo_path + ".create.lock", "a") as create_lock:
+            fcntl.flock(create_lock, fcntl.LOCK_EX) # one process at a time
+            self.join()
+        DBG.write("jobserver", (self.fifo_path, self.hosted, self.nb_jobs))
+
+    def join(self):
+        '''Join or create the jobserver, the creation lock being taken
+           (see open).
+        '''
+        self.lock_file = open(self.fifo_path + ".lock", "a")
+        try:
+            fcntl.flock(self.lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self.hosted = True
+        except (IOError, OSError) as e:
+            if e.errno not in [errno.EAGAIN, errno.EACCES]:
+                raise
+            # the other processes hold shared locks only
+            fcntl.flock(self.lock_file, fcntl.LOCK_SH)
+        if self.hosted:
+            # the tokens of a previous fifo are lost with its last process
+            if os.path.lexists(self.fifo_path):
+                os.remove(self.fifo_path)
+            os.mkfifo(self.fifo_path, stat.S_IRUSR | stat.S_IWUSR)
+        # O_RDWR: does not wait for a writer, the fifo stays readable
+        self.fd_read = os.open(self.fifo_path, os.O_RDWR)
+        self.fd_write = os.open(self.fifo_path, os.O_WRONLY)
+        for fd in [self.fd_read, self.fd_write]:
+            if hasattr(os, "set_inheritable"): # python 3
+                os.set_inheritable(fd, True)
+        if self.hosted:
+            os.write(self.fd_write, TOKEN * self.nb_jobs)
+            fcntl.flock(self.lock_file, fcntl.LOCK_SH)
+
+    def close(self):
+        '''Leave the jobserver.'''
+        for fd in [self.fd_read, self.fd_write]:
+            if fd is not None:
+                os.close(fd)
+        self.fd_read = self.fd_write = None
+        if self.lock_file is not None:
+            self.lock_file.close() # releases the lock
+            self.lock_file = None
+
+    def acquire(self):
+        '''Take a token, wait until one is free.
+
+        :return: The token.
+        :rtype: bytes
+        '''
+        while True:
+            try:
+                return os.read(self.fd_read, 1)
+            except OSError as e:
+                if e.errno != errno.EINTR:
+                    raise
+
+    def release(self, token):
+        '''Give back a token taken with acquire.'''
+        os.write(self.fd_write, token)
+
+    def get_makeflags(self):
+        '''Get the MAKEFLAGS variable giving the jobserver to make, ninja
+           and cmake --build.
+
+        :rtype: str
+        '''
+        if self.use_fifo_auth is None:
+            self.use_fifo_auth = get_make_version() >= (4, 4)
+        if self.use_fifo_auth:
+            auth = "fifo:%s" % self.fifo_path
+        else:
+            auth = "%d,%d" % (self.fd_read, self.fd_write)
+        return " -j%d --jobserver-auth=%s" % (self.nb_jobs, auth)
+
+    def call(self, command, function=SP.call, **kwargs):
+        '''Call a build command (subprocess.call) with a token, the file
+           descriptors of the fifo being inherited by the command.
+
+        :param command str: The command.
+        :param function: The function running the command, with the
+                         arguments of subprocess.call.
+        :return: The return code of the command.
+        :rtype: int
+        '''
+        token = self.acquire()
+        try:
+            return function(command, close_fds=False, **kwargs)
+        finally:
+            self.release(token)
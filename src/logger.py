@@ -339,6 +339,66 @@ class Logger(object):
         except IOError:
             pass
 
+class BufferLogger(object):
+    """\
+    Logger of a task running in a thread, which keeps its messages to write
+    them later in the logger of the command (see replay): the messages of
+    the tasks are written one task after the other, not mixed.
+    The outputs of the system commands are written in a temporary file,
+    copied in the txt log file of the command by replay.
+    """
+    def __init__(self, logger):
+        """Initialization
+
+        :param logger Logger: The logger of the command.
+        """
+        self.logger = logger
+        self.messages = [] # (method name, arguments)
+        self.logTxtFile = tempfile.TemporaryFile(mode="w+")
+
+    def __getattr__(self, name):
+        # the other attributes (config, txtFilePath, ...) of the logger
+        if name == "logger":
+            raise AttributeError(name)
+        return getattr(self.logger, name)
+
+    def write(self, message, level=None, screenOnly=False):
+        self.messages.append(("write", (message, level, screenOnly)))
+
+    def error(self, message, prefix="ERROR: "):
+        self.messages.append(("error", (message, prefix)))
+
+    def step(self, message):
+        self.write('STEP: ' + message, level=4)
+
+    def trace(self, message):
+        self.write('TRACE: ' + message, level=5)
+
+    def debug(self, message):
+        self.write('DEBUG: ' + message, level=6)
+
+    def warning(self, message):
+        self.error(message, prefix="WARNING: ")
+
+    def critical(self, message):
+        self.error(message, prefix="CRITICAL: ")
+
+    def flush(self):
+        self.logTxtFile.flush()
+
+    def replay(self):
+        """\
+        Write the messages kept in the logger of the command, and the outputs
+        of the system commands in its txt log file.
+        """
+        for name, args in self.messages:
+            getattr(self.logger, name)(*args)
+        self.messages = []
+        self.logTxtFile.seek(0)
+        shutil.copyfileobj(self.logTxtFile, self.logger.logTxtFile)
+        self.logTxtFile.close()
+        self.logger.flush()
+
 def date_to_datetime(date):
     """\
     From a string date in format YYYYMMDD_HHMMSS
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+"""
+Index of the names of the files of the directories where salomeTools
+searches its files (PATHS.PRODUCTPATH, APPLICATIONPATH, ARCHIVEPATH, ...).
+
+Each directory is listed once per process, then only its modification
+and change times are checked at each search. The index can be saved on
+disk to avoid listing the directories at each call of salomeTools.
+
+A listing is not trusted if the directory was modified less than
+RACY_DELAY seconds before it: a file added in the same tick of the clock
+of the file system would not change the modification time.
+
+| Usage:
+| >> import src.pathIndex as PIDX
+| >> PIDX.get_path_index().find_file("KERNEL.pyconf", ["/dir1", "/dir2"])
+"""
+
+import os
+import stat
+import time
+import atexit
+import pickle
+
+import src.debug as DBG
+
+# s, more than the resolution of the times of the file systems
+RACY_DELAY = 2.
+
+def get_stamp(st):
+    """\
+    Get the modification and change times of a directory, in ns if
+    they are available.
+
+    :param st os.stat_result: The stat of the directory.
+    :rtype: tuple
+    """
+    return (getattr(st, "st_mtime_ns", st.st_mtime),
+            getattr(st, "st_ctime_ns", st.st_ctime))
+
+class PathIndex(object):
+    """
+    Index of the directories:
+    directory -> (stamp, names of its files, time of the listing)
+    """
+    def __init__(self):
+        self.dirs = {}
+        self.modified = False
+        self.cache_file = None
+
+    def get_names(self, directory):
+        """\
+        Get the names of the files of a directory, listed again only if the
+        directory has been modified since the last listing.
+
+        :param directory str: The directory.
+        :return: The names of the files, or None if it is not a directory.
+        :rtype: frozenset
+        """
+        try:
+            st = os.stat(directory)
+        except OSError:
+            return None
+        if not stat.S_ISDIR(st.st_mode):
+            return None
+        stamp = get_stamp(st)
+        entry = self.dirs.get(directory)
+        if (entry is not None and len(entry) == 3 and entry[0] == stamp
+                and st.st_mtime < entry[2] - RACY_DELAY):
+            return entry[1]
+        listed = time.time()
+        try:
+            names = frozenset(os.listdir(directory))
+        except OSError:
+            return None
+        self.dirs[directory] = (stamp, names, listed)
+        self.modified = True
+        return names
+
+    def find_file(self, file_name, lpath, additional_dir=""):
+        """\
+        Find in all the directories in lpath list the file that has the
+        same name as file_name (see src.find_file_in_lpath).
+
+        :param file_name str: The file name to search
+        :param lpath List: The list of directories where to search
+        :param additional_dir str: The name of the additional directory
+        :return: the full path of the file or False if not found
+        :rtype: str
+        """
+        for directory in lpath:
+            if additional_dir:
+                dir_complete = os.path.join(directory, additional_dir)
+            else:
+                dir_complete = directory
+            names = self.get_names(dir_complete)
+            if names is not None and file_name in names:
+                return os.path.join(dir_complete, file_name)
+        return False
+
+    def set_cache_file(self, cache_file):
+        """\
+        Read the index saved in a file, and save it in this file at the
+        end of the process if it has been modified.
+
+        :param cache_file str: The path of the file.
+        """
+        if cache_file == self.cache_file:
+            return
+        if self.cache_file is None:
+            atexit.register(self.save)
+        self.cache_file = cache_file
+        try:
+            with open(cache_file, "rb") as f:
+                dirs = pickle.load(f)
+        except Exception:
+            return
+        # the directories listed by this process are more recent
+        for directory in dirs:
+            if directory not in self.dirs:
+                self.dirs[directory] = dirs[directory]
+
+    def save(self):
+        """\
+        Save the index in its cache file, if it has been modified.
+        """
+        if self.cache_file is None or not self.modified:
+            return
+        try:
+            cache_dir = os.path.dirname(self.cache_file)
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+            tmp_path = "%s.%d.tmp" % (self.cache_file, os.getpid())
+            with open(tmp_path, "wb") as f:
+                pickle.dump(self.dirs, f, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_path, self.cache_file)
+            self.modified = False
+        except Exception as e:
+            DBG.write("PathIndex cannot write %s" % self.cache_file, str(e))
+
+_path_index = PathIndex()
+
+def get_path_index():
+    """\
+    Get the index of the directories of the process.
+
+    :return: The index.
+    :rtype: PathIndex
+    """
+    return _path_index
@@ -35,8 +35,74 @@ CONFIG_FILENAME = "sat-config-" # trace product depends version(s)
 PRODUCT_FILENAME = "sat-product-" # trace product compile config
 config_expression = "^config-\d+$"
 
+# counters of the calls of get_product_config, see get_product_config_stats
+_product_config_stats = {"calls" : 0, "computed" : 0, "invalidations" : 0}
+# incremented by invalidate_product_configs, drops the caches of all configs
+_product_config_epoch = [0]
+# counters of the calls of check_installation, see get_installation_stats
+_installation_stats = {"calls" : 0, "computed" : 0}
+
+def get_product_config_cache(config):
+    """Get the cache of the product configurations of a global configuration.
+    The cache is attached to the configuration. It is emptied if the
+    configuration has been modified by something else than the computation
+    of the product configurations (see src.pyconf.getGeneration), or
+    if invalidate_product_configs has been called.
+
+    :param config Config: The global configuration
+    :return: the cache, None if the configuration cannot hold it
+    :rtype: dict
+    """
+    cache = src.pyconf.getRootCache(config, "product_config")
+    if cache is None:
+        return None
+    generation = src.pyconf.getGeneration(config)
+    if cache.get("generation") is not generation or \
+       cache.get("epoch") != _product_config_epoch[0]:
+        if cache.get("infos"):
+            _product_config_stats["invalidations"] += 1
+        cache["generation"] = generation
+        cache["epoch"] = _product_config_epoch[0]
+        cache["infos"] = {}
+        cache["graphs"] = {}
+    return cache
+
+def invalidate_product_configs():
+    """Drop the cached product configurations of all the configurations,
+    and their cached installation status.
+    To be called when the file system changes the results of 
+    get_product_config, as the removal of an install directory which
+    changes the install_dir of the products in base.
+    """
+    _product_config_epoch[0] += 1
+
+def update_product_config_cache(config):
+    """Keep the cached product configurations after a modification of the
+    global configuration, when it only completes the product configurations
+    returned by get_product_config (which would be returned again as they are).
+
+    :param config Config: The global configuration
+    """
+    cache = src.pyconf.getRootCache(config, "product_config")
+    if cache is not None and cache.get("epoch") == _product_config_epoch[0]:
+        cache["generation"] = src.pyconf.getGeneration(config)
+
+def get_product_config_stats():
+    """Get the counters of the calls of get_product_config since the start
+
+    :return: the number of calls, of computed configurations, of avoided
+             computations, and of invalidations of the caches.
+    :rtype: dict
+    """
+    res = dict(_product_config_stats)
+    res["avoided"] = res["calls"] - res["computed"]
+    return res
+
 def get_product_config(config, product_name, with_install_dir=True):
-    """Get the specific configuration of a product from the global configuration
+    """Get the specific configuration of a product from the global configuration.
+    The configuration is computed once (see compute_product_config), and 
+    then taken from the cache of the global configuration, as long as 
+    it is not modified (see get_product_config_cache).
     
     :param config Config: The global configuration
     :param product_name str: The name of the product
@@ -46,6 +112,32 @@ def get_product_config(config, product_name, with_install_dir=True):
     :return: the specific configuration of the product
     :rtype: Config
     """
+    _product_config_stats["calls"] += 1
+    cache = get_product_config_cache(config)
+    key = (product_name, with_install_dir)
+    if cache is not None and key in cache["infos"]:
+        return cache["infos"][key]
+
+    _product_config_stats["computed"] += 1
+    prod_info = compute_product_config(config, product_name, with_install_dir)
+    if cache is not None:
+        # the computation modifies the configuration, 
+        # it is the new reference of the cache
+        cache["generation"] = src.pyconf.getGeneration(config)
+        cache["infos"][key] = prod_info
+    return prod_info
+
+def compute_product_config(config, product_name, with_install_dir=True):
+    """Compute the specific configuration of a product from the global
+    configuration (without cache, see get_product_config)
+    
+    :param config Config: The global configuration
+    :param product_name str: The name of the product
+    :param with_install_dir boolean: If false, do not provide an install 
+                                     directory
+    :return: the specific configuration of the product
+    :rtype: Config
+    """
 
     # Get the version of the product from the application definition
     version = config.APPLICATION.products[product_name]
@@ -866,19 +958,83 @@ def get_product_dependencies(config, product_name, product_info):
     :return: the list of products in dependence
     :rtype: list
     """
-    from compile import get_dependencies_graph, depth_search_graph
-    all_products_infos = get_products_infos(
-                             config.APPLICATION.products,
-                             config)
-    all_products_graph=get_dependencies_graph(all_products_infos)
-    res=[]
-    res=depth_search_graph(all_products_graph, product_name, res)
-    return res[1:]  # remove the product himself (in first position)
+    # the graph of the application is computed once for all the products
+    return get_products_graph(config).get_all_dependencies(product_name)
+
+def get_products_graph(config, compile_time=True):
+    """\
+    Get the dependency graph of the products of the application,
+    kept in the cache of the product configurations.
+
+    :param config Config: The global configuration
+    :param compile_time boolean: If True the build dependencies are
+                                 included, else only the runtime ones.
+    :return: the graph of all the products of the application
+    :rtype: ProductGraph
+    """
+    cache = get_product_config_cache(config)
+    if cache is not None and compile_time in cache["graphs"]:
+        return cache["graphs"][compile_time]
+    all_products_infos = get_products_infos(config.APPLICATION.products,
+                                            config)
+    graph = src.productGraph.ProductGraph.from_products_infos(
+                                            all_products_infos, compile_time)
+    cache = get_product_config_cache(config)
+    if cache is not None:
+        cache["graphs"][compile_time] = graph
+    return graph
+
+def get_installation_cache(config):
+    """Get the cache of the installation status of the products, attached
+    to the global configuration. It is emptied with the product
+    configurations by invalidate_product_configs (sat clean --install).
+
+    :param config Config: The global configuration
+    :return: the cache, None if the configuration cannot hold it
+    :rtype: dict
+    """
+    cache = src.pyconf.getRootCache(config, "installation")
+    if cache is None:
+        return None
+    if cache.get("epoch") != _product_config_epoch[0]:
+        cache["epoch"] = _product_config_epoch[0]
+        cache["status"] = {}
+    return cache
+
+def get_installation_key(product_info):
+    """Get the key of the installation status of a product in the cache:
+    the status of a native product does not depend on its install_dir.
+    """
+    if product_is_native(product_info):
+        return (product_info.name, "native")
+    return (product_info.name, product_info.install_dir)
+
+def set_installation_status(config, product_info, installed):
+    """Record the installation status of a product in the cache, when the
+    compile command installs it or removes its install directory.
+
+    :param config Config: The global configuration
+    :param product_info Config: The configuration specific to the product
+    :param installed boolean: True if the product is installed
+    """
+    cache = get_installation_cache(config)
+    if cache is not None:
+        cache["status"][get_installation_key(product_info)] = installed
+
+def get_installation_stats():
+    """Get the counters of the calls of check_installation since the start
+
+    :return: the number of calls and of computed installation status
+    :rtype: dict
+    """
+    return dict(_installation_stats)
 
 def check_installation(config, product_info):
     """\
     Verify if a product is well installed. Checks install directory presence
-    and some additional files if it is defined in the config 
+    and some additional files if it is defined in the config.
+    The status is checked once (see compute_installation), and then taken
+    from the cache of the global configuration (see get_installation_cache).
     
     :param product_info Config: The configuration specific to 
                                the product
@@ -889,6 +1045,29 @@ def check_installation(config, product_info):
     if not product_compiles(product_info):
         return True
 
+    _installation_stats["calls"] += 1
+    cache = get_installation_cache(config)
+    key = get_installation_key(product_info)
+    if cache is not None and key in cache["status"]:
+        return cache["status"][key]
+
+    _installation_stats["computed"] += 1
+    res = compute_installation(config, product_info)
+    if cache is not None:
+        cache["status"][key] = res
+    return res
+
+def compute_installation(config, product_info):
+    """\
+    Verify if a product is well installed (without cache, see
+    check_installation)
+    
+    :param product_info Config: The configuration specific to 
+                               the product
+    :return: True if it is well installed
+    :rtype: boolean
+    """
+
     if product_is_native(product_info):
         # check a system product
         check_cmd=src.system.get_pkg_check_cmd(config.VARS.dist_name)
@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+"""
+Graph of the dependencies of the products of an application.
+
+The products are indexed by integers and kept in the order where they are
+added (the order of APPLICATION.products), the graph is traversed without
+recursion, and the transitive dependencies are computed once, as bit sets.
+The edges are the runtime dependencies (key depend of the products) and
+the build dependencies (key build_depend), the latter being used only
+for a compile time graph.
+
+| Usage:
+| >> import src.productGraph as PGRAPH
+| >> graph = PGRAPH.ProductGraph.from_products_infos(products_infos)
+| >> graph.topological_sort()
+| >> graph.get_all_dependencies("KERNEL")
+"""
+
+import src
+
+RUNTIME = "runtime" # the kind of the depend edges
+BUILD = "build" # the kind of the build_depend edges
+
+class ProductGraph(object):
+    """
+    Dependency graph of products: product -> products it depends upon
+    """
+    def __init__(self, compile_time=True):
+        """\
+        :param compile_time boolean: If True the build dependencies are
+                                     followed, else only the runtime ones.
+        """
+        self.compile_time = compile_time
+        self.names = [] # index -> name
+        self.index = {} # name -> index
+        self.defined = [] # index -> False if only referenced as a dependency
+        self.products = [] # the indexes of the products, in the added order
+        self.edges = [] # index -> [(index, kind)] as declared
+        self.dependencies = [] # index -> followed indexes, without duplicates
+        self.clear_cache()
+
+    @classmethod
+    def from_products_infos(cls, products_infos, compile_time=True):
+        """\
+        Build the graph of a list of products.
+
+        :param products_infos list: The list of (product name, product info)
+        :param compile_time boolean: If True the build dependencies are
+                                     followed, else only the runtime ones.
+        :return: The graph.
+        :rtype: ProductGraph
+        """
+        graph = cls(compile_time)
+        for p_name, p_info in products_infos:
+            build_depend = []
+            if "build_depend" in p_info:
+                build_depend = p_info.build_depend
+            graph.add_product(p_name, p_info.depend, build_depend)
+        return graph
+
+    def clear_cache(self):
+        """\
+        Forget the results computed on the graph, after a modification.
+        """
+        self.sorted = None # the topological order (indexes)
+        self.closures = None # index -> bit set of its transitive dependencies
+        self.preorders = {} # index -> transitive dependencies in search order
+
+    def get_index(self, name):
+        """\
+        Get the index of a product, added to the graph if it is unknown.
+        """
+        ii = self.index.get(name)
+        if ii is None:
+            ii = len(self.names)
+            self.index[name] = ii
+            self.names.append(name)
+            self.defined.append(False)
+            self.edges.append([])
+            self.dependencies.append([])
+        return ii
+
+    def add_product(self, name, depend=(), build_depend=()):
+        """\
+        Add a product and its dependencies to the graph.
+
+        :param name str: The product name.
+        :param depend list: The products needed at runtime.
+        :param build_depend list: The products needed only at compile time.
+        """
+        ii = self.get_index(name)
+        if not self.defined[ii]:
+            self.defined[ii] = True
+            self.products.append(ii)
+        edges = [(self.get_index(d), RUNTIME) for d in depend]
+        edges += [(self.get_index(d), BUILD) for d in build_depend]
+        self.edges[ii] = edges
+        followed = []
+        seen = set()
+        for jj, kind in edges:
+            if jj not in seen and (kind == RUNTIME or self.compile_time):
+                seen.add(jj)
+                followed.append(jj)
+        self.dependencies[ii] = followed
+        self.clear_cache()
+
+    def __contains__(self, name):
+        ii = self.index.get(name)
+        return ii is not None and self.defined[ii]
+
+    def __iter__(self):
+        for ii in self.products:
+            yield self.names[ii]
+
+    def __len__(self):
+        return len(self.products)
+
+    def check_product(self, ii):
+        """\
+        Raise an exception if a product is referenced in the dependencies
+        of other products but is not present in the graph (the application).
+        """
+        if self.defined[ii]:
+            return
+        where = [self.names[jj] for jj in self.products
+                 if ii in self.dependencies[jj]]
+        raise src.SatException('Error in product dependencies : %s product is '
+                               'referenced in products dependencies, but is '
+                               'not present in the application, from %s' %
+                               (self.names[ii], where))
+
+    def get_dependencies(self, name, kind=None):
+        """\
+        Get the direct dependencies of a product, as declared.
+
+        :param name str: The product name.
+        :param kind str: RUNTIME or BUILD to get only one kind of dependencies
+        :return: The names of the dependencies.
+        :rtype: list
+        """
+        return [self.names[jj] for jj, k in self.edges[self.index[name]]
+                if kind is None or k == kind]
+
+    def get_graph_dict(self, names=None):
+        """\
+        Get the graph as a simple python dict, the products as keys and
+        the lists of their (followed) dependencies as values.
+
+        :param names list: The products to put in the dict, all if None.
+        :rtype: dict
+        """
+        if names is None:
+            names = list(self)
+        res = {}
+        for name in names:
+            ii = self.index[name]
+            res[name] = [self.names[jj] for jj, kind in self.edges[ii]
+                         if kind == RUNTIME or self.compile_time]
+        return res
+
+    def depth_first(self, start, seen, preorder=None, postorder=None):
+        """\
+        Iterative depth first search from a product, through the products
+        not yet seen. The products are appended to preorder when they are
+        reached, and to postorder when all their dependencies are done.
+
+        :param start int: The index of the product.
+        :param seen bytearray: index -> 1 if reached (updated)
+        :raise SatException: on a cycle (with the full cycle) or on a
+                             missing product.
+        """
+        self.check_product(start)
+        seen[start] = 1
+        if preorder is not None:
+            preorder.append(start)
+        path = [start] # the products of the stack, to report the cycles
+        on_path = set(path)
+        stack = [iter(self.dependencies[start])]
+        while stack:
+            for jj in stack[-1]:
+                if not seen[jj]:
+                    self.check_product(jj)
+                    seen[jj] = 1
+                    if preorder is not None:
+                        preorder.append(jj)
+                    path.append(jj)
+                    on_path.add(jj)
+                    stack.append(iter(self.dependencies[jj]))
+                    break
+                if jj in on_path and postorder is not None:
+                    cycle = path[path.index(jj):] + [jj]
+                    raise src.SatException(
+                        'Error in product dependencies : cycle detected %s' %
+                        " -> ".join([self.names[kk] for kk in cycle]))
+            else:
+                stack.pop()
+                done = path.pop()
+                on_path.discard(done)
+                if postorder is not None:
+                    postorder.append(done)
+
+    def topological_sort(self):
+        """\
+        Sort the products: the products listed first do not depend upon
+        products listed after.
+
+        :return: The product names.
+        :rtype: list
+        :raise SatException: on a cycle or on a missing product.
+        """
+        if self.sorted is None:
+            seen = bytearray(len(self.names))
+            postorder = []
+            for ii in self.products:
+                if not seen[ii]:
+                    self.depth_first(ii, seen, postorder=postorder)
+            self.sorted = postorder
+        return [self.names[ii] for ii in self.sorted]
+
+    def get_closures(self):
+        """\
+        Get the transitive dependencies of all the products, as bit sets.
+
+        :return: index -> bit set of the indexes of the dependencies
+        :rtype: list
+        """
+        if self.closures is None:
+            self.topological_sort()
+            closures = [0] * len(self.names)
+            for ii in self.sorted: # the dependencies first
+                closure = 0
+                for jj in self.dependencies[ii]:
+                    closure |= closures[jj] | (1 << jj)
+                closures[ii] = closure
+            self.closures = closures
+        return self.closures
+
+    def get_all_dependencies(self, name):
+        """\
+        Get all the dependencies of a product, the recursive ones included,
+        in the order of a depth first search.
+
+        :param name str: The product name.
+        :return: The names of the dependencies.
+        :rtype: list
+        """
+        return self.depth_search([name])[1:]
+
+    def depth_search(self, names):
+        """\
+        Get a list of products and all their recursive dependencies, in
+        the order of a depth first search from each product.
+
+        :param names list: The product names.
+        :return: The names of the products and of their dependencies.
+        :rtype: list
+        """
+        res = []
+        seen = bytearray(len(self.names))
+        for name in names:
+            ii = self.index.get(name)
+            if ii is None:
+                raise src.SatException(_("The product %s is not present in "
+                                         "the application") % name)
+            if seen[ii]:
+                continue
+            preorder = self.preorders.get(ii)
+            if preorder is None:
+                preorder = []
+                self.depth_first(ii, bytearray(len(self.names)), preorder)
+                self.preorders[ii] = preorder
+            for jj in preorder:
+                if not seen[jj]:
+                    seen[jj] = 1
+                    res.append(self.names[jj])
+        return res
+
+    def get_mask(self, names):
+        """\
+        Get the bit set of the indexes of a list of products.
+        """
+        mask = 0
+        for name in names:
+            ii = self.index.get(name)
+            if ii is not None:
+                mask |= 1 << ii
+        return mask
+
+    def depends_on(self, name, names):
+        """\
+        Check if a product is one of the products of a list, or depends
+        (recursively) upon one of them.
+
+        :param name str: The product name.
+        :param names list: The product names.
+        :rtype: boolean
+        """
+        if name in names:
+            return True
+        if name not in self:
+            return False
+        return (self.get_closures()[self.index[name]] &
+                self.get_mask(names)) != 0
+
+    def get_dependants(self, name):
+        """\
+        Get the products which depend directly upon a product.
+
+        :param name str: The product name.
+        :return: The product names, in the order of the graph.
+        :rtype: list
+        """
+        ii = self.index[name]
+        return [self.names[jj] for jj in self.products
+                if ii in self.dependencies[jj]]
+
+    def get_all_dependants(self, names):
+        """\
+        Get the products which depend (recursively) upon one of the products
+        of a list (the children of the products), except the products of
+        the list.
+
+        :param names list: The product names.
+        :return: The product names, in the order of the graph.
+        :rtype: list
+        """
+        closures = self.get_closures()
+        mask = self.get_mask(names)
+        return [self.names[ii] for ii in self.products
+                if (closures[ii] & mask) and self.names[ii] not in names]
@@ -114,7 +114,9 @@ __version__ = "0.3.7.1" #modified for salomeTools
 __date__    = "05 October 2007"
 
 import codecs
+import collections
 import os
+import re
 import sys
 
 WORD = 'a'
@@ -146,6 +148,21 @@ NONE = 'None'
 
 WORDCHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_"
 
+# regular expressions used by ConfigReader.getToken to scan the buffer
+WHITESPACE_RE = re.compile(r'[ \t\r\n]+')
+WORD_RE = re.compile(r'[A-Za-z_][A-Za-z_0-9]*')
+NUMBER_RE = re.compile(r'[0-9]+(?:\.[0-9]*)?')
+STRING_RES = {
+    "'" : re.compile(r"'(?:[^'\\]|\\.)*'", re.DOTALL),
+    '"' : re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL),
+}
+
+# the store of a Mapping keeps the insertion order
+if sys.version_info >= (3, 7):
+    OrderedDict = dict
+else:
+    OrderedDict = collections.OrderedDict
+
 if sys.platform == 'win32':
     NEWLINE = '\r\n'
 elif os.name == 'mac':
@@ -201,8 +218,8 @@ class ConfigInputStream(object):
         self.stream = stream
         self.encoding = encoding
 
-    def read(self, size):
-        if (size == 0) or (self.encoding is None):
+    def read(self, size=-1):
+        if (size <= 0) or (self.encoding is None):
             rv = self.stream.read(size)
         else:
             rv = u''
@@ -366,6 +383,131 @@ def makePath(prefix, suffix):
         rv = prefix + '.' + suffix
     return rv
 
+# The values of the references and expressions are cached in the container
+# which evaluates them (see L{Container.evaluate}). A cache is valid while
+# the configuration containing it is not modified: each modification of a
+# container replaces the generation token of the root of its hierarchy.
+# Only the values depending on the configuration alone are cached: the
+# backtick references (and the references and expressions using them) read
+# os, sys or the environment, which may change between two evaluations.
+_resolutionStats = {'resolutions' : 0, 'hits' : 0, 'volatile' : 0}
+_compiledBackticks = {}
+
+def getResolutionStats():
+    """
+    Get the counters of the evaluations of references and expressions,
+    for profiling.
+
+    @return: The number of evaluations done ('resolutions'), the number
+    of values found in the caches ('hits') and the number of evaluations of
+    backtick references, which are never cached ('volatile').
+    @rtype: dict
+    """
+    return dict(_resolutionStats)
+
+def resetResolutionStats():
+    """
+    Reset the counters returned by L{getResolutionStats}.
+    """
+    for key in _resolutionStats:
+        _resolutionStats[key] = 0
+
+def isCacheable(item):
+    """
+    Check if the value of a reference or an expression may be cached: it
+    uses only $ references and constants (the values of the $ references
+    are checked by L{Container.evaluate}).
+
+    @param item: The L{Reference}, L{Expression} or constant.
+    @type item: any
+    @rtype: bool
+    """
+    if isinstance(item, Reference):
+        return item.type == DOLLAR
+    if isinstance(item, Expression):
+        return isCacheable(item.lhs) and isCacheable(item.rhs)
+    return True
+
+def getRoot(container):
+    """
+    Get the root of the hierarchy of a container.
+
+    @param container: The container.
+    @type container: L{Container}
+    @return: The root container.
+    @rtype: L{Container}
+    """
+    parent = object.__getattribute__(container, 'parent')
+    while parent is not None:
+        container = parent
+        parent = object.__getattribute__(container, 'parent')
+    return container
+
+def getGeneration(container):
+    """
+    Get the generation token of the hierarchy of a container, which changes
+    each time a container of the hierarchy is modified.
+
+    @param container: The container.
+    @type container: L{Container}
+    @return: The token.
+    @rtype: object
+    """
+    root = getRoot(container)
+    try:
+        return object.__getattribute__(root, 'generation')
+    except AttributeError:
+        return newGeneration(root)
+
+def newGeneration(container):
+    """
+    Invalidate the cached values of the hierarchy of a container, after
+    a modification.
+
+    @param container: The modified container.
+    @type container: L{Container}
+    @return: The new generation token.
+    @rtype: object
+    """
+    token = object()
+    object.__setattr__(getRoot(container), 'generation', token)
+    return token
+
+def getRootCache(container, name):
+    """
+    Get a cache attached to the root of the hierarchy of a container, which
+    lives as long as the root does. The cache is not invalidated by the
+    modifications of the hierarchy, it is up to its user to check it (see
+    L{getGeneration}).
+
+    @param container: The container.
+    @type container: L{Container}
+    @param name: The name of the cache.
+    @type name: str
+    @return: The cache, or None if the root is not a L{Config}.
+    @rtype: dict
+    """
+    root = getRoot(container)
+    if not isinstance(root, Config):
+        return None
+    try:
+        caches = object.__getattribute__(root, 'caches')
+    except AttributeError:
+        caches = {}
+        object.__setattr__(root, 'caches', caches)
+    return caches.setdefault(name, {})
+
+def setParent(container, parent):
+    """
+    Move a container in a hierarchy.
+
+    @param container: The container.
+    @type container: L{Container}
+    @param parent: The new parent of the container.
+    @type parent: L{Container}
+    """
+    object.__setattr__(container, 'parent', parent)
+    newGeneration(container)
 
 class Container(object):
     """
@@ -378,6 +520,9 @@ class Container(object):
 
         a.list.of[1].or['more'].elements
     """
+    # resolved and generation: see evaluate and getGeneration
+    __slots__ = ('parent', 'path', 'resolved', 'generation')
+
     def __init__(self, parent):
         """
         Initialize an instance.
@@ -410,11 +555,59 @@ class Container(object):
         the evaluated value is returned, otherwise the item is returned
         unchanged.
         """
+        if not isinstance(item, (Reference, Expression)):
+            return item
+        if not isCacheable(item):
+            _resolutionStats['resolutions'] += 1
+            _resolutionStats['volatile'] += 1
+            if isinstance(item, Reference):
+                return item.resolve(self)
+            return item.evaluate(self)
+        generation = getGeneration(self)
+        try:
+            token, cache = object.__getattribute__(self, 'resolved')
+        except AttributeError:
+            token = None
+        if token is not generation:
+            cache = {}
+            object.__setattr__(self, 'resolved', (generation, cache))
+        elif item in cache:
+            _resolutionStats['hits'] += 1
+            return cache[item]
+        _resolutionStats['resolutions'] += 1
+        volatile = _resolutionStats['volatile']
         if isinstance(item, Reference):
-            item = item.resolve(self)
-        elif isinstance(item, Expression):
-            item = item.evaluate(self)
-        return item
+            rv = item.resolve(self)
+        else:
+            rv = item.evaluate(self)
+        # the evaluation may have read a deferred configuration, or a
+        # backtick reference
+        if (getGeneration(self) is generation and
+                _resolutionStats['volatile'] == volatile):
+            cache[item] = rv
+        return rv
+
+    def __getstate__(self):
+        """
+        Get the state to pickle (the slots), without the cached values.
+        """
+        state = {}
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                if name in ('resolved', 'generation', 'caches'):
+                    continue
+                try:
+                    state[name] = object.__getattribute__(self, name)
+                except AttributeError:
+                    pass
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restore a pickled instance.
+        """
+        for name in state:
+            object.__setattr__(self, name, state[name])
 
     def writeToStream(self, stream, indent, container, evaluated=False):
         """
@@ -450,7 +643,11 @@ class Container(object):
 class Mapping(Container):
     """
     This internal class implements key-value mappings in configurations.
+
+    @ivar data: The values, in the insertion order of the keys.
+    @ivar comments: The comments of the keys which have one.
     """
+    __slots__ = ('data', 'comments')
 
     def __init__(self, parent=None):
         """
@@ -461,8 +658,7 @@ class Mapping(Container):
         """
         Container.__init__(self, parent)
         object.__setattr__(self, 'path', '')
-        object.__setattr__(self, 'data', {})
-        object.__setattr__(self, 'order', [])   # to preserve ordering
+        object.__setattr__(self, 'data', OrderedDict())
         object.__setattr__(self, 'comments', {})
 
     def __delitem__(self, key):
@@ -472,20 +668,45 @@ class Mapping(Container):
         data = object.__getattribute__(self, 'data')
         if key not in data:
             raise AttributeError(key)
-        order = object.__getattribute__(self, 'order')
-        comments = object.__getattribute__(self, 'comments')
         del data[key]
-        order.remove(key)
-        del comments[key]
+        object.__getattribute__(self, 'comments').pop(key, None)
+        newGeneration(self)
 
     def __getitem__(self, key):
         data = object.__getattribute__(self, 'data')
         if key not in data:
             raise AttributeError("Unknown pyconf key: '%s'" % key)
         rv = data[key]
+        if isinstance(rv, DeferredConfig):
+            rv = self.loadDeferred(key, rv)
         return self.evaluate(rv)
 
     __getattr__ = __getitem__
+
+    def loadDeferred(self, key, deferred):
+        """
+        Load a L{DeferredConfig} value and replace it by the loaded
+        configuration. If it cannot be loaded, the key is removed.
+
+        @param key: The key of the value.
+        @type key: str
+        @param deferred: The value to load.
+        @type deferred: L{DeferredConfig}
+        @return: The loaded configuration.
+        @rtype: L{Config}
+        @raise AttributeError: If the configuration cannot be loaded.
+        """
+        rv = deferred.load()
+        data = object.__getattribute__(self, 'data')
+        if rv is None:
+            del data[key]
+            object.__getattribute__(self, 'comments').pop(key, None)
+            newGeneration(self)
+            raise AttributeError("Unknown pyconf key: '%s'" % key)
+        object.__setattr__(rv, 'parent', self)
+        data[key] = rv
+        newGeneration(self)
+        return rv
     
     '''
     def __getattribute__(self, name):
@@ -512,8 +733,10 @@ class Mapping(Container):
         raise StopIteration
 
     def __contains__(self, item):
-        order = object.__getattribute__(self, 'order')
-        return item in order
+        try:
+            return item in object.__getattribute__(self, 'data')
+        except TypeError: # not hashable
+            return False
 
     def addMapping(self, key, value, comment, setting=False):
         """
@@ -531,15 +754,17 @@ class Mapping(Container):
         again and setting is False.
         """
         data = object.__getattribute__(self, 'data')
-        order = object.__getattribute__(self, 'order')
         comments = object.__getattribute__(self, 'comments')
 
-        data[key] = value
-        if key not in order:
-            order.append(key)
-        elif not setting:
+        if key in data and not setting:
+            data[key] = value
             raise ConfigFormatError("repeated key: %s" % key)
-        comments[key] = comment
+        data[key] = value
+        if comment:
+            comments[key] = comment
+        else:
+            comments.pop(key, None)
+        newGeneration(self)
 
     def __setattr__(self, name, value):
         self.addMapping(name, value, None, True)
@@ -550,7 +775,7 @@ class Mapping(Container):
         """
         Return the keys in a similar way to a dictionary.
         """
-        return object.__getattribute__(self, 'order')
+        return list(object.__getattribute__(self, 'data'))
 
     def get(self, key, default=None):
         """
@@ -561,20 +786,20 @@ class Mapping(Container):
         return default
 
     def __str__(self):
-        return str(object.__getattribute__(self, 'data'))
+        return str(dict(object.__getattribute__(self, 'data')))
 
     def __repr__(self):
-        return repr(object.__getattribute__(self, 'data'))
+        return repr(dict(object.__getattribute__(self, 'data')))
 
     def __len__(self):
-        return len(object.__getattribute__(self, 'order'))
+        return len(object.__getattribute__(self, 'data'))
 
     def __iter__(self):
         return self.iterkeys()
 
     def iterkeys(self):
-        order = object.__getattribute__(self, 'order')
-        return order.__iter__()
+        # on a copy of the keys, the mapping can be modified in the loop
+        return iter(self.keys())
 
     def writeToStream(self, stream, indent, container, evaluated=False):
         """
@@ -608,11 +833,11 @@ class Mapping(Container):
         @type indent: int
         """
         indstr = indent * '  '
-        order = object.__getattribute__(self, 'order')
         data = object.__getattribute__(self, 'data')
-        maxlen = 0 # max(map(lambda x: len(x), order))
-        for key in order:
-            comment = self.comments[key]
+        comments = object.__getattribute__(self, 'comments')
+        maxlen = 0 # max(map(lambda x: len(x), data))
+        for key in data:
+            comment = comments.get(key)
             if isWord(key):
                 skey = key
             else:
@@ -623,6 +848,9 @@ class Mapping(Container):
                 skey = skey[1:]
             stream.write('%s%-*s :' % (indstr, maxlen, skey))
             value = data[key]
+            if isinstance(value, DeferredConfig):
+                # not read yet, it is not read only to be saved
+                value = repr(value)
             if isinstance(value, Container):
                 value.writeToStream(stream, indent, self, evaluated=evaluated)
             else:
@@ -634,6 +862,8 @@ class Config(Mapping):
     need to interface to, under normal circumstances.
     """
 
+    __slots__ = ('reader', 'namespaces', 'caches')
+
     class Namespace(object):
         """
         This internal class is used for implementing default namespaces.
@@ -681,6 +911,24 @@ class Config(Mapping):
                 else:
                     self[key].PWD = pwd
 
+    def __getstate__(self):
+        """
+        Get the state to pickle: the reader (and its stream) and the
+        namespaces are not picklable, they are rebuilt by L{__setstate__}.
+        """
+        state = Mapping.__getstate__(self)
+        del state['reader']
+        del state['namespaces']
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restore a pickled configuration.
+        """
+        Mapping.__setstate__(self, state)
+        object.__setattr__(self, 'reader', ConfigReader(self))
+        object.__setattr__(self, 'namespaces', [Config.Namespace()])
+
     def load(self, stream):
         """
         Load the configuration from the specified stream. Multiple streams can
@@ -712,6 +960,7 @@ class Config(Mapping):
             namespaces.append(ns)
         else:
             setattr(namespaces[0], name, ns)
+        newGeneration(self)
 
     def removeNamespace(self, ns, name=None):
         """
@@ -726,6 +975,7 @@ class Config(Mapping):
             namespaces.remove(ns)
         else:
             delattr(namespaces[0], name)
+        newGeneration(self)
 
     def __save__(self, stream, indent=0, no_close=False, evaluated=False):
         """
@@ -756,10 +1006,52 @@ class Config(Mapping):
         except Exception as e:
             raise ConfigError(str(e))
 
+class DeferredConfig(object):
+    """
+    This class implements a value which is a configuration read only when
+    it is accessed for the first time (see L{Mapping.loadDeferred}).
+    Each access from a different mapping (a copy of the configuration for
+    example) gets its own copy of the configuration, read only once.
+    """
+    def __init__(self, loader):
+        """
+        Initialize an instance.
+
+        @param loader: The callable which reads the configuration. It returns
+        None if the configuration cannot be read. It has to be picklable
+        in order to pickle the configuration holding the instance.
+        @type loader: A callable returning a L{Config} instance or None.
+        """
+        self.loader = loader
+        self.value = None
+        self.loaded = False
+
+    def load(self):
+        """
+        Get a copy of the configuration, read it if it is not yet done.
+
+        @return: The configuration, or None if it cannot be read.
+        @rtype: L{Config}
+        """
+        if not self.loaded:
+            self.value = self.loader()
+            self.loaded = True
+        if self.value is None:
+            return None
+        return copyContainer(self.value)
+
+    def __repr__(self):
+        return "<DeferredConfig %r>" % self.loader
+
 class Sequence(Container):
     """
     This internal class implements a value which is a sequence of other values.
+
+    @ivar data: The values.
+    @ivar comments: The comments of the values which have one, by index.
     """
+    __slots__ = ('data', 'comments')
+
     class SeqIter(object):
         """
         This internal class implements an iterator for a L{Sequence} instance.
@@ -796,7 +1088,7 @@ class Sequence(Container):
         """
         Container.__init__(self, parent)
         object.__setattr__(self, 'data', [])
-        object.__setattr__(self, 'comments', [])
+        object.__setattr__(self, 'comments', {})
 
     def append(self, item, comment):
         """
@@ -808,9 +1100,11 @@ class Sequence(Container):
         @type comment: str
         """
         data = object.__getattribute__(self, 'data')
-        comments = object.__getattribute__(self, 'comments')
         data.append(item)
-        comments.append(comment)
+        if comment:
+            comments = object.__getattribute__(self, 'comments')
+            comments[len(data) - 1] = comment
+        newGeneration(self)
 
     def __getitem__(self, index):
         data = object.__getattribute__(self, 'data')
@@ -878,7 +1172,7 @@ class Sequence(Container):
         indstr = indent * '  '
         for i in range(0, len(data)):
             value = data[i]
-            comment = comments[i]
+            comment = comments.get(i)
             if comment:
                 stream.write('%s#%s' % (indstr, comment))
             if isinstance(value, Container):
@@ -904,6 +1198,7 @@ class Reference(object):
         self.config = config
         self.type = type
         self.elements = [ident]
+        self.code = None # compiled backtick expression, see getCode
 
     def addElement(self, type, ident):
         """
@@ -915,6 +1210,7 @@ class Reference(object):
         @type ident: str
         """
         self.elements.append((type, ident))
+        self.code = None
 
     def findConfig(self, container):
         """
@@ -946,9 +1242,10 @@ class Reference(object):
             if self.type == BACKTICK:
                 namespaces = object.__getattribute__(current, 'namespaces')
                 found = False
+                code = self.getCode()
                 for ns in namespaces:
                     try:
-                        rv = eval(str(self)[1:-1], vars(ns))
+                        rv = eval(code, vars(ns))
                         found = True
                         break
                     except:
@@ -971,6 +1268,37 @@ class Reference(object):
             raise ConfigResolutionError("unable to evaluate %r in the configuration %s" % (self, path))
         return rv
 
+    def getCode(self):
+        """
+        Get the compiled expression of a backtick reference. It is compiled
+        once, and shared by all the references with the same expression.
+
+        @return: The compiled expression, or the expression if it is not valid
+        (the error is then raised by eval).
+        @rtype: code or str
+        """
+        code = getattr(self, 'code', None)
+        if code is not None:
+            return code
+        expr = str(self)[1:-1]
+        code = _compiledBackticks.get(expr)
+        if code is None:
+            try:
+                code = compile(expr, '<pyconf>', 'eval')
+            except SyntaxError:
+                code = expr
+            _compiledBackticks[expr] = code
+        self.code = code
+        return code
+
+    def __getstate__(self):
+        """
+        Get the state to pickle, without the compiled expression.
+        """
+        state = dict(self.__dict__)
+        state.pop('code', None)
+        return state
+
     def __str__(self):
         s = self.elements[0]
         for tt, tv in self.elements[1:]:
@@ -1069,6 +1397,15 @@ class ConfigReader(object):
         self.pbchars = []
         self.pbtokens = []
         self.comment = None
+        # the whole stream is read in buffer: pos is the index of the next
+        # char to get, counted the index of the next char never read (it is
+        # greater than pos when chars were pushed back). The line and column
+        # numbers are only computed when needed, up to synced (see sync).
+        self.buffer = ''
+        self.buflen = 0
+        self.pos = 0
+        self.counted = 0
+        self.synced = 0
 
     def location(self):
         """
@@ -1080,8 +1417,25 @@ class ConfigReader(object):
         @return: A string representing a location in the stream being read.
         @rtype: str
         """
+        self.sync()
         return "%s(%d,%d)" % (self.filename, self.lineno, self.colno)
 
+    def sync(self):
+        """
+        Update line and column numbers with the chars read since the last
+        call, as if they were counted one by one.
+        """
+        start = self.synced
+        end = self.counted
+        if end > start:
+            lastnl = self.buffer.rfind('\n', start, end)
+            if lastnl < 0:
+                self.colno += end - start
+            else:
+                self.lineno += self.buffer.count('\n', start, end)
+                self.colno = end - lastnl
+            self.synced = end
+
     def getChar(self):
         """
         Get the next char from the stream. Update line and column numbers
@@ -1091,18 +1445,59 @@ class ConfigReader(object):
         @rtype: str
         """
         if self.pbchars:
-            c = self.pbchars.pop()
-            if isinstance(c,bytes):
-                c = c.decode()
+            return self.pbchars.pop()
+        pos = self.pos
+        if pos < self.buflen:
+            self.pos = pos + 1
+            if self.pos > self.counted:
+                self.counted = self.pos
+            return self.buffer[pos]
+        # each read at the end of the stream moves the column
+        self.sync()
+        self.colno += 1
+        return ''
+
+    def advance(self, end, lookahead=False):
+        """
+        Move to the specified index of the buffer, as if the chars were
+        read by L{getChar}.
+
+        @param end: The index of the buffer to move to.
+        @type end: int
+        @param lookahead: If True, the char following end is also read and
+        pushed back, as done when a token ends with the char that follows it.
+        @type lookahead: bool
+        """
+        self.pos = end
+        if lookahead:
+            if end < self.buflen:
+                end += 1
+            else:
+                self.sync()
+                self.colno += 1
+        if end > self.counted:
+            self.counted = end
+
+    def readline(self):
+        """
+        Get the rest of the current line, without updating line and column
+        numbers.
+
+        @return: The rest of the line, including the end of line.
+        @rtype: str
+        """
+        self.sync()
+        end = self.buffer.find('\n', self.pos)
+        if end < 0:
+            end = self.buflen
         else:
-            c = self.stream.read(1)
-            if isinstance(c,bytes):
-                c = c.decode()
-            self.colno += 1
-            if c == '\n':
-                self.lineno += 1
-                self.colno = 1
-        return c
+            end += 1
+        line = self.buffer[self.pos:end]
+        self.pos = end
+        if end > self.counted:
+            self.counted = end
+        self.synced = self.counted
+        return line
 
     def __repr__(self):
         return "<ConfigReader at 0x%08x>" % id(self)
@@ -1122,19 +1517,66 @@ class ConfigReader(object):
         """
         if self.pbtokens:
             return self.pbtokens.pop()
-        stream = self.stream
+        buf = self.buffer
         self.comment = None
         token = ''
         tt = EOF
         while True:
+            # scan the most frequent tokens directly in the buffer,
+            # the others are read char by char
+            if not self.pbchars and self.pos < self.buflen:
+                pos = self.pos
+                c = buf[pos]
+                if c in self.whitespace:
+                    end = WHITESPACE_RE.match(buf, pos).end()
+                    self.advance(end)
+                    self.lastc = buf[end - 1]
+                    continue
+                elif c in self.wordchars:
+                    m = WORD_RE.match(buf, pos)
+                    token = m.group()
+                    tt = WORD
+                    self.advance(m.end(), lookahead=True)
+                    if token == "True":
+                        tt = TRUE
+                    elif token == "False":
+                        tt = FALSE
+                    elif token == "None":
+                        tt = NONE
+                    break
+                elif c in self.digits:
+                    m = NUMBER_RE.match(buf, pos)
+                    token = m.group()
+                    tt = NUMBER
+                    end = m.end()
+                    self.advance(end, lookahead=True)
+                    # a whitespace after a number is not pushed back
+                    if end < self.buflen and buf[end] in self.whitespace:
+                        self.pos = end + 1
+                    break
+                elif c in self.quotes and not buf.startswith(c * 3, pos):
+                    m = STRING_RES[c].match(buf, pos)
+                    if m:
+                        token = m.group()
+                        tt = STRING
+                        end = m.end()
+                        if end == pos + 2:
+                            # the char after an empty string is read
+                            # to check for a multiline string
+                            self.advance(end, lookahead=True)
+                            if end == self.buflen:
+                                self.pbchars.append('')
+                        else:
+                            self.advance(end)
+                        break
             c = self.getChar()
             if not c:
                 break
             elif c == '#':
                 if self.comment :
-                    self.comment += '#' + stream.readline()
+                    self.comment += '#' + self.readline()
                 else :
-                    self.comment = stream.readline()
+                    self.comment = self.readline()
                 self.lineno += 1
                 continue
             if c in self.quotes:
@@ -1267,6 +1709,14 @@ class ConfigReader(object):
         self.filename = filename
         self.lineno = 1
         self.colno = 1
+        buf = stream.read()
+        if isinstance(buf, bytes):
+            buf = buf.decode()
+        self.buffer = buf
+        self.buflen = len(buf)
+        self.pos = 0
+        self.counted = 0
+        self.synced = 0
 
     def match(self, t):
         """
@@ -1576,6 +2026,51 @@ def deepCopyMapping(inMapping):
         res[element] = inMapping[element]
     return res
 
+def copyContainer(container, parent=None):
+    """
+    Copy the structure of a configuration. Every L{Mapping}, L{Sequence} and
+    L{Config} of the hierarchy is duplicated, whereas the leaf values
+    (including unevaluated L{Reference} and L{Expression} instances) are
+    shared, so that the copy resolves exactly as the original does and can
+    be modified without side effect on it.
+
+    @param container: The container to copy.
+    @type container: L{Container}
+    @param parent: The parent of the copy in the hierarchy.
+    @type parent: A L{Container} instance.
+    @return: the copy of the container.
+    @rtype: L{Container}
+    """
+    if isinstance(container, Sequence):
+        res = Sequence(parent)
+        data = object.__getattribute__(res, 'data')
+        for value in object.__getattribute__(container, 'data'):
+            if isinstance(value, Container):
+                value = copyContainer(value, res)
+            data.append(value)
+        comments = object.__getattribute__(container, 'comments')
+        object.__setattr__(res, 'comments', dict(comments))
+    else:
+        if isinstance(container, Config):
+            res = Config(parent=parent)
+            namespaces = object.__getattribute__(container, 'namespaces')
+            object.__setattr__(res, 'namespaces', list(namespaces))
+        else:
+            res = Mapping(parent)
+        data = object.__getattribute__(res, 'data')
+        for key, value in object.__getattribute__(container, 'data').items():
+            if isinstance(value, Container):
+                value = copyContainer(value, res)
+            data[key] = value
+        comments = object.__getattribute__(container, 'comments')
+        object.__setattr__(res, 'comments', dict(comments))
+    try:
+        path = object.__getattribute__(container, 'path')
+        object.__setattr__(res, 'path', path)
+    except AttributeError:
+        pass
+    return res
+
 class ConfigMerger(object):
     """
     This class is used for merging two configurations. If a key exists in the
@@ -1623,7 +2118,7 @@ class ConfigMerger(object):
 
         overwrite_list = object.__getattribute__(seq2, 'data')
         for overwrite_instruction in overwrite_list:
-            object.__setattr__(overwrite_instruction, 'parent', map1)
+            setParent(overwrite_instruction, map1)
             if "__condition__" in overwrite_instruction.keys():
                 overwrite_condition = overwrite_instruction["__condition__"]
                 if eval(overwrite_condition, globals(), map1):
@@ -1651,16 +2146,20 @@ class ConfigMerger(object):
         @param map2: The mapping to merge.
         @type map2: L{Mapping}.
         """
-        keys = map1.keys()
         global __resolveOverwrite__
         for key in map2.keys():
             if __resolveOverwrite__ and key == "__overwrite__":
                 self.overwriteKeys(map1,map2[key])
 
-            elif key not in keys:
+            elif key not in map1:
+                value = object.__getattribute__(map2, 'data')[key]
+                if isinstance(value, DeferredConfig):
+                    # not read yet, it will be on first access
+                    map1[key] = value
+                    continue
                 map1[key] = map2[key]
                 if isinstance(map1[key], Container) :
-                    object.__setattr__(map1[key], 'parent', map1)
+                    setParent(map1[key], map1)
             else:
                 obj1 = map1[key]
                 obj2 = map2[key]
@@ -1672,7 +2171,7 @@ class ConfigMerger(object):
                 elif decision == "overwrite":
                     map1[key] = obj2
                     if isinstance(map1[key], Container):
-                        object.__setattr__(map1[key], 'parent', map1)
+                        setParent(map1[key], map1)
                 elif decision == "mismatch":
                     self.handleMismatch(obj1, obj2)
                 else:
@@ -1692,12 +2191,14 @@ class ConfigMerger(object):
         """
         data1 = object.__getattribute__(seq1, 'data')
         data2 = object.__getattribute__(seq2, 'data')
+        offset = len(data1)
         for obj in data2:
             data1.append(obj)
         comment1 = object.__getattribute__(seq1, 'comments')
         comment2 = object.__getattribute__(seq2, 'comments')
-        for obj in comment2:
-            comment1.append(obj)
+        for index in comment2:
+            comment1[offset + index] = comment2[index]
+        newGeneration(seq1)
 
     def handleMismatch(self, obj1, obj2):
         """
@@ -92,6 +92,10 @@ parser.add_option('t', 'all_in_terminal', 'boolean', "all_in_terminal",
                   _("all traces in the terminal (for example compilation logs)."))
 parser.add_option('l', 'logs_paths_in_file', 'string', "logs_paths_in_file", 
                   _("put the command results and paths to log files."))
+parser.add_option('', 'no-config-cache', 'boolean', "no_config_cache",
+                  _("do not use the cache of the merged configuration."))
+parser.add_option('', 'config-jobs', 'int', "config_jobs",
+                  _("read the product configuration files with this number of processes."))
 
 
 ########################################################################
@@ -199,6 +203,7 @@ class Sat(object):
         self.remaindersArgs = None
         self.options = None  # the options passed to salomeTools
         self.datadir = None  # default value will be <salomeTools root>/data
+        self.config_session = None  # the config shared with micro commands
 
     def obsolete__init__(self, opt='', datadir=None):
         '''Initialization
@@ -410,12 +415,18 @@ class Sat(object):
                     options_save = self.options
                     self.options = options  
 
-                # read the configuration from all the pyconf files    
+                # read the configuration from all the pyconf files,
+                # a micro command reuses the one of its top level command
                 cfgManager = CONFIG.ConfigManager()
-                self.cfg = cfgManager.get_config(datadir=self.datadir, 
-                                                 application=appliToLoad, 
-                                                 options=self.options, 
-                                                 command=__nameCmd__)
+                if logger_add_link is None or self.config_session is None:
+                    self.config_session = CONFIG.ConfigSession()
+                self.cfg = self.config_session.get_config(
+                                        cfgManager,
+                                        datadir=self.datadir,
+                                        application=appliToLoad,
+                                        options=self.options,
+                                        command=__nameCmd__,
+                                        nested=logger_add_link is not None)
                                
                 # Set the verbose mode if called
                 if verbose > -1:
@@ -442,6 +453,10 @@ class Sat(object):
                                    silent_sysstd=silent,
                                    all_in_terminal=self.options.all_in_terminal,
                                    micro_command=micro_command)
+
+                # trace where the configuration comes from
+                logger_command.xmlFile.append_node_attrib("Site",
+                        attrib={"configCache" : self.config_session.origin})
                 
                 # Check that the path given by the logs_paths_in_file option
                 # is a file path that can be written
@@ -549,6 +564,18 @@ class Sat(object):
                     # print the log file path if 
                     # the maximum verbose mode is invoked
                     if not micro_command:
+                        stats = src.product.get_product_config_stats()
+                        if stats["calls"] > 0:
+                            logger_command.write(
+                                "\nProduct configurations: %(calls)d requests, "
+                                "%(computed)d computed, %(avoided)d "
+                                "recomputations avoided, %(invalidations)d "
+                                "cache invalidations\n" % stats, 5)
+                        stats = src.product.get_installation_stats()
+                        if stats["calls"] > 0:
+                            logger_command.write(
+                                "Installation checks: %(calls)d requests, "
+                                "%(computed)d computed\n" % stats, 5)
                         logger_command.write("\nPath to the xml log file :\n",
                                              5)
                         logger_command.write("%s\n\n" % src.printcolors.printcInfo(
@@ -25,7 +25,10 @@ import os
 import subprocess as SP
 import time
 import tarfile
+import threading
 import time
+import zlib
+import pickle
  
 
 import debug as DBG
@@ -101,8 +104,57 @@ python3 -m http.server %(port)s &> /dev/null &
                                              % (filePath, e)), 1)
     
 
-def git_describe(repo_path):
+# cache of git_describe: git directory -> (key, tag description)
+_git_describe_cache = {}
+_git_describe_cache_files = []
+
+def git_describe(repo_path, cache_file=None):
     '''Use git describe --tags command to return tag description of the git repository"
+    The result is cached, and the cache is valid as long as HEAD, the ref
+    it points to, packed-refs and refs/tags are not modified.
+    If HEAD is tagged, the description is read in the .git directory
+    without calling git.
+
+    :param repo_path str: The git repository to describe
+    :param cache_file str: If not None, the file where the cache is saved
+                           for the next calls of salomeTools.
+    '''
+    git_dir = get_git_dir(repo_path)
+    if git_dir is None:
+        return False
+    if cache_file is not None and cache_file not in _git_describe_cache_files:
+        _git_describe_cache_files.append(cache_file)
+        try:
+            with open(cache_file, "rb") as f:
+                cached = pickle.load(f)
+            for key in cached:
+                _git_describe_cache.setdefault(key, cached[key])
+        except Exception:
+            pass
+    key = get_git_describe_key(git_dir)
+    if git_dir in _git_describe_cache:
+        cached_key, tag_description = _git_describe_cache[git_dir]
+        if cached_key == key:
+            return tag_description
+
+    tag_description = git_describe_exact(git_dir)
+    if tag_description is None:
+        tag_description = git_describe_cmd(repo_path)
+    _git_describe_cache[git_dir] = (key, tag_description)
+
+    if cache_file is not None:
+        try:
+            tmp_path = "%s.%d.tmp" % (cache_file, os.getpid())
+            src.ensure_path_exists(os.path.dirname(cache_file))
+            with open(tmp_path, "wb") as f:
+                pickle.dump(_git_describe_cache, f, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_path, cache_file)
+        except Exception as e:
+            DBG.write("git_describe cannot write %s" % cache_file, str(e))
+    return tag_description
+
+def git_describe_cmd(repo_path):
+    '''Call git describe --tags command to return tag description of the git repository"
     :param repo_path str: The git repository to describe
     '''
     git_cmd="cd %s;git describe --tags" % repo_path
@@ -117,8 +169,198 @@ def git_describe(repo_path):
             tag_description=tag_description.decode("utf-8", "ignore")
         return tag_description
 
+def get_git_dir(path):
+    '''Get the .git directory of the git repository containing path.
 
-def git_extract(from_what, tag, git_options, where, logger, environment=None):
+    :param path str: A path in the git repository.
+    :return: The .git directory, or None if path is not in a git repository.
+    :rtype: str
+    '''
+    path = os.path.abspath(path)
+    while True:
+        git_dir = os.path.join(path, ".git")
+        if os.path.isdir(git_dir):
+            return git_dir
+        if os.path.isfile(git_dir):
+            # worktree or submodule: the file gives the .git directory
+            try:
+                with open(git_dir) as f:
+                    line = f.read().strip()
+            except IOError:
+                return None
+            if not line.startswith("gitdir:"):
+                return None
+            return os.path.normpath(os.path.join(path, line[7:].strip()))
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+def get_git_common_dir(git_dir):
+    '''Get the directory of the refs of a git repository, which is not
+       git_dir for a worktree.
+
+    :param git_dir str: The .git directory.
+    :return: The directory containing the refs and packed-refs.
+    :rtype: str
+    '''
+    try:
+        with open(os.path.join(git_dir, "commondir")) as f:
+            common_dir = f.read().strip()
+    except IOError:
+        return git_dir
+    return os.path.normpath(os.path.join(git_dir, common_dir))
+
+def get_git_files(git_dir):
+    '''Get the git files that define the version of a git repository
+       (HEAD, the current branch ref and packed-refs).
+
+    :param git_dir str: The .git directory.
+    :return: The list of the git files.
+    :rtype: list
+    '''
+    common_dir = get_git_common_dir(git_dir)
+    res = [os.path.join(git_dir, "HEAD"),
+           os.path.join(common_dir, "packed-refs")]
+    try:
+        with open(res[0]) as f:
+            head = f.read().strip()
+    except IOError:
+        return res
+    if head.startswith("ref:"):
+        res.append(os.path.join(common_dir, head[4:].strip()))
+    return res
+
+def get_git_describe_key(git_dir):
+    '''Get the key of the git_describe cache: the content of HEAD and the
+       modification times of the git files and of the refs/tags directories.
+
+    :param git_dir str: The .git directory.
+    :return: The key.
+    :rtype: tuple
+    '''
+    key = []
+    try:
+        with open(os.path.join(git_dir, "HEAD")) as f:
+            key.append(f.read().strip())
+    except IOError:
+        key.append(None)
+    l_paths = get_git_files(git_dir)
+    tags_dir = os.path.join(get_git_common_dir(git_dir), "refs", "tags")
+    for root, dirs, files in os.walk(tags_dir):
+        l_paths.append(root)
+    for path in l_paths:
+        try:
+            key.append((path, os.stat(path).st_mtime))
+        except OSError:
+            key.append((path, None))
+    return tuple(key)
+
+def read_git_object(common_dir, sha1):
+    '''Read a loose object of a git repository.
+
+    :param common_dir str: The directory containing the objects.
+    :param sha1 str: The sha1 of the object.
+    :return: The type and the content of the object,
+             or None if it is not a loose object.
+    :rtype: tuple
+    '''
+    path = os.path.join(common_dir, "objects", sha1[:2], sha1[2:])
+    try:
+        with open(path, "rb") as f:
+            data = zlib.decompress(f.read())
+    except (IOError, zlib.error):
+        return None
+    header, content = data.split(b"\0", 1)
+    return header.split(b" ")[0].decode(), content
+
+def git_describe_exact(git_dir):
+    '''Get the git describe --tags result by reading the .git directory,
+       in the cases where it is not necessary to walk the commits:
+       HEAD is tagged, or the repository has no tag.
+
+    :param git_dir str: The .git directory.
+    :return: The tag description, False if there is no tag,
+             or None if git has to be called.
+    '''
+    common_dir = get_git_common_dir(git_dir)
+    # read the refs: name -> sha1, and the sha1 of the annotated tags
+    # of packed-refs
+    refs = {}
+    peeled = {}
+    fully_peeled = False
+    try:
+        with open(os.path.join(common_dir, "packed-refs")) as f:
+            last_ref = None
+            for line in f:
+                line = line.strip()
+                if line.startswith("#"):
+                    # the packed tags without ^ line are not annotated
+                    fully_peeled = " peeled" in line
+                    continue
+                if not line:
+                    continue
+                if line.startswith("^"):
+                    peeled[last_ref] = line[1:]
+                    continue
+                sha1, last_ref = line.split(" ", 1)
+                refs[last_ref] = sha1
+                if fully_peeled:
+                    peeled[last_ref] = sha1
+    except IOError:
+        pass
+    except ValueError:
+        return None
+    refs_dir = os.path.join(common_dir, "refs")
+    for root, dirs, files in os.walk(refs_dir):
+        for file_name in files:
+            path = os.path.join(root, file_name)
+            ref = os.path.relpath(path, common_dir).replace(os.sep, "/")
+            try:
+                with open(path) as f:
+                    refs[ref] = f.read().strip()
+            except IOError:
+                return None
+            peeled.pop(ref, None)
+
+    # the commit of HEAD
+    try:
+        with open(os.path.join(git_dir, "HEAD")) as f:
+            head = f.read().strip()
+    except IOError:
+        return None
+    while head.startswith("ref:"):
+        head = refs.get(head[4:].strip())
+        if head is None:
+            return None
+
+    # the tags of HEAD
+    tags = [ref for ref in refs if ref.startswith("refs/tags/")]
+    if len(tags) == 0:
+        return False
+    head_tags = []
+    for ref in tags:
+        sha1 = refs[ref]
+        if ref in peeled:
+            sha1 = peeled[ref]
+        else:
+            # a loose annotated tag is an object to read
+            obj = read_git_object(common_dir, sha1)
+            while obj is not None and obj[0] == "tag":
+                sha1 = obj[1].split(b"\n", 1)[0].split(b" ")[1].decode()
+                obj = read_git_object(common_dir, sha1)
+            if obj is None and sha1 != head:
+                # packed object: it may be a tag of HEAD
+                return None
+        if sha1 == head:
+            head_tags.append(ref[len("refs/tags/"):])
+    # no tag of HEAD, or several ones: git chooses
+    if len(head_tags) != 1:
+        return None
+    return head_tags[0]
+
+def git_extract(from_what, tag, git_options, where, logger, environment=None,
+                retry_wait=None):
   '''Extracts sources from a git repository.
 87
   :param from_what str: The remote git repository.
@@ -127,6 +369,8 @@ def git_extract(from_what, tag, git_options, where, logger, environment=None):
   :param where str: The path where to extract.
   :param logger Logger: The logger instance to use.
   :param environment src.environment.Environ: The environment to source when extracting.
+  :param retry_wait function: The function called with the delay in seconds
+                              before a new try, time.sleep by default.
   :return: True if the extraction is successful
   :rtype: boolean
   '''
@@ -185,6 +429,8 @@ exit $res
   i_try = 0
   max_number_of_tries = 3
   sleep_delay = 30  # seconds
+  if retry_wait is None:
+    retry_wait = time.sleep
   while (True):
     i_try += 1
     rc = UTS.Popen(cmd, cwd=str(where.dir()), env=environment.environ.environ, logger=logger)
@@ -192,12 +438,13 @@ exit $res
       break
     logger.write('\ngit command failed! Wait %d seconds and give an other try (%d/%d)\n' % \
                  (sleep_delay, i_try + 1, max_number_of_tries), 3)
-    time.sleep(sleep_delay) # wait a little
+    retry_wait(sleep_delay) # wait a little
 
   return rc.isOk()
 
 
-def git_extract_sub_dir(from_what, tag, git_options, where, sub_dir, logger, environment=None):
+def git_extract_sub_dir(from_what, tag, git_options, where, sub_dir, logger, environment=None,
+                        retry_wait=None):
   '''Extracts sources from a subtree sub_dir of a git repository.
 
   :param from_what str: The remote git repository.
@@ -207,6 +454,8 @@ def git_extract_sub_dir(from_what, tag, git_options, where, sub_dir, logger, env
   :param sub_dir str: The relative path of subtree to extract.
   :param logger Logger: The logger instance to use.
   :param environment src.environment.Environ: The environment to source when extracting.
+  :param retry_wait function: The function called with the delay in seconds
+                              before a new try, time.sleep by default.
   :return: True if the extraction is successful
   :rtype: boolean
   '''
@@ -255,30 +504,173 @@ rm -rf $tmpDir
 
   DBG.write("cmd", cmd)
 
+  if retry_wait is None:
+    retry_wait = time.sleep
   for nbtry in range(0,3): # retries case of network problem
     rc = UTS.Popen(cmd, cwd=parentWhere, env=environment.environ.environ, logger=logger)
-    if rc.isOk(): break
-    time.sleep(30) # wait a little
+    if rc.isOk() or nbtry == 2: break
+    retry_wait(30) # wait a little
 
   return rc.isOk()
 
-def archive_extract(from_what, where, logger):
-    '''Extracts sources from an archive.
+# the compressions of the archives: (magic number, name, the programs
+# decompressing it, the first found is used). The programs run in parallel
+# with the extraction (pigz, xz and lbzip2 with several threads), and
+# check the end of the compressed stream.
+ARCHIVE_COMPRESSIONS = [
+    (b"\x1f\x8b", "gzip", [["pigz", "-dc"], ["gzip", "-dc"]]),
+    (b"\xfd7zXZ\x00", "xz", [["xz", "-dc", "-T0"]]),
+    (b"\x28\xb5\x2f\xfd", "zstd", [["zstd", "-dc"]]),
+    (b"BZh", "bzip2", [["lbzip2", "-dc"], ["pbzip2", "-dc"],
+                       ["bzip2", "-dc"]]),
+]
+
+def get_archive_compression(path):
+    '''Get the compression of an archive, from its first bytes.
+
+    :param path str: The path to the archive.
+    :return: "gzip", "xz", "zstd", "bzip2", or None if it is not compressed
+             (or not known)
+    :rtype: str
+    '''
+    with open(path, "rb") as f:
+        head = f.read(8)
+    for magic, name, commands in ARCHIVE_COMPRESSIONS:
+        if head.startswith(magic):
+            return name
+    return None
+
+def get_decompress_command(compression):
+    '''Get the command decompressing an archive to its standard output.
+
+    :param compression str: The compression (see get_archive_compression).
+    :return: The command, None if no program is found.
+    :rtype: list
+    '''
+    for magic, name, commands in ARCHIVE_COMPRESSIONS:
+        if name != compression:
+            continue
+        for command in commands:
+            path = src.compilation.find_program(command[0])
+            if path is not None:
+                return [path] + command[1:]
+    return None
+
+def feed_process(process, path, checksums):
+    '''Write a file to the standard input of a process, updating
+       checksums with its bytes, and close the input.
+
+    :param process subprocess.Popen: The process.
+    :param path str: The path to the file.
+    :param checksums list: The hashlib objects to update.
+    '''
+    try:
+        with open(path, "rb") as f:
+            reader = src.checksum.HashingReader(f, checksums)
+            for chunk in iter(lambda: reader.read(src.checksum.CHUNK_SIZE),
+                              b""):
+                process.stdin.write(chunk)
+    except (IOError, OSError, ValueError):
+        pass # the process has stopped, its return code tells why
+    finally:
+        try:
+            process.stdin.close()
+        except (IOError, OSError):
+            pass
+
+def archive_extract(from_what, where, logger=None, checksums=None,
+                    members=None):
+    '''Extracts sources from an archive, in a single pass: the archive
+    is read as a stream, decompressed by an external program (pigz, xz,
+    zstd...) if it is found, and the common prefix of the names of its
+    members is computed during the extraction.
     
     :param from_what str: The path to the archive.
     :param where str: The path where to extract.
     :param logger Logger: The logger instance to use.
-    :return: True if the extraction is successful
-    :rtype: boolean
+    :param checksums list: The hashlib objects to update with the bytes
+                           of the archive, read during the extraction.
+    :param members list: The list to complete with the names of the
+                         extracted files and directories at the top of
+                         where.
+    :return: True if the extraction is successful, and the common prefix
+             of the names of the members of the archive
+    :rtype: (boolean, str)
     '''
+    t0 = time.time()
+    process = None
+    feeder = None
+    f = None
     try:
-        archive = tarfile.open(from_what)
-        for i in archive.getmembers():
-            archive.extract(i, path=str(where))
-        return True, os.path.commonprefix(archive.getnames())
+        compression = get_archive_compression(from_what)
+        command = get_decompress_command(compression)
+        if command is not None and checksums:
+            process = SP.Popen(command, stdin=SP.PIPE, stdout=SP.PIPE,
+                               stderr=SP.PIPE)
+            feeder = threading.Thread(target=feed_process,
+                                      args=(process, from_what, checksums))
+            feeder.daemon = True
+            feeder.start()
+            archive = tarfile.open(fileobj=process.stdout, mode="r|")
+        elif command is not None:
+            process = SP.Popen(command + [from_what], stdout=SP.PIPE,
+                               stderr=SP.PIPE)
+            archive = tarfile.open(fileobj=process.stdout, mode="r|")
+        elif compression == "zstd":
+            raise src.SatException(_("zstd is needed to extract %s") %
+                                   from_what)
+        else:
+            f = open(from_what, "rb")
+            reader = src.checksum.HashingReader(f, checksums or [])
+            archive = tarfile.open(fileobj=reader, mode="r|*")
+        prefix = None
+        size = 0
+        for member in archive:
+            archive.extract(member, path=str(where))
+            if members is not None:
+                top = os.path.normpath(member.name).split(os.sep)[0]
+                if top not in (".", "..") and top not in members:
+                    members.append(top)
+            if prefix is None:
+                prefix = member.name
+            else:
+                prefix = os.path.commonprefix([prefix, member.name])
+            size += member.size
+        archive.close()
+        if process is not None:
+            # the end of the archive may not have been read
+            while process.stdout.read(src.checksum.CHUNK_SIZE):
+                pass
+            if feeder is not None:
+                feeder.join()
+            err = process.stderr.read()
+            process.wait()
+            if process.returncode != 0:
+                raise src.SatException("%s: %s" % (" ".join(command),
+                                       err.decode("utf-8", "replace").strip()))
+        elif checksums:
+            reader.read_all()
+        duration = max(time.time() - t0, 0.001)
+        if logger is not None:
+            logger.write(_("Extracted %(archive)s: %(size).1f MB in %(time).1fs"
+                           " (%(rate).1f MB/s, %(tool)s)\n") % {
+                         "archive" : os.path.basename(from_what),
+                         "size" : size / 1e6,
+                         "time" : duration,
+                         "rate" : size / 1e6 / duration,
+                         "tool" : os.path.basename(command[0])
+                                  if command is not None else "python"}, 5)
+        return True, prefix or ""
     except Exception as exc:
-        logger.write("archive_extract: %s\n" % exc)
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+        if logger is not None:
+            logger.write("archive_extract: %s\n" % exc)
         return False, None
+    finally:
+        if f is not None:
+            f.close()
 
 def cvs_extract(protocol, user, server, base, tag, product, where,
                 logger, checkout=False, environment=None):
@@ -384,8 +776,24 @@ def svn_extract(user,
                            stderr=SP.STDOUT)
     return (res == 0)
 
+# the file read to get the installed debian packages
+DPKG_STATUS_FILE = "/var/lib/dpkg/status"
+# if set, the file read instead of the database of the package manager:
+# a dpkg status file, or the lines "<name> <version>" of the rpm packages
+PKG_STATUS_FILE_VARIABLE = "SAT_PKG_STATUS_FILE"
+
+# cache of get_pkg_check_cmd: distribution name -> command
+_pkg_check_cmds = {}
+# cache of get_installed_packages: (package manager, status file) ->
+# installed package name -> list of the installed versions
+_installed_packages = {}
+
 def get_pkg_check_cmd(dist_name):
-    '''Build the command to use for checking if a linux package is installed or not.'''
+    """Build the command to use for checking if a linux package is installed or not.
+    The result is cached, the package manager is searched once.
+    """
+    if dist_name in _pkg_check_cmds:
+        return list(_pkg_check_cmds[dist_name])
 
     if dist_name in ["CO","FD","MG","MD","CO","OS"]: # linux using rpm
         linux="RH"  
@@ -410,15 +818,132 @@ def get_pkg_check_cmd(dist_name):
             else:
                 # no package manager was found corresponding to dist_name
                 raise src.SatException(manager_msg_err)
-    return cmd_is_package_installed
+    _pkg_check_cmds[dist_name] = cmd_is_package_installed
+    return list(cmd_is_package_installed)
+
+def read_dpkg_status(lines):
+    """Get the installed packages from the lines of a dpkg status file.
+
+    :param lines iterable: The lines of the file.
+    :return: package name -> list of the installed versions
+    :rtype: dict
+    """
+    res = {}
+    fields = {}
+    for line in list(lines) + [""]:
+        line = line.rstrip("\n")
+        if line == "": # end of the paragraph of a package
+            status = fields.get("Status", "").split()
+            if "Package" in fields and status[-1:] == ["installed"]:
+                version = fields.get("Version", "")
+                if fields.get("Architecture"):
+                    version += " " + fields["Architecture"]
+                res.setdefault(fields["Package"], []).append(version)
+            fields = {}
+        elif not line[0].isspace() and ":" in line: # not a continuation
+            key, value = line.split(":", 1)
+            fields[key] = value.strip()
+    return res
+
+def read_rpm_list(lines):
+    """Get the installed packages from the lines "<name> <version>" written
+    by rpm -qa --qf "%{NAME} %{VERSION}-%{RELEASE}.%{ARCH}\n".
+
+    :param lines iterable: The lines.
+    :return: package name -> list of the installed versions
+    :rtype: dict
+    """
+    res = {}
+    for line in lines:
+        words = line.split()
+        if len(words) == 2:
+            res.setdefault(words[0], []).append(words[1])
+    return res
+
+def get_installed_packages(check_cmd, status_file=None):
+    """Get the packages installed on the system, read once with a single
+    query of the package manager (the dpkg status file, rpm -qa).
+
+    :param check_cmd list: The command of the package manager
+                           (see get_pkg_check_cmd).
+    :param status_file str: If not None, the file to read instead of the
+                            database of the package manager (a dpkg status
+                            file, or the output of rpm -qa, see
+                            read_rpm_list), SAT_PKG_STATUS_FILE by default.
+    :return: package name -> list of the installed versions,
+             None if the packages cannot be read.
+    :rtype: dict
+    """
+    if status_file is None:
+        status_file = os.environ.get(PKG_STATUS_FILE_VARIABLE) or None
+    key = (check_cmd[0], status_file)
+    if key in _installed_packages:
+        return _installed_packages[key]
+    t0 = time.time()
+    res = None
+    try:
+        if status_file is not None:
+            with open(status_file) as f:
+                lines = f.readlines()
+            if any([line.startswith("Package:") for line in lines]):
+                res = read_dpkg_status(lines)
+            else:
+                res = read_rpm_list(lines)
+        elif check_cmd[0] == "apt":
+            with open(DPKG_STATUS_FILE) as f:
+                res = read_dpkg_status(f)
+        else:
+            p = SP.Popen(["rpm", "-qa", "--qf",
+                          "%{NAME} %{VERSION}-%{RELEASE}.%{ARCH}\\n"],
+                         stdout=SP.PIPE, stderr=SP.PIPE)
+            output, __ = p.communicate()
+            if p.returncode == 0:
+                res = read_rpm_list(
+                    output.decode("utf-8", "ignore").splitlines())
+    except (IOError, OSError) as e:
+        DBG.write("cannot read the installed packages", str(e))
+    DBG.write("installed packages read in %.3fs" % (time.time() - t0),
+              None if res is None else len(res))
+    _installed_packages[key] = res
+    return res
+
+def find_system_pkg(packages, package_manager, pkg):
+    """Find a package in the installed packages, like the package manager:
+    the names starting with pkg for apt (the versions may be in the names of
+    the debian packages), the name, or name-version[-release] for rpm.
+
+    :param packages dict: The installed packages (see get_installed_packages).
+    :param package_manager str: "apt" or "rpm".
+    :param pkg str: The package to find.
+    :return: The installed packages found, as "name-version" for rpm.
+    :rtype: list
+    """
+    res = []
+    if package_manager == "apt":
+        for name in sorted(packages):
+            if name.startswith(pkg):
+                res.append(name)
+        return res
+    for name in sorted(packages):
+        if not pkg.startswith(name):
+            continue
+        for version in packages[name]:
+            full_name = "%s-%s" % (name, version)
+            if pkg == name or full_name == pkg or \
+               full_name.startswith(pkg + "-") or \
+               full_name.startswith(pkg + "."):
+                res.append(full_name)
+    return res
+
+def query_system_pkg(check_cmd, pkg):
+    """Check if a package is installed with a query of the package manager,
+    used if the installed packages cannot be read.
 
-def check_system_pkg(check_cmd,pkg):
-    '''Check if a package is installed
     :param check_cmd list: the list of command to use system package manager
-    :param user str: the pkg name to check
+    :param pkg str: the pkg name to check
     :rtype: str
     :return: a string with package name with status un message
-    '''
+    """
     # build command
     FNULL = open(os.devnull, 'w')
     cmd_is_package_installed=[]
@@ -456,3 +981,26 @@ def check_system_pkg(check_cmd,pkg):
             msg_status+=" (package is not installed!)\n"
 
     return msg_status
+
+def check_system_pkg(check_cmd,pkg):
+    """Check if a package is installed, in the installed packages read once
+    (see get_installed_packages).
+
+    :param check_cmd list: the list of command to use system package manager
+    :param pkg str: the pkg name to check
+    :rtype: str
+    :return: a string with package name with status un message
+    """
+    packages = get_installed_packages(check_cmd)
+    if packages is None:
+        return query_system_pkg(check_cmd, pkg)
+    found = find_system_pkg(packages, check_cmd[0], pkg)
+    if not found:
+        msg_status=src.printcolors.printcError("KO")
+        msg_status+=" (package is not installed!)\n"
+    elif check_cmd[0]=="apt":
+        msg_status=src.printcolors.printcSuccess("OK")
+    else:
+        msg_status=src.printcolors.printcSuccess("OK")
+        msg_status+=" (" + " ".join(found) + ")\n"
+    return msg_status
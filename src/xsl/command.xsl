@@ -95,6 +95,40 @@
     
   </table>
   
+  <xsl:if test="SATcommand/Steps">
+  <h1>Steps</h1>
+  <table border="1">
+    <xsl:for-each select="SATcommand/Steps/step">
+      <tr>
+        <td bgcolor="Beige">
+          <xsl:value-of select="@product"/>
+        </td>
+        <td bgcolor="Beige">
+          <a>
+            <xsl:attribute name="title">Click to open the log of the product</xsl:attribute>
+            <xsl:if test="@passed='0'">
+              <xsl:attribute name="class">OK2</xsl:attribute>
+            </xsl:if>
+            <xsl:if test="@passed!='0'">
+              <xsl:attribute name="class">KO2</xsl:attribute>
+            </xsl:if>
+            <xsl:attribute name="href"><xsl:value-of select="."/></xsl:attribute>
+            <xsl:value-of select="@step"/>
+          </a>
+        </td>
+        <td bgcolor="LightBlue">
+          <xsl:value-of select="@time"/>s
+        </td>
+        <td bgcolor="LightBlue">
+          <xsl:if test="@max_rss and @max_rss!='0'">
+            <xsl:value-of select="format-number(@max_rss div 1024, '0')"/> MB
+          </xsl:if>
+        </td>
+      </tr>
+    </xsl:for-each>
+  </table>
+  </xsl:if>
+  
   <h1>output 
   <a target="_blank">
     <xsl:attribute name="title">Click to open in an editor</xsl:attribute>
@@ -254,7 +254,78 @@ Bienvenue, Yves
 
     res = cfg.cc
     DBG.write("test_120 cfg.cc debug", res)
-    
+
+  def test_130(self):
+    # copyContainer: same values, independent containers
+    inStream = DBG.InStream(_EXAMPLES[1])
+    cfg = PYF.Config(inStream)
+    cfg2 = PYF.copyContainer(cfg)
+    self.assertEqual(cfg2.messages[2].stream, "sys.stderr")
+    self.assertEqual(cfg2.messages[1].name, "Ruud")
+    cfg2.messages[0].stream = "modified"
+    cfg2.added = "yes"
+    self.assertEqual(cfg.messages[0].stream, "sys.stderr")
+    self.assertEqual(cfg2.messages[2].stream, "modified")
+    self.assertNotIn("added", cfg)
+    self.assertIn("added", cfg2)
+
+  def test_140(self):
+    # DeferredConfig: read on first access only
+    nb_read = []
+    def loader():
+      nb_read.append(1)
+      return PYF.Config(DBG.InStream(_EXAMPLES[2]))
+    cfg = PYF.Config(DBG.InStream(_EXAMPLES[3]))
+    cfg.lazy = PYF.DeferredConfig(loader)
+    cfg.bad = PYF.DeferredConfig(lambda: None)
+    cfg2 = PYF.copyContainer(cfg)
+    self.assertIn("lazy", cfg)
+    self.assertEqual(len(nb_read), 0)
+    self.assertEqual(cfg.lazy.bb, 333)
+    self.assertEqual(cfg2.lazy.bb, 333)
+    self.assertEqual(len(nb_read), 1)
+    cfg2.lazy.aa = 0
+    self.assertEqual(cfg.lazy.aa, 111)
+    self.assertIn("bad", cfg)
+    with self.assertRaises(AttributeError):
+      cfg.bad
+    self.assertNotIn("bad", cfg)
+
+  def test_150(self):
+    # cached evaluations, invalidated by a modification
+    cfg = PYF.Config(DBG.InStream(_EXAMPLES[5]))
+    PYF.resetResolutionStats()
+    self.assertEqual(cfg.dd.d4, "Herve bye")
+    self.assertEqual(cfg.dd.d4, "Herve bye")
+    self.assertEqual(cfg.cc[3], "Herve hello")
+    stats = PYF.getResolutionStats()
+    self.assertEqual(stats["hits"], 1)
+    cfg.bb = "Yves"
+    self.assertEqual(cfg.dd.d4, "Yves bye")
+    self.assertEqual(cfg.cc[3], "Yves hello")
+    cfg2 = PYF.copyContainer(cfg)
+    cfg2.bb = "Ruud"
+    self.assertEqual(cfg2.dd.d4, "Ruud bye")
+    self.assertEqual(cfg.dd.d4, "Yves bye")
+    cfg.__delitem__("bb")
+    with self.assertRaises(PYF.ConfigResolutionError):
+      cfg.dd.d4
+
+  def test_160(self):
+    # the backtick references are evaluated at each access
+    cfg = PYF.Config(DBG.InStream(
+      'aa : `os.environ["SAT_TEST_PYCONF"]`\nbb : $aa + "/x"\n'))
+    cfg.addNamespace(os)
+    os.environ["SAT_TEST_PYCONF"] = "v1"
+    try:
+      self.assertEqual(cfg.aa, "v1")
+      self.assertEqual(cfg.bb, "v1/x")
+      os.environ["SAT_TEST_PYCONF"] = "v2"
+      self.assertEqual(cfg.aa, "v2")
+      self.assertEqual(cfg.bb, "v2/x")
+    finally:
+      del os.environ["SAT_TEST_PYCONF"]
+
   def test_999(self):
     # one shot tearDown() for this TestCase
     # SAT.setLocale() # end test english
@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+import os
+import sys
+import glob
+import time
+import unittest
+
+import initializeTest # set PATH etc for test
+
+import src.debug as DBG # Easy print stderr (for DEBUG only)
+import src.pyconf as PYF
+from src.pyconf import EOF, WORD, NUMBER, STRING, TRUE, FALSE, NONE, \
+                       LBRACK2, LPAREN2, ConfigFormatError
+
+# the pyconf files used for the comparison and the benchmark:
+# the ones of salomeTools, plus the ones of the directory given by
+# the SAT_PYCONF_BENCH_DIR environment variable (a products directory
+# of a project for example)
+satdir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+def get_pyconf_files():
+  res = []
+  for pattern in ["src/internal_config/*.pyconf",
+                  "data/*.pyconf",
+                  "test/APPLI_TEST/*.pyconf"]:
+    res += glob.glob(os.path.join(satdir, pattern))
+  bench_dir = os.getenv("SAT_PYCONF_BENCH_DIR")
+  if bench_dir:
+    res += glob.glob(os.path.join(bench_dir, "*.pyconf"))
+  return sorted(res)
+
+_EXAMPLES = {
+1 : """\
+  aa: 111 # a comment
+  bb: 1.5
+  cc : [1, 2.,3 4]
+  dd: {x: "x\\"y" y: 'it\\'s' z: '' t: ""}
+  # two
+  # comments
+  ee: $aa + 222
+  ff: `os.getcwd()`
+  gg: True hh: False ii: None
+""",
+
+2 : """\
+  aa: '''a
+multiline "string"
+'''
+  bb: \"\"\"other\"\"\" cc: word12.attr[0](1)
+""",
+
+3 : """\
+  aa: 'unterminated
+""",
+
+4 : """\
+  aa: 12
+  bb: !oops
+""",
+
+5 : """aa: ''""",
+
+6 : """aa: 12""",
+
+7 : """aa: word""",
+}
+
+class LegacyConfigReader(PYF.ConfigReader):
+    """The ConfigReader reading the stream char by char (before buffering)"""
+
+    def setStream(self, stream):
+        self.stream = stream
+        if hasattr(stream, 'name'):
+            filename = stream.name
+        else:
+            filename = '?'
+        self.filename = filename
+        self.lineno = 1
+        self.colno = 1
+
+    def getChar(self):
+        """
+        Get the next char from the stream. Update line and column numbers
+        appropriately.
+
+        @return: The next character from the stream.
+        @rtype: str
+        """
+        if self.pbchars:
+            c = self.pbchars.pop()
+            if isinstance(c,bytes):
+                c = c.decode()
+        else:
+            c = self.stream.read(1)
+            if isinstance(c,bytes):
+                c = c.decode()
+            self.colno += 1
+            if c == '\n':
+                self.lineno += 1
+                self.colno = 1
+        return c
+
+    def getToken(self):
+        """
+        Get a token from the stream. String values are returned in a form
+        where you need to eval() the returned value to get the actual
+        string. The return value is (token_type, token_value).
+
+        Multiline string tokenizing is thanks to David Janes (BlogMatrix)
+
+        @return: The next token.
+        @rtype: A token tuple.
+        """
+        if self.pbtokens:
+            return self.pbtokens.pop()
+        stream = self.stream
+        self.comment = None
+        token = ''
+        tt = EOF
+        while True:
+            c = self.getChar()
+            if not c:
+                break
+            elif c == '#':
+                if self.comment :
+                    self.comment += '#' + stream.readline()
+                else :
+                    self.comment = stream.readline()
+                self.lineno += 1
+                continue
+            if c in self.quotes:
+                token = c
+                quote = c
+                tt = STRING
+                escaped = False
+                multiline = False
+                c1 = self.getChar()
+                if c1 == quote:
+                    c2 = self.getChar()
+                    if c2 == quote:
+                        multiline = True
+                        token += quote
+                        token += quote
+                    else:
+                        self.pbchars.append(c2)
+                        self.pbchars.append(c1)
+                else:
+                    self.pbchars.append(c1)
+                while True:
+                    c = self.getChar()
+                    if not c:
+                        break
+                    token += c
+                    if (c == quote) and not escaped:
+                        if not multiline or (len(token) >= 6 and token.endswith(token[:3]) and token[-4] != '\\'):
+                            break
+                    if c == '\\':
+                        escaped = not escaped
+                    else:
+                        escaped = False
+                if not c:
+                    raise ConfigFormatError('%s: Unterminated quoted string: %r, %r' % (self.location(), token, c))
+                break
+            if c in self.whitespace:
+                self.lastc = c
+                continue
+            elif c in self.punct:
+                token = c
+                tt = c
+                if (self.lastc == ']') or (self.lastc in self.identchars):
+                    if c == '[':
+                        tt = LBRACK2
+                    elif c == '(':
+                        tt = LPAREN2
+                break
+            elif c in self.digits:
+                token = c
+                tt = NUMBER
+                while True:
+                    c = self.getChar()
+                    if not c:
+                        break
+                    if c in self.digits:
+                        token += c
+                    elif (c == '.') and token.find('.') < 0:
+                        token += c
+                    else:
+                        if c and (c not in self.whitespace):
+                            self.pbchars.append(c)
+                        break
+                break
+            elif c in self.wordchars:
+                token = c
+                tt = WORD
+                c = self.getChar()
+                while c and (c in self.identchars):
+                    token += c
+                    c = self.getChar()
+                if c: # and c not in self.whitespace:
+                    self.pbchars.append(c)
+                if token == "True":
+                    tt = TRUE
+                elif token == "False":
+                    tt = FALSE
+                elif token == "None":
+                    tt = NONE
+                break
+            else:
+                raise ConfigFormatError('%s: Unexpected character: %r' % (self.location(), c))
+        if token:
+            self.lastc = token[-1]
+        else:
+            self.lastc = None
+        self.last_token = tt
+        
+        # Python 2.x specific unicode conversion
+        if sys.version_info[0] == 2 and tt == WORD and isinstance(token, unicode):
+            token = token.encode('ascii')
+        return (tt, token)
+
+def get_tokens(readerClass, stream):
+  """get all the tokens of a stream, with their comment and location"""
+  reader = readerClass(PYF.Config())
+  reader.setStream(stream)
+  res = []
+  while True:
+    try:
+      token = reader.getToken()
+    except PYF.ConfigFormatError as e:
+      res.append(("ERROR", str(e)))
+      break
+    res.append((token, reader.comment, reader.location()))
+    if token[0] == PYF.EOF:
+      break
+  return res
+
+def count_tokens(readerClass, stream):
+  """get the number of tokens of a stream (for the benchmark)"""
+  reader = readerClass(PYF.Config())
+  reader.setStream(stream)
+  res = 1
+  while reader.getToken()[0] != PYF.EOF:
+    res += 1
+  return res
+
+class TestCase(unittest.TestCase):
+  "Test the buffered tokenizer of pyconf ConfigReader"""
+
+  def test_000(self):
+    # one shot setUp() for this TestCase
+    # DBG.push_debug(True)
+    return
+
+  def test_010(self):
+    # same tokens, comments and locations on examples
+    for ii in sorted(_EXAMPLES):
+      legacy = get_tokens(LegacyConfigReader, DBG.InStream(_EXAMPLES[ii]))
+      res = get_tokens(PYF.ConfigReader, DBG.InStream(_EXAMPLES[ii]))
+      DBG.write("test_010 tokens %s" % ii, res)
+      self.assertEqual(res, legacy)
+
+  def test_020(self):
+    # same error messages
+    res = get_tokens(PYF.ConfigReader, DBG.InStream(_EXAMPLES[3]))
+    self.assertEqual(res[-1][0], "ERROR")
+    self.assertIn("Unterminated quoted string", res[-1][1])
+    res = get_tokens(PYF.ConfigReader, DBG.InStream(_EXAMPLES[4]))
+    self.assertEqual(res[-1][0], "ERROR")
+    self.assertIn("Unexpected character: '!'", res[-1][1])
+
+  def test_030(self):
+    # same tokens, comments and locations on real pyconf files
+    for path in get_pyconf_files():
+      with open(path, "rb") as f:
+        legacy = get_tokens(LegacyConfigReader, PYF.ConfigInputStream(f))
+      with open(path, "rb") as f:
+        res = get_tokens(PYF.ConfigReader, PYF.ConfigInputStream(f))
+      self.assertEqual(res, legacy, path)
+
+  def test_040(self):
+    # micro-benchmark of the legacy and the buffered readers
+    paths = get_pyconf_files()
+    nb_loop = 20
+    times = {}
+    for readerClass in [LegacyConfigReader, PYF.ConfigReader]:
+      t0 = time.time()
+      for ii in range(nb_loop):
+        for path in paths:
+          with open(path, "rb") as f:
+            count_tokens(readerClass, PYF.ConfigInputStream(f))
+      times[readerClass.__name__] = time.time() - t0
+    msg = "%d files x %d: legacy %.3fs, buffered %.3fs" % \
+          (len(paths), nb_loop, times["LegacyConfigReader"], times["ConfigReader"])
+    # the timings are only printed when launched as a script
+    DBG.write("test_040 tokenizer benchmark", msg, force=(__name__ == '__main__'))
+
+  def test_999(self):
+    # one shot tearDown() for this TestCase
+    # DBG.pop_debug()
+    return
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
+    pass
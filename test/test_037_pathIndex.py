@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import initializeTest # set PATH etc for test
+
+import src
+import src.pathIndex as PIDX
+
+def touch(path):
+  with open(path, "w") as f:
+    f.write("")
+
+class TestCase(unittest.TestCase):
+  "Test the index of the PATHS directories"""
+
+  def setUp(self):
+    self.tmpdir = tempfile.mkdtemp(prefix="sat_pathIndex_")
+    self.dir1 = os.path.join(self.tmpdir, "dir1")
+    self.dir2 = os.path.join(self.tmpdir, "dir2")
+    os.makedirs(os.path.join(self.dir1, "bin"))
+    os.makedirs(self.dir2)
+    touch(os.path.join(self.dir1, "aa.pyconf"))
+    touch(os.path.join(self.dir2, "aa.pyconf"))
+    touch(os.path.join(self.dir2, "bb.pyconf"))
+    touch(os.path.join(self.dir1, "bin", "cc.tgz"))
+
+  def tearDown(self):
+    shutil.rmtree(self.tmpdir)
+
+  def test_010(self):
+    # same results as the listing of the directories
+    idx = PIDX.PathIndex()
+    lpath = [self.dir1, os.path.join(self.tmpdir, "oops"), self.dir2]
+    self.assertEqual(idx.find_file("aa.pyconf", lpath),
+                     os.path.join(self.dir1, "aa.pyconf"))
+    self.assertEqual(idx.find_file("bb.pyconf", lpath),
+                     os.path.join(self.dir2, "bb.pyconf"))
+    self.assertEqual(idx.find_file("cc.tgz", lpath, "bin"),
+                     os.path.join(self.dir1, "bin", "cc.tgz"))
+    self.assertFalse(idx.find_file("cc.tgz", lpath))
+    self.assertFalse(idx.find_file("oops.pyconf", lpath))
+    self.assertEqual(src.find_file_in_lpath("bb.pyconf", lpath),
+                     os.path.join(self.dir2, "bb.pyconf"))
+
+  def test_020(self):
+    # a directory is listed again when it is modified
+    idx = PIDX.PathIndex()
+    self.assertFalse(idx.find_file("dd.pyconf", [self.dir2]))
+    touch(os.path.join(self.dir2, "dd.pyconf"))
+    os.utime(self.dir2, (0, 0))
+    self.assertEqual(idx.find_file("dd.pyconf", [self.dir2]),
+                     os.path.join(self.dir2, "dd.pyconf"))
+
+  def test_030(self):
+    # the index saved on disk is used by the next process
+    cache_file = os.path.join(self.tmpdir, "cache", "path_index.pickle")
+    os.utime(self.dir1, (1000, 1000)) # not modified recently
+    idx = PIDX.PathIndex()
+    idx.cache_file = cache_file
+    idx.find_file("aa.pyconf", [self.dir1])
+    idx.save()
+    self.assertTrue(os.path.exists(cache_file))
+
+    idx2 = PIDX.PathIndex()
+    idx2.cache_file = "" # no save at exit
+    idx2.set_cache_file(cache_file)
+    self.assertIn(self.dir1, idx2.dirs)
+    self.assertEqual(idx2.find_file("aa.pyconf", [self.dir1]),
+                     os.path.join(self.dir1, "aa.pyconf"))
+    self.assertFalse(idx2.modified)
+
+  def test_040(self):
+    # a directory modified just before its listing is listed again
+    idx = PIDX.PathIndex()
+    idx.find_file("aa.pyconf", [self.dir2])
+    idx.modified = False
+    self.assertEqual(idx.find_file("aa.pyconf", [self.dir2]),
+                     os.path.join(self.dir2, "aa.pyconf"))
+    self.assertTrue(idx.modified)
+    os.utime(self.dir2, (1000, 1000))
+    idx.find_file("aa.pyconf", [self.dir2])
+    idx.modified = False
+    idx.find_file("aa.pyconf", [self.dir2])
+    self.assertFalse(idx.modified)
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
+    pass
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+import os
+import sys
+import glob
+import time
+import pickle
+import unittest
+
+import initializeTest # set PATH etc for test
+
+import src.debug as DBG # Easy print stderr (for DEBUG only)
+import src.pyconf as PYF
+
+try:
+  import tracemalloc
+except ImportError: # python 2
+  tracemalloc = None
+
+satdir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# a product pyconf as the ones of the SALOME projects
+_PRODUCT = """\
+default :
+{
+    name : "%(name)s"
+    build_source : "cmake"
+    get_source : "git"
+    git_info :
+    {
+        repo : "https://git.salome-platform.org/%(name)s.git" # the repository
+        repo_dev : $repo
+    }
+    environ :
+    {
+        env_script : $name + ".py"
+    }
+    depend : [ "Python", "Qt", "Boost" ]
+    opt_depend : []
+    source_dir : $APPLICATION.workdir + $VARS.sep + 'SOURCES' + $VARS.sep + $name
+    build_dir : $APPLICATION.workdir + $VARS.sep + 'BUILD' + $VARS.sep + $name
+    install_dir : 'base'
+    properties :
+    {
+        is_SALOME_module : "yes"
+        incremental : "yes"
+    }
+    patches : [ ]
+}
+"""
+
+def get_application_config(nb_products):
+  """the config of an application: the sat pyconf and nb_products products"""
+  cfg = PYF.Config()
+  merger = PYF.ConfigMerger()
+  for name in ["src/internal_config/salomeTools.pyconf",
+               "src/internal_config/distrib.pyconf",
+               "data/local.pyconf",
+               "test/APPLI_TEST/APPLI_TEST.pyconf"]:
+    with open(os.path.join(satdir, name), "rb") as f:
+      merger.merge(cfg, PYF.Config(PYF.ConfigInputStream(f)))
+  cfg.VARS = PYF.Mapping(cfg)
+  cfg.VARS.sep = os.path.sep
+  cfg.APPLICATION.workdir = "/tmp/workdir"
+  products = PYF.Config()
+  products.addMapping("PRODUCTS", PYF.Mapping(products), "The products\n")
+  bench_dir = os.getenv("SAT_PYCONF_BENCH_DIR")
+  if bench_dir:
+    paths = sorted(glob.glob(os.path.join(bench_dir, "*.pyconf")))
+    for path in paths[:nb_products]:
+      name = os.path.basename(path)[:-len(".pyconf")]
+      with open(path, "rb") as f:
+        products.PRODUCTS[name] = PYF.Config(PYF.ConfigInputStream(f))
+  else:
+    for ii in range(nb_products):
+      name = "PRODUCT_%03d" % ii
+      products.PRODUCTS[name] = PYF.Config(PYF.ConfigInputStream(
+                                        DBG.InStream(_PRODUCT % {"name": name})))
+  merger.merge(cfg, products)
+  return cfg
+
+class TestCase(unittest.TestCase):
+  "Test the pyconf.py Mapping and Sequence store"""
+
+  def test_010(self):
+    # the keys keep the insertion order, the membership is on the keys
+    cfg = PYF.Config(DBG.InStream("bb: 1 # comment bb\naa: 2\ncc: [1 2 3]\n"))
+    cfg.dd = 4
+    cfg.bb = 5
+    self.assertEqual(cfg.keys(), ["bb", "aa", "cc", "dd"])
+    self.assertEqual(list(cfg), ["bb", "aa", "cc", "dd"])
+    cfg.__delitem__("aa")
+    self.assertEqual(cfg.keys(), ["bb", "cc", "dd"])
+    self.assertIn("cc", cfg)
+    self.assertNotIn("aa", cfg)
+    self.assertNotIn(["bb"], cfg)
+    self.assertEqual(len(cfg), 3)
+    self.assertEqual(cfg.bb, 5)
+    with self.assertRaises(AttributeError): # no __dict__
+      object.__setattr__(cfg, "dummy_attribute", 0)
+    # the comments of the keys and of the sequence items are kept
+    cfg = PYF.Config(DBG.InStream(
+             "aa: 1 # comment aa\n# comment bb\nbb: [1\n# comment 2\n2]\n"))
+    outStream = DBG.OutStream()
+    cfg.__save__(outStream)
+    res = outStream.value
+    self.assertIn("# comment bb", res)
+    self.assertIn("# comment 2", res)
+    self.assertEqual(res.index("# comment 2"), res.rindex("# comment"))
+
+  def test_020(self):
+    # the slots are pickled
+    cfg = get_application_config(5)
+    cfg2 = pickle.loads(pickle.dumps(cfg, pickle.HIGHEST_PROTOCOL))
+    self.assertEqual(cfg2.keys(), cfg.keys())
+    self.assertEqual(cfg2.PRODUCTS.keys(), cfg.PRODUCTS.keys())
+    self.assertEqual(cfg2.PRODUCTS.PRODUCT_004.default.source_dir,
+                     "/tmp/workdir/SOURCES/PRODUCT_004".replace("/", os.path.sep))
+    self.assertEqual(cfg2.PRODUCTS.PRODUCT_004.default.git_info.repo_dev,
+                     cfg.PRODUCTS.PRODUCT_004.default.git_info.repo)
+
+  def test_030(self):
+    # benchmark of the memory and of the membership tests
+    # of application configs kept alive (as by the jobs command)
+    # full size, and memory traced (slower), only when launched as a script
+    as_script = (__name__ == '__main__')
+    nb_products = 300 if as_script else 50
+    nb_configs = 4
+    trace = as_script and tracemalloc is not None
+    if trace:
+      tracemalloc.start()
+    t0 = time.time()
+    configs = [get_application_config(nb_products) for ii in range(nb_configs)]
+    t1 = time.time()
+    if trace:
+      memory, _ = tracemalloc.get_traced_memory()
+      tracemalloc.stop()
+    else:
+      memory = 0
+    products = configs[0].PRODUCTS
+    names = products.keys()
+    t2 = time.time()
+    nb = 0
+    for ii in range(20):
+      for name in names:
+        prod_info = products[name].default
+        for key in ["properties", "debug", "dev", "opt_depend", "patches"]:
+          if key in prod_info:
+            nb += 1
+        if name in products:
+          nb += 1
+    t3 = time.time()
+    self.assertEqual(nb, 20 * len(names) * 4)
+    msg = "%d configs of %d products: build %.3fs, memory %.1f MB, " \
+          "lookups %.3fs" % (nb_configs, len(names), t1 - t0,
+                             memory / 1024. / 1024., t3 - t2)
+    # the results are only printed when launched as a script
+    DBG.write("test_030 pyconf benchmark", msg, force=as_script)
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
+    pass
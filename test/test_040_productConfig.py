@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import initializeTest # set PATH etc for test
+
+import src
+import src.debug as DBG # Easy print stderr (for DEBUG only)
+import src.pyconf as PYF
+import src.product as PROD
+import src.salomeTools as SAT
+
+_CONFIG = """\
+LOCAL : { tag : "5.0.0" }
+INTERNAL : { config : { install_dir : "INSTALL" } }
+VARS : { sep : "/" }
+PATHS : { ARCHIVEPATH : [], PRODUCTPATH : [] }
+APPLICATION :
+{
+  name : "APPLI"
+  workdir : "/tmp/appli"
+  tag : "master"
+  products : { AA : "master", BB : "master", CC : "native" }
+}
+PRODUCTS :
+{
+  AA : { default : { name : "AA", get_source : "archive", depend : [] } }
+  BB : { default : { name : "BB", get_source : "archive", depend : ["AA"] } }
+  CC : { default : { name : "CC", get_source : "native", depend : ["BB"] } }
+}
+"""
+
+class TestCase(unittest.TestCase):
+  "Test the cache of the product configurations"""
+
+  def setUp(self):
+    SAT.setNotLocale() # test english
+
+  def get_config(self):
+    cfg = PYF.Config(DBG.InStream(_CONFIG))
+    for name in cfg.PRODUCTS.keys():
+      cfg.PRODUCTS[name].from_file = name + ".pyconf"
+    return cfg
+
+  def test_010(self):
+    # computed once, as long as the config is not modified
+    cfg = self.get_config()
+    stats0 = PROD.get_product_config_stats()
+    infos = PROD.get_products_infos(["AA", "BB", "CC"], cfg)
+    self.assertEqual(infos[1][1].install_dir, "/tmp/appli/INSTALL/BB")
+    self.assertIs(PROD.get_product_config(cfg, "BB"), infos[1][1])
+    self.assertEqual(PROD.get_product_dependencies(cfg, "CC", infos[2][1]),
+                     ["BB", "AA"])
+    self.assertEqual(PROD.get_product_dependencies(cfg, "BB", infos[1][1]),
+                     ["AA"])
+    stats = PROD.get_product_config_stats()
+    self.assertEqual(stats["computed"] - stats0["computed"], 3)
+    self.assertEqual(stats["avoided"] - stats0["avoided"], 4)
+
+    # a copy of the config has its own cache
+    cfg2 = PYF.copyContainer(cfg)
+    self.assertIsNot(PROD.get_product_config(cfg2, "BB"), infos[1][1])
+
+  def test_020(self):
+    # computed again after a modification of the config
+    cfg = self.get_config()
+    self.assertEqual(PROD.get_product_config(cfg, "AA").install_dir,
+                     "/tmp/appli/INSTALL/AA")
+    cfg.APPLICATION.workdir = "/tmp/appli2"
+    self.assertEqual(PROD.get_product_config(cfg, "AA").install_dir,
+                     "/tmp/appli2/INSTALL/AA")
+    self.assertEqual(PROD.get_product_dependencies(cfg, "BB", None), ["AA"])
+    cfg.PRODUCTS.BB.default.depend = []
+    self.assertEqual(PROD.get_product_dependencies(cfg, "BB", None), [])
+
+    # and after an explicit invalidation
+    stats0 = PROD.get_product_config_stats()
+    PROD.get_product_config(cfg, "AA")
+    PROD.invalidate_product_configs()
+    PROD.get_product_config(cfg, "AA")
+    stats = PROD.get_product_config_stats()
+    self.assertEqual(stats["computed"] - stats0["computed"], 1)
+    self.assertEqual(stats["invalidations"] - stats0["invalidations"], 1)
+
+  def test_030(self):
+    # the installation status is checked once, and updated by compile
+    cfg = self.get_config()
+    cfg.APPLICATION.workdir = tempfile.mkdtemp(prefix="sat_test_install_")
+    try:
+      p_info = PROD.get_product_config(cfg, "AA")
+      stats0 = PROD.get_installation_stats()
+      self.assertFalse(PROD.check_installation(cfg, p_info))
+      os.makedirs(p_info.install_dir)
+      PROD.add_compile_config_file(p_info, cfg)
+      self.assertFalse(PROD.check_installation(cfg, p_info)) # cached
+      PROD.set_installation_status(cfg, p_info, True)
+      self.assertTrue(PROD.check_installation(cfg, p_info))
+      stats = PROD.get_installation_stats()
+      self.assertEqual(stats["calls"] - stats0["calls"], 3)
+      self.assertEqual(stats["computed"] - stats0["computed"], 1)
+      # checked again after a sat clean --install
+      shutil.rmtree(p_info.install_dir)
+      PROD.invalidate_product_configs()
+      self.assertFalse(PROD.check_installation(cfg, p_info))
+    finally:
+      shutil.rmtree(cfg.APPLICATION.workdir)
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
+    pass
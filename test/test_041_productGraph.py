@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+import os
+import sys
+import time
+import random
+import unittest
+
+import initializeTest # set PATH etc for test
+
+import src
+import src.debug as DBG # Easy print stderr (for DEBUG only)
+import src.productGraph as PGRAPH
+
+def get_random_graph(nb_nodes, nb_depend, seed):
+  """a graph without cycle, each product depends on products added before"""
+  rand = random.Random(seed)
+  graph = PGRAPH.ProductGraph()
+  depends = {}
+  for ii in range(nb_nodes):
+    name = "P%04d" % ii
+    nb = min(ii, rand.randint(0, nb_depend))
+    depends[name] = ["P%04d" % jj for jj in rand.sample(range(ii), nb)]
+    rand.shuffle(depends[name])
+  # added in a random order
+  names = list(depends)
+  rand.shuffle(names)
+  for name in names:
+    graph.add_product(name, depends[name])
+  return graph, names, depends
+
+def depth_search(depends, start, visited):
+  """the reference recursive search"""
+  visited = visited + [start]
+  for node in depends[start]:
+    if node not in visited:
+      visited = depth_search(depends, node, visited)
+  return visited
+
+class TestCase(unittest.TestCase):
+  "Test the dependency graph of the products"""
+
+  def test_010(self):
+    # same results as the recursive search, topological order
+    graph, names, depends = get_random_graph(60, 4, 0)
+    for name in names:
+      self.assertEqual(graph.get_all_dependencies(name),
+                       depth_search(depends, name, [])[1:])
+    visited = []
+    for name in names[:5]:
+      if name not in visited:
+        visited = depth_search(depends, name, visited)
+    self.assertEqual(graph.depth_search(names[:5]), visited)
+    sorted_names = graph.topological_sort()
+    self.assertEqual(sorted(sorted_names), sorted(names))
+    position = dict((name, ii) for ii, name in enumerate(sorted_names))
+    for name in names:
+      for dep in depends[name]:
+        self.assertLess(position[dep], position[name])
+    # reverse dependencies
+    for name in names[:10]:
+      children = [n for n in names if name in depth_search(depends, n, [])[1:]]
+      self.assertEqual(graph.get_all_dependants([name]), children)
+      self.assertEqual(graph.get_dependants(name),
+                       [n for n in names if name in depends[n]])
+      for child in children:
+        self.assertTrue(graph.depends_on(child, [name]))
+
+  def test_020(self):
+    # the cycles are reported in full, the missing products are named
+    graph = PGRAPH.ProductGraph()
+    graph.add_product("AA", ["BB"])
+    graph.add_product("BB", ["CC"])
+    graph.add_product("CC", ["DD"])
+    graph.add_product("DD", ["BB"])
+    with self.assertRaises(src.SatException) as cm:
+      graph.topological_sort()
+    self.assertIn("BB -> CC -> DD -> BB", str(cm.exception))
+    self.assertEqual(graph.get_all_dependencies("AA"), ["BB", "CC", "DD"])
+    graph = PGRAPH.ProductGraph()
+    graph.add_product("AA", ["BB"])
+    with self.assertRaises(src.SatException) as cm:
+      graph.topological_sort()
+    self.assertIn("BB product is referenced", str(cm.exception))
+    self.assertNotIn("BB", graph)
+
+  def test_030(self):
+    # the build dependencies are followed only at compile time
+    for compile_time in [True, False]:
+      graph = PGRAPH.ProductGraph(compile_time)
+      graph.add_product("AA", ["BB"], ["CC"])
+      graph.add_product("BB", [], ["CC"])
+      graph.add_product("CC")
+      self.assertEqual(graph.get_dependencies("AA"), ["BB", "CC"])
+      self.assertEqual(graph.get_dependencies("AA", PGRAPH.BUILD), ["CC"])
+      self.assertEqual(graph.get_dependencies("AA", PGRAPH.RUNTIME), ["BB"])
+      if compile_time:
+        self.assertEqual(graph.get_all_dependencies("AA"), ["BB", "CC"])
+        self.assertEqual(graph.get_graph_dict()["AA"], ["BB", "CC"])
+        self.assertEqual(graph.topological_sort(), ["CC", "BB", "AA"])
+      else:
+        self.assertEqual(graph.get_all_dependencies("AA"), ["BB"])
+        self.assertEqual(graph.get_graph_dict()["AA"], ["BB"])
+        self.assertEqual(graph.topological_sort(), ["BB", "AA", "CC"])
+
+  def test_040(self):
+    # benchmark on a synthetic graph of 2000 products
+    # the results are only printed when launched as a script
+    as_script = (__name__ == '__main__')
+    t0 = time.time()
+    graph, names, depends = get_random_graph(2000, 8, 1)
+    t1 = time.time()
+    sorted_names = graph.topological_sort()
+    t2 = time.time()
+    nb = 0
+    for name in names:
+      nb += len(graph.get_all_dependencies(name))
+    t3 = time.time()
+    for name in names[:200]:
+      graph.get_all_dependants([name])
+    t4 = time.time()
+    self.assertEqual(len(sorted_names), 2000)
+    msg = "2000 products: build %.3fs, sort %.3fs, all dependencies %.3fs " \
+          "(%d), 200 reverse dependencies %.3fs" % \
+          (t1 - t0, t2 - t1, t3 - t2, nb, t4 - t3)
+    DBG.write("test_040 product graph benchmark", msg, force=as_script)
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
+    pass
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+import initializeTest # set PATH etc for test
+
+import src
+import src.debug as DBG # Easy print stderr (for DEBUG only)
+import src.pyconf as PYF
+import src.product as PROD
+import src.fingerprint as FGP
+import src.salomeTools as SAT
+
+_CONFIG = """\
+LOCAL : { tag : "5.0.0" }
+INTERNAL : { config : { install_dir : "INSTALL" } }
+VARS : { sep : "/", dist : "FD32" }
+PATHS : { ARCHIVEPATH : [], PRODUCTPATH : [] }
+APPLICATION :
+{
+  name : "APPLI"
+  workdir : "%(workdir)s"
+  tag : "master"
+  environ : { LC_NUMERIC : "C" }
+  products : { AA : "master", BB : "master", CC : "master" }
+}
+PRODUCTS :
+{
+  AA : { default : { name : "AA", get_source : "archive", depend : [],
+                     source_dir : "%(workdir)s/SOURCES/AA" } }
+  BB : { default : { name : "BB", get_source : "archive", depend : ["AA"],
+                     source_dir : "%(workdir)s/SOURCES/BB" } }
+  CC : { default : { name : "CC", get_source : "archive", depend : [],
+                     source_dir : "%(workdir)s/SOURCES/CC" } }
+}
+"""
+
+def has_git():
+  try:
+    return subprocess.call(["git", "--version"], stdout=subprocess.PIPE) == 0
+  except OSError:
+    return False
+
+class TestCase(unittest.TestCase):
+  "Test the fingerprints of the products"""
+
+  def setUp(self):
+    SAT.setNotLocale() # test english
+    self.workdir = tempfile.mkdtemp(prefix="sat_test_fingerprint_")
+
+  def tearDown(self):
+    shutil.rmtree(self.workdir, ignore_errors=True)
+
+  def write(self, path, text):
+    if not os.path.isdir(os.path.dirname(path)):
+      os.makedirs(os.path.dirname(path))
+    with open(path, "w") as f:
+      f.write(text)
+
+  def get_config(self):
+    cfg = PYF.Config(DBG.InStream(_CONFIG % {"workdir": self.workdir}))
+    for name in cfg.PRODUCTS.keys():
+      cfg.PRODUCTS[name].from_file = name + ".pyconf"
+      self.write(os.path.join(self.workdir, "SOURCES", name, "README"), name)
+    return cfg
+
+  def install(self, cfg, name):
+    # as the compile command does
+    p_info = PROD.get_product_config(cfg, name)
+    os.makedirs(p_info.install_dir)
+    PROD.add_compile_config_file(p_info, cfg)
+    PROD.set_installation_status(cfg, p_info, True)
+    FGP.Fingerprints(cfg).write_fingerprint(p_info)
+
+  def test_010(self):
+    # the hash of the files depends on the contents, not on the dates
+    source_dir = os.path.join(self.workdir, "src")
+    self.write(os.path.join(source_dir, "a", "file.txt"), "aa")
+    self.write(os.path.join(source_dir, "b.txt"), "bb")
+    hash1 = FGP.get_source_hash(source_dir)
+    os.utime(os.path.join(source_dir, "b.txt"), (0, 0))
+    self.assertEqual(FGP.get_source_hash(source_dir), hash1)
+    self.write(os.path.join(source_dir, "b.txt"), "bc")
+    self.assertNotEqual(FGP.get_source_hash(source_dir), hash1)
+    self.assertEqual(FGP.get_source_hash(os.path.join(self.workdir, "no")), "")
+
+  @unittest.skipUnless(has_git(), "git is not available")
+  def test_020(self):
+    # git tree id, with the uncommitted and the untracked files
+    source_dir = os.path.join(self.workdir, "repo")
+    self.write(os.path.join(source_dir, "file.txt"), "aa")
+    env = dict(os.environ, GIT_AUTHOR_NAME="sat", GIT_AUTHOR_EMAIL="sat@sat",
+               GIT_COMMITTER_NAME="sat", GIT_COMMITTER_EMAIL="sat@sat")
+    for cmd in [["git", "init", "-q"], ["git", "add", "file.txt"],
+                ["git", "commit", "-q", "-m", "init"]]:
+      subprocess.check_call(cmd, cwd=source_dir, env=env)
+    tree = subprocess.check_output(["git", "rev-parse", "HEAD^{tree}"],
+                                   cwd=source_dir).decode().strip()
+    self.assertEqual(FGP.get_source_hash(source_dir), "git:" + tree)
+    self.write(os.path.join(source_dir, "new.txt"), "bb")
+    self.assertNotEqual(FGP.get_source_hash(source_dir), "git:" + tree)
+    os.remove(os.path.join(source_dir, "new.txt"))
+    self.assertEqual(FGP.get_source_hash(source_dir), "git:" + tree)
+    # the index of the repository is not modified
+    status = subprocess.check_output(["git", "status", "--porcelain"],
+                                     cwd=source_dir).decode()
+    self.assertEqual(status, "")
+
+  def test_030(self):
+    # the changes of a product and of its dependencies are reported
+    cfg = self.get_config()
+    self.assertEqual(FGP.Fingerprints(cfg).get_changes("AA"), ["not installed"])
+    for name in ["AA", "BB", "CC"]:
+      self.install(cfg, name)
+    fingerprints = FGP.Fingerprints(cfg)
+    for name in ["AA", "BB", "CC"]:
+      self.assertEqual(fingerprints.get_changes(name), [])
+    self.write(os.path.join(self.workdir, "SOURCES", "AA", "README"), "AA2")
+    fingerprints = FGP.Fingerprints(cfg)
+    self.assertEqual(fingerprints.get_changes("AA"), ["sources changed"])
+    self.assertEqual(fingerprints.get_changes("BB"), ["dependency AA changed"])
+    self.assertEqual(fingerprints.get_changes("CC"), [])
+    cfg.PRODUCTS.CC.default.cmake_options = "-DOPT=ON"
+    self.assertEqual(FGP.Fingerprints(cfg).get_changes("CC"),
+                     ["configuration changed"])
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
+    pass
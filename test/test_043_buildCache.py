@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import initializeTest # set PATH etc for test
+
+import src
+import src.debug as DBG # Easy print stderr (for DEBUG only)
+import src.pyconf as PYF
+import src.product as PROD
+import src.buildCache as BCACHE
+import src.salomeTools as SAT
+
+_CONFIG = """\
+LOCAL : { tag : "5.0.0", build_cache : "%(cache)s", build_cache_max_size : 0,
+          workdir : "%(workdir)s" }
+INTERNAL : { config : { install_dir : "INSTALL" } }
+VARS : { sep : "/", dist : "FD32" }
+PATHS : { ARCHIVEPATH : [], PRODUCTPATH : [] }
+APPLICATION :
+{
+  name : "APPLI"
+  workdir : "%(workdir)s"
+  tag : "master"
+  products : { AA : "1.0", BB : "1.0" }
+}
+PRODUCTS :
+{
+  AA : { default : { name : "AA", get_source : "archive", depend : [],
+                     build_source : "cmake",
+                     cmake_options : "-DPREFIX=%(workdir)s/X" } }
+  BB : { default : { name : "BB", get_source : "archive", depend : ["AA"],
+                     build_source : "cmake" } }
+}
+"""
+
+class Logger(object):
+  def write(self, message, level=None):
+    pass
+
+class TestCase(unittest.TestCase):
+  "Test the build cache of the products"""
+
+  def setUp(self):
+    SAT.setNotLocale() # test english
+    self.tmp_dir = tempfile.mkdtemp(prefix="sat_test_build_cache_")
+    self.cache_dir = os.path.join(self.tmp_dir, "cache")
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+  def get_config(self, workdir, version="1.0"):
+    cfg = PYF.Config(DBG.InStream(_CONFIG % {"cache": self.cache_dir,
+                                             "workdir": workdir}))
+    for name in cfg.PRODUCTS.keys():
+      cfg.PRODUCTS[name].from_file = name + ".pyconf"
+    cfg.APPLICATION.products.AA = version
+    return cfg
+
+  def install(self, cfg, name, binary=False):
+    p_info = PROD.get_product_config(cfg, name)
+    os.makedirs(os.path.join(p_info.install_dir, "lib", "pkgconfig"))
+    with open(os.path.join(p_info.install_dir, "lib", name + ".so"), "wb") as f:
+      f.write(name.encode() * 100)
+      if binary: # rpath
+        f.write(b"\0" + p_info.install_dir.encode() + b"/lib\0")
+    with open(os.path.join(p_info.install_dir, "lib", "pkgconfig",
+                           name + ".pc"), "w") as f:
+      f.write("prefix=%s\nother=%s0\n" % (p_info.install_dir,
+                                          cfg.APPLICATION.workdir))
+    os.symlink(name + ".so", os.path.join(p_info.install_dir, "lib", "link.so"))
+    os.symlink(os.path.join(p_info.install_dir, "lib"),
+               os.path.join(p_info.install_dir, "lib64"))
+    PROD.add_compile_config_file(p_info, cfg)
+    return p_info
+
+  def test_010(self):
+    # stored from an application, restored at the same place and in another
+    # workdir, the paths of the workdir in the text files are replaced
+    logger = Logger()
+    workdir = os.path.join(self.tmp_dir, "w1")
+    cfg1 = self.get_config(workdir)
+    cache = BCACHE.BuildCache.from_config(cfg1)
+    self.assertTrue(BCACHE.is_cacheable(cfg1, PROD.get_product_config(cfg1, "AA")))
+    for name in ["AA", "BB"]:
+      cache.store(cfg1, self.install(cfg1, name), logger)
+    shutil.rmtree(os.path.join(workdir, "INSTALL"))
+    for other in [workdir, os.path.join(self.tmp_dir, "w3")]:
+      cfg2 = self.get_config(other)
+      cache2 = BCACHE.BuildCache.from_config(cfg2)
+      self.assertEqual(cache2.get_key(cfg2, "BB"), cache.get_key(cfg1, "BB"))
+      p_info = PROD.get_product_config(cfg2, "BB")
+      self.assertTrue(cache2.restore(cfg2, p_info, logger))
+      lib_dir = os.path.join(p_info.install_dir, "lib")
+      self.assertEqual(sorted(os.listdir(p_info.install_dir)),
+                       ["lib", "lib64"])
+      self.assertEqual(open(os.path.join(lib_dir, "BB.so")).read(), "BB" * 100)
+      self.assertEqual(open(os.path.join(lib_dir, "pkgconfig", "BB.pc")).read(),
+                       "prefix=%s\nother=%s0\n" % (p_info.install_dir,
+                                                   workdir))
+      self.assertEqual(os.readlink(os.path.join(lib_dir, "link.so")), "BB.so")
+      self.assertEqual(os.readlink(os.path.join(p_info.install_dir, "lib64")),
+                       lib_dir)
+    # a new version of a dependency changes the key
+    cfg4 = self.get_config(workdir, "2.0")
+    cache4 = BCACHE.BuildCache.from_config(cfg4)
+    self.assertNotEqual(cache4.get_key(cfg4, "BB"), cache.get_key(cfg1, "BB"))
+    self.assertFalse(cache4.restore(cfg4, PROD.get_product_config(cfg4, "BB"),
+                                    logger))
+
+  def test_012(self):
+    # the workdir is in a binary file: restored only in the same workdir
+    logger = Logger()
+    cfg1 = self.get_config(os.path.join(self.tmp_dir, "w1"))
+    cache = BCACHE.BuildCache.from_config(cfg1)
+    cache.store(cfg1, self.install(cfg1, "AA", True), logger)
+    cfg2 = self.get_config(os.path.join(self.tmp_dir, "w2"))
+    p_info = PROD.get_product_config(cfg2, "AA")
+    self.assertFalse(BCACHE.BuildCache.from_config(cfg2).restore(cfg2, p_info,
+                                                                 logger))
+    self.assertFalse(os.path.exists(p_info.install_dir))
+
+  def test_015(self):
+    # the contents of the patches are in the key
+    patch = os.path.join(self.tmp_dir, "AA.patch")
+    keys = []
+    for content in ["patch1", "patch2"]:
+      with open(patch, "w") as f:
+        f.write(content)
+      cfg = self.get_config(os.path.join(self.tmp_dir, "w1"))
+      cfg.PRODUCTS.AA.default.patches = [patch]
+      keys.append(BCACHE.BuildCache.from_config(cfg).get_key(cfg, "AA"))
+    self.assertNotEqual(keys[0], keys[1])
+
+  def test_020(self):
+    # the least recently used are removed first
+    logger = Logger()
+    cfg = self.get_config(os.path.join(self.tmp_dir, "w1"))
+    cache = BCACHE.BuildCache.from_config(cfg)
+    for name in ["AA", "BB"]:
+      cache.store(cfg, self.install(cfg, name), logger)
+    entries = cache.get_entries()
+    self.assertEqual(len(entries), 2)
+    # AA used after BB
+    for date, entry_dir, info in entries:
+      date = 1000 if info.product == "AA" else 0
+      os.utime(os.path.join(entry_dir, BCACHE.INFO_FILENAME), (date, date))
+    removed = cache.prune(0)
+    self.assertEqual([info.product for d, e, info in removed], ["BB", "AA"])
+    self.assertEqual(cache.get_entries(), [])
+
+  def test_030(self):
+    # the entry is pruned during the restore: the product is not restored
+    logger = Logger()
+    cfg = self.get_config(os.path.join(self.tmp_dir, "w1"))
+    cache = BCACHE.BuildCache.from_config(cfg)
+    p_info = self.install(cfg, "AA")
+    cache.store(cfg, p_info, logger)
+    shutil.rmtree(p_info.install_dir)
+    copy2 = shutil.copy2
+    def prune_and_copy(source, target):
+      cache.prune(0)
+      return copy2(source, target)
+    shutil.copy2 = prune_and_copy
+    try:
+      self.assertFalse(cache.restore(cfg, p_info, logger))
+    finally:
+      shutil.copy2 = copy2
+    self.assertFalse(os.path.exists(p_info.install_dir))
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
+    pass
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+import os
+import sys
+import time
+import errno
+import shutil
+import tempfile
+import unittest
+import threading
+import subprocess
+
+import initializeTest # set PATH etc for test
+
+import src
+import src.debug as DBG # Easy print stderr (for DEBUG only)
+import src.jobserver as JOBS
+import src.salomeTools as SAT
+
+_MAKEFILE = """\
+all: a b c d
+a b c d:
+\t@echo $@ $$(date +%s.%N) >> times.txt; sleep 0.3
+"""
+
+def count_tokens(jobserver):
+  # read the free tokens without waiting, and give them back
+  import fcntl
+  flags = fcntl.fcntl(jobserver.fd_read, fcntl.F_GETFL)
+  fcntl.fcntl(jobserver.fd_read, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+  tokens = b""
+  try:
+    while True:
+      tokens += os.read(jobserver.fd_read, 1)
+  except OSError as e:
+    if e.errno != errno.EAGAIN:
+      raise
+  finally:
+    fcntl.fcntl(jobserver.fd_read, fcntl.F_SETFL, flags)
+  jobserver.release(tokens)
+  return len(tokens)
+
+class TestCase(unittest.TestCase):
+  "Test the jobserver shared by the make commands"""
+
+  def setUp(self):
+    SAT.setNotLocale() # test english
+    self.tmp_dir = tempfile.mkdtemp(prefix="sat_test_jobserver_")
+    self.fifo_path = os.path.join(self.tmp_dir, "fifo")
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+  @unittest.skipUnless(JOBS.is_available(), "no jobserver on this platform")
+  def test_010(self):
+    # the first process creates the tokens, the others join
+    jobserver = JOBS.JobServer(self.fifo_path, 3)
+    jobserver.open()
+    self.assertTrue(jobserver.hosted)
+    other = JOBS.JobServer(self.fifo_path, 8)
+    other.open()
+    self.assertFalse(other.hosted)
+    self.assertEqual(count_tokens(other), 3)
+    token = other.acquire()
+    self.assertEqual(count_tokens(jobserver), 2)
+    other.release(token)
+    other.close()
+    jobserver.close()
+    # alone: the fifo is created again
+    jobserver = JOBS.JobServer(self.fifo_path, 2)
+    jobserver.open()
+    self.assertTrue(jobserver.hosted)
+    self.assertEqual(count_tokens(jobserver), 2)
+    jobserver.close()
+
+  @unittest.skipUnless(JOBS.is_available() and JOBS.get_make_version() >= (3,),
+                       "no GNU make")
+  def test_020(self):
+    # make runs no more jobs than the tokens, and gives them back
+    with open(os.path.join(self.tmp_dir, "Makefile"), "w") as f:
+      f.write(_MAKEFILE)
+    jobserver = JOBS.JobServer(self.fifo_path, 2)
+    jobserver.open()
+    env = dict(os.environ, MAKEFLAGS=jobserver.get_makeflags())
+    res = jobserver.call("make", shell=True, cwd=self.tmp_dir, env=env,
+                         stdout=subprocess.PIPE)
+    self.assertEqual(res, 0)
+    self.assertEqual(count_tokens(jobserver), 2)
+    jobserver.close()
+    with open(os.path.join(self.tmp_dir, "times.txt")) as f:
+      starts = sorted([float(l.split()[1]) for l in f.read().splitlines()])
+    # 2 jobs at the same time: a, b then c, d
+    self.assertEqual(len(starts), 4)
+    self.assertTrue(starts[1] - starts[0] < 0.25)
+    self.assertTrue(starts[2] - starts[0] >= 0.25)
+
+  @unittest.skipUnless(JOBS.is_available(), "no jobserver on this platform")
+  def test_030(self):
+    # the processes join one at a time: the lock of the creator is not held
+    # while it is converted into a shared lock
+    import fcntl
+    jobserver = JOBS.JobServer(self.fifo_path, 3)
+    jobserver.open()
+    other = JOBS.JobServer(self.fifo_path, 8)
+    with open(self.fifo_path + ".create.lock", "a") as create_lock:
+      fcntl.flock(create_lock, fcntl.LOCK_EX)
+      thread = threading.Thread(target=other.open)
+      thread.start()
+      thread.join(0.3)
+      self.assertTrue(thread.is_alive())
+      self.assertEqual(other.lock_file, None)
+    thread.join()
+    self.assertFalse(other.hosted)
+    self.assertEqual(count_tokens(other), 3)
+    other.close()
+    jobserver.close()
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
+    pass
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import initializeTest # set PATH etc for test
+
+import src
+import src.debug as DBG # Easy print stderr (for DEBUG only)
+import src.pyconf as PYF
+import src.compileHistory as HIST
+import src.salomeTools as SAT
+
+_CONFIG = """\
+VARS : { datehour : "20180101_120000" }
+APPLICATION : { workdir : "%(workdir)s" }
+"""
+
+class TestCase(unittest.TestCase):
+  "Test the history of the compilations"""
+
+  def setUp(self):
+    SAT.setNotLocale() # test english
+    self.workdir = tempfile.mkdtemp(prefix="sat_test_history_")
+    self.cfg = PYF.Config(DBG.InStream(_CONFIG % {"workdir": self.workdir}))
+
+  def tearDown(self):
+    shutil.rmtree(self.workdir, ignore_errors=True)
+
+  def get_products_infos(self, depends):
+    res = []
+    for name, depend_all in depends:
+      p_info = PYF.Mapping()
+      p_info.depend_all = depend_all
+      res.append((name, p_info))
+    return res
+
+  def test_010(self):
+    # the last compilation of each product
+    for date, name, step, t in [("1", "AA", "CMAKE", 2.), ("1", "AA", "MAKE", 10.),
+                                ("2", "AA", "CMAKE", 1.), ("2", "AA", "MAKE", 5.),
+                                ("2", "BB", "SCRIPT", 3.)]:
+      self.cfg.VARS.datehour = date
+      HIST.add_record(self.cfg, name, step, 0, t, 1000 * int(t))
+    builds = HIST.get_last_builds(HIST.read_history(self.cfg))
+    self.assertEqual(sorted(builds), ["AA", "BB"])
+    self.assertEqual(builds["AA"]["date"], "2")
+    self.assertAlmostEqual(builds["AA"]["time"], 6.)
+    self.assertEqual(builds["AA"]["max_rss"], 5000)
+    self.assertEqual(builds["AA"]["steps"], [("CMAKE", 1.), ("MAKE", 5.)])
+
+  def test_020(self):
+    # the critical path goes through the longest chain of dependencies
+    products_infos = self.get_products_infos([("AA", []), ("BB", []),
+                                              ("CC", ["AA"]),
+                                              ("DD", ["AA", "BB", "CC"]),
+                                              ("EE", ["BB"])])
+    builds = {}
+    for name, t in [("AA", 10.), ("BB", 30.), ("CC", 25.), ("DD", 5.),
+                    ("EE", 1.)]:
+      builds[name] = {"time" : t}
+    total, path = HIST.get_critical_path(products_infos, builds)
+    self.assertAlmostEqual(total, 40.)
+    self.assertEqual(path, ["AA", "CC", "DD"])
+    # a product without history counts for 0
+    del builds["CC"]
+    total, path = HIST.get_critical_path(products_infos, builds)
+    self.assertEqual(path, ["BB", "DD"])
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
+    pass
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import initializeTest # set PATH etc for test
+
+import src
+import src.debug as DBG # Easy print stderr (for DEBUG only)
+import src.pyconf as PYF
+import src.compilation as COMP
+import src.salomeTools as SAT
+
+_CONFIG = """\
+APPLICATION : { properties : { compiler_cache : "yes" } }
+PRODUCTS :
+{
+  AA : { properties : { } }
+  BB : { properties : { compiler_cache : "no" } }
+}
+"""
+
+_STATS_LOG = """\
+# /work/SOURCES/AA/a.c
+direct_cache_hit
+# /work/SOURCES/AA/b.cpp
+preprocessed_cache_hit
+# /work/SOURCES/AA/c.cpp
+cache_miss
+# /work/BUILD/AA/a.out
+called_for_link
+"""
+
+class TestCase(unittest.TestCase):
+  "Test the compiler cache of the compilations"""
+
+  def setUp(self):
+    SAT.setNotLocale() # test english
+    self.tmp_dir = tempfile.mkdtemp(prefix="sat_test_compiler_cache_")
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+  def test_010(self):
+    # the property of the product overrides the property of the application
+    cfg = PYF.Config(DBG.InStream(_CONFIG))
+    self.assertTrue(COMP.uses_compiler_cache(cfg, cfg.PRODUCTS.AA))
+    self.assertFalse(COMP.uses_compiler_cache(cfg, cfg.PRODUCTS.BB))
+    cfg.APPLICATION.properties.compiler_cache = "no"
+    self.assertFalse(COMP.uses_compiler_cache(cfg, cfg.PRODUCTS.AA))
+
+  def test_020(self):
+    # the hits and the misses of the statistics log of ccache
+    stats_file = os.path.join(self.tmp_dir, COMP.COMPILER_CACHE_STATS_FILENAME)
+    self.assertEqual(COMP.read_compiler_cache_stats(stats_file), None)
+    with open(stats_file, "w") as f:
+      f.write(_STATS_LOG)
+    self.assertEqual(COMP.read_compiler_cache_stats(stats_file), (2, 1))
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
+    pass
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import initializeTest # set PATH etc for test
+
+import src
+import src.debug as DBG # Easy print stderr (for DEBUG only)
+import src.system as SYSS
+import src.salomeTools as SAT
+
+_DPKG_STATUS = """\
+Package: libc6
+Status: install ok installed
+Architecture: amd64
+Version: 2.36-9
+Description: GNU C Library
+ continuation line
+ Package: notapackage
+
+Package: libboost1.74-dev
+Status: install ok installed
+Architecture: amd64
+Version: 1.74.0-18
+
+Package: removed-pkg
+Status: deinstall ok config-files
+Version: 1.0
+"""
+
+_RPM_LIST = """\
+zlib 1.2.11-40.el9.x86_64
+zlib-devel 1.2.11-40.el9.x86_64
+"""
+
+class TestCase(unittest.TestCase):
+  "Test the check of the system packages"""
+
+  def setUp(self):
+    SAT.setNotLocale() # test english
+    self.tmp_dir = tempfile.mkdtemp(prefix="sat_test_system_pkg_")
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp_dir, ignore_errors=True)
+    os.environ.pop(SYSS.PKG_STATUS_FILE_VARIABLE, None)
+
+  def write(self, name, content):
+    path = os.path.join(self.tmp_dir, name)
+    with open(path, "w") as f:
+      f.write(content)
+    return path
+
+  def test_010(self):
+    # apt, with a fake dpkg status file
+    path = self.write("status", _DPKG_STATUS)
+    packages = SYSS.get_installed_packages(["apt"], path)
+    self.assertEqual(sorted(packages), ["libboost1.74-dev", "libc6"])
+    self.assertEqual(packages["libc6"], ["2.36-9 amd64"])
+    # read once
+    os.remove(path)
+    self.assertIs(SYSS.get_installed_packages(["apt"], path), packages)
+    self.assertEqual(SYSS.find_system_pkg(packages, "apt", "libboost"),
+                     ["libboost1.74-dev"])
+    self.assertEqual(SYSS.find_system_pkg(packages, "apt", "removed-pkg"), [])
+
+  def test_020(self):
+    # rpm, the fake status file given by the environment
+    path = self.write("rpms", _RPM_LIST)
+    os.environ[SYSS.PKG_STATUS_FILE_VARIABLE] = path
+    check_cmd = ["rpm", "-q"]
+    self.assertIn("OK", SYSS.check_system_pkg(check_cmd, "zlib"))
+    self.assertIn("zlib-devel-1.2.11-40.el9.x86_64",
+                  SYSS.check_system_pkg(check_cmd, "zlib-devel"))
+    self.assertIn("OK", SYSS.check_system_pkg(check_cmd, "zlib-1.2.11"))
+    self.assertIn("KO", SYSS.check_system_pkg(check_cmd, "zlib-1.3"))
+    self.assertIn("KO", SYSS.check_system_pkg(check_cmd, "zlib-static"))
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
+    pass
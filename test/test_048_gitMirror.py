@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+import initializeTest # set PATH etc for test
+
+import src
+import src.debug as DBG # Easy print stderr (for DEBUG only)
+import src.gitMirror as MIRROR
+import src.salomeTools as SAT
+
+class Logger(object):
+  def __init__(self, path):
+    self.logTxtFile = open(path, "w")
+    self.errors = []
+  def write(self, message, level=None, screenOnly=False):
+    pass
+  def trace(self, message):
+    pass
+  def error(self, message, prefix="ERROR: "):
+    self.errors.append(message)
+  def warning(self, message):
+    pass
+
+class TestCase(unittest.TestCase):
+  "Test the local mirror of the git repositories"""
+
+  def setUp(self):
+    SAT.setNotLocale() # test english
+    self.tmp_dir = tempfile.mkdtemp(prefix="sat_test_git_mirror_")
+    self.logger = Logger(os.path.join(self.tmp_dir, "log.txt"))
+    # a remote repository with a tag and a branch
+    self.repo = os.path.join(self.tmp_dir, "remote")
+    self.remote = "file://" + self.repo
+    os.makedirs(os.path.join(self.repo, "sub"))
+    self.git("init", "-q")
+    for name, content in [("README", "1"), ("sub/f", "2")]:
+      with open(os.path.join(self.repo, name), "w") as f:
+        f.write(content)
+    self.git("add", "README", "sub")
+    self.git("commit", "-q", "-m", "first")
+    self.git("tag", "V1")
+    self.git("commit", "-q", "--allow-empty", "-m", "second")
+    self.git("tag", "V2")
+
+  def tearDown(self):
+    self.logger.logTxtFile.close()
+    shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+  def git(self, *args):
+    subprocess.check_call(["git", "-c", "user.name=sat", "-c",
+                           "user.email=sat@sat", "-C", self.repo] + list(args))
+
+  def get_output(self, where, *args):
+    return subprocess.check_output(["git", "-C", where] + list(args)).decode().strip()
+
+  def test_010(self):
+    # a tag is a shallow clone, a branch a full clone, origin is the remote
+    mirror = MIRROR.GitMirror(os.path.join(self.tmp_dir, "mirror"))
+    where = os.path.join(self.tmp_dir, "SOURCES", "P1")
+    self.assertTrue(mirror.extract(self.remote, "V1", src.Path(where),
+                                   self.logger))
+    self.assertEqual(self.get_output(where, "rev-list", "--count", "HEAD"), "1")
+    self.assertEqual(self.get_output(where, "remote", "get-url", "origin"),
+                     self.remote)
+    self.assertTrue(os.path.isdir(mirror.get_repo_path(self.remote)))
+    where = os.path.join(self.tmp_dir, "SOURCES", "P2")
+    self.assertTrue(mirror.extract(self.remote, "master", src.Path(where),
+                                   self.logger))
+    self.assertEqual(self.get_output(where, "rev-list", "--count", "HEAD"), "2")
+    # a sub directory
+    where = os.path.join(self.tmp_dir, "SOURCES", "P3")
+    self.assertTrue(mirror.extract_sub_dir(self.remote, "V1", src.Path(where),
+                                           "sub", self.logger))
+    self.assertEqual(sorted(os.listdir(where)), ["README_git_log.txt", "f"])
+    # unknown tag
+    where = os.path.join(self.tmp_dir, "SOURCES", "P4")
+    self.assertFalse(mirror.extract(self.remote, "V3", src.Path(where),
+                                    self.logger))
+
+  def test_020(self):
+    # offline: the tags are got from the mirror, without the remote
+    mirror_dir = os.path.join(self.tmp_dir, "mirror")
+    mirror = MIRROR.GitMirror(mirror_dir)
+    self.assertTrue(mirror.update(self.remote, "master", self.logger))
+    shutil.rmtree(self.repo)
+    offline = MIRROR.GitMirror(mirror_dir, offline=True)
+    where = os.path.join(self.tmp_dir, "SOURCES", "P1")
+    self.assertTrue(offline.extract(self.remote, "V2", src.Path(where),
+                                    self.logger))
+    self.assertFalse(offline.extract(self.remote + "2", "V2",
+                                     src.Path(where + "2"), self.logger))
+    self.assertEqual(len(self.logger.errors), 1)
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
+    pass
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+import os
+import sys
+import shutil
+import tarfile
+import tempfile
+import unittest
+import subprocess
+
+import initializeTest # set PATH etc for test
+
+import src
+import src.debug as DBG # Easy print stderr (for DEBUG only)
+import src.system as SYSS
+import src.compilation as COMP
+import src.salomeTools as SAT
+
+class Logger(object):
+  def __init__(self):
+    self.messages = []
+  def write(self, message, level=None, screenOnly=False):
+    self.messages.append(message)
+
+class TestCase(unittest.TestCase):
+  "Test the extraction of the archives"""
+
+  def setUp(self):
+    SAT.setNotLocale() # test english
+    self.tmp_dir = tempfile.mkdtemp(prefix="sat_test_archive_")
+    self.sources = os.path.join(self.tmp_dir, "PROD-1.0")
+    os.makedirs(os.path.join(self.sources, "src"))
+    for name in ["README", "src/main.c"]:
+      with open(os.path.join(self.sources, name), "w") as f:
+        f.write(name * 1000)
+    with open(os.path.join(self.sources, "data.bin"), "wb") as f:
+      f.write(os.urandom(100000))
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+  def check_extract(self, path):
+    where = os.path.join(self.tmp_dir, "out")
+    shutil.rmtree(where, ignore_errors=True)
+    logger = Logger()
+    res, prefix = SYSS.archive_extract(path, where, logger)
+    self.assertTrue(res)
+    self.assertEqual(prefix, "PROD-1.0")
+    with open(os.path.join(where, "PROD-1.0", "src", "main.c")) as f:
+      self.assertEqual(f.read(), "src/main.c" * 1000)
+    self.assertIn("MB/s", logger.messages[-1])
+
+  def test_010(self):
+    # the compressions read by python (or by the programs found)
+    for mode, ext, compression in [("w:gz", "tgz", "gzip"),
+                                   ("w:bz2", "tar.bz2", "bzip2"),
+                                   ("w", "tar", None)]:
+      path = os.path.join(self.tmp_dir, "PROD." + ext)
+      with tarfile.open(path, mode) as archive:
+        archive.add(self.sources, "PROD-1.0")
+      self.assertEqual(SYSS.get_archive_compression(path), compression)
+      self.check_extract(path)
+
+  def test_020(self):
+    # zstd archive
+    if COMP.find_program("zstd") is None:
+      self.skipTest("zstd is not installed")
+    tar_path = os.path.join(self.tmp_dir, "PROD.tar")
+    with tarfile.open(tar_path, "w") as archive:
+      archive.add(self.sources, "PROD-1.0")
+    subprocess.check_call(["zstd", "-q", tar_path])
+    self.assertEqual(SYSS.get_archive_compression(tar_path + ".zst"), "zstd")
+    self.check_extract(tar_path + ".zst")
+
+  def test_030(self):
+    # truncated archive
+    path = os.path.join(self.tmp_dir, "PROD.tgz")
+    with tarfile.open(path, "w:gz") as archive:
+      archive.add(self.sources, "PROD-1.0")
+    with open(path, "rb") as f:
+      content = f.read()
+    with open(path, "wb") as f:
+      f.write(content[:len(content) // 2])
+    res, prefix = SYSS.archive_extract(path, os.path.join(self.tmp_dir, "out"),
+                                       Logger())
+    self.assertFalse(res)
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
+    pass
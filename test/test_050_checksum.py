@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+import os
+import sys
+import shutil
+import hashlib
+import tarfile
+import tempfile
+import unittest
+
+import initializeTest # set PATH etc for test
+
+import src
+import src.debug as DBG # Easy print stderr (for DEBUG only)
+import src.pyconf as PYF
+import src.system as SYSS
+import src.checksum as CHECKSUM
+import src.salomeTools as SAT
+
+class Logger(object):
+  def write(self, message, level=None, screenOnly=False):
+    pass
+
+class TestCase(unittest.TestCase):
+  "Test the checksums of the archives"""
+
+  def setUp(self):
+    SAT.setNotLocale() # test english
+    self.tmp_dir = tempfile.mkdtemp(prefix="sat_test_checksum_")
+    sources = os.path.join(self.tmp_dir, "PROD-1.0")
+    os.makedirs(sources)
+    with open(os.path.join(sources, "data.bin"), "wb") as f:
+      f.write(os.urandom(300000))
+    self.archive = os.path.join(self.tmp_dir, "PROD.tgz")
+    with tarfile.open(self.archive, "w:gz") as archive:
+      archive.add(sources, "PROD-1.0")
+    with open(self.archive, "rb") as f:
+      self.sha256 = hashlib.sha256(f.read()).hexdigest()
+    self.config = PYF.Config(DBG.InStream(
+      'LOCAL : { workdir : "%s" }\n' % self.tmp_dir))
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+  def write_checksum_file(self, checksum):
+    with open(self.archive + ".sha256", "w") as f:
+      f.write("%s  PROD.tgz\n" % checksum)
+
+  def test_010(self):
+    # the checksum is computed during the extraction
+    self.assertEqual(CHECKSUM.get_file_checksum(self.archive, "sha256"),
+                     self.sha256)
+    get_decompress_command = SYSS.get_decompress_command
+    for program in [True, False]:
+      if not program: # read by python
+        SYSS.get_decompress_command = lambda compression: None
+      try:
+        checksums = [hashlib.sha256()]
+        res, prefix = SYSS.archive_extract(
+          self.archive, os.path.join(self.tmp_dir, "out%s" % program),
+          Logger(), checksums)
+      finally:
+        SYSS.get_decompress_command = get_decompress_command
+      self.assertTrue(res)
+      self.assertEqual(checksums[0].hexdigest(), self.sha256)
+
+  def test_020(self):
+    # verified archive, recorded in the index
+    self.write_checksum_file(self.sha256.upper())
+    where = os.path.join(self.tmp_dir, "out")
+    res, prefix = CHECKSUM.extract_verified_archive(self.config, self.archive,
+                                                    where, Logger())
+    self.assertTrue(res)
+    self.assertTrue(os.path.isdir(os.path.join(where, "PROD-1.0")))
+    index = CHECKSUM.ChecksumIndex(os.path.join(self.tmp_dir,
+                                                CHECKSUM.INDEX_FILENAME))
+    self.assertEqual(index.get(self.archive, "sha256"), self.sha256)
+    # a new archive is not in the index
+    with open(self.archive, "ab") as f:
+      f.write(b"\0" * 512)
+    self.assertEqual(index.get(self.archive, "sha256"), None)
+
+  def test_030(self):
+    # corrupted archive: the extracted directory is removed, the next
+    # extraction fails before reading the archive
+    self.write_checksum_file("0" * 64)
+    where = os.path.join(self.tmp_dir, "out")
+    with self.assertRaises(src.SatException):
+      CHECKSUM.extract_verified_archive(self.config, self.archive, where,
+                                        Logger())
+    self.assertFalse(os.path.exists(os.path.join(where, "PROD-1.0")))
+    self.assertEqual(CHECKSUM.get_index(self.config).get(self.archive,
+                                                         "sha256"),
+                     self.sha256)
+    SYSS.archive_extract, patch = None, SYSS.archive_extract
+    try:
+      with self.assertRaises(src.SatException):
+        CHECKSUM.extract_verified_archive(self.config, self.archive, where,
+                                          Logger())
+    finally:
+      SYSS.archive_extract = patch
+
+  def test_040(self):
+    # corrupted archive of several files and directories: only they are
+    # removed
+    doc = os.path.join(self.tmp_dir, "PROD-1.0-doc")
+    os.makedirs(doc)
+    hidden = os.path.join(self.tmp_dir, ".foo")
+    for path in [os.path.join(doc, "index.html"), hidden]:
+      with open(path, "w") as f:
+        f.write("data")
+    with tarfile.open(self.archive, "w:gz") as archive:
+      archive.add(os.path.join(self.tmp_dir, "PROD-1.0"), "./PROD-1.0")
+      archive.add(doc, "./PROD-1.0-doc")
+      archive.add(hidden, ".foo")
+    self.write_checksum_file("0" * 64)
+    where = os.path.join(self.tmp_dir, "out")
+    os.makedirs(os.path.join(where, "PROD"))
+    with self.assertRaises(src.SatException):
+      CHECKSUM.extract_verified_archive(self.config, self.archive, where,
+                                        Logger())
+    self.assertEqual(os.listdir(where), ["PROD"])
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
+    pass
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+#  Copyright (C) 2010-2018  CEA/DEN
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2.1 of the License.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307 USA
+
+import os
+import sys
+import shutil
+import ftplib
+import hashlib
+import tempfile
+import threading
+import unittest
+
+try:
+  from pyftpdlib.authorizers import DummyAuthorizer
+  from pyftpdlib.handlers import FTPHandler
+  from pyftpdlib.servers import ThreadedFTPServer
+except ImportError:
+  ThreadedFTPServer = None
+
+import initializeTest # set PATH etc for test
+
+import src
+import src.debug as DBG # Easy print stderr (for DEBUG only)
+import src.ftpPool as FTPP
+import src.salomeTools as SAT
+
+class Logger(object):
+  def __init__(self):
+    self.messages = []
+  def write(self, message, level=None, screenOnly=False):
+    self.messages.append(message)
+  def error(self, message):
+    self.messages.append(message)
+
+@unittest.skipIf(ThreadedFTPServer is None, "pyftpdlib is not installed")
+class TestCase(unittest.TestCase):
+  "Test the downloads from the ftp servers"""
+
+  def setUp(self):
+    SAT.setNotLocale() # test english
+    self.tmp_dir = tempfile.mkdtemp(prefix="sat_test_ftp_")
+    ftp_dir = os.path.join(self.tmp_dir, "ftp", "pub", "bin")
+    os.makedirs(ftp_dir)
+    self.content = os.urandom(3000000)
+    for name in ["P-1.0.tgz", "bin/P-1.0.tgz", "bin/Q-1.0.tgz"]:
+      with open(os.path.join(self.tmp_dir, "ftp", "pub", name), "wb") as f:
+        f.write(self.content)
+    self.sha256 = hashlib.sha256(self.content).hexdigest()
+    with open(os.path.join(ftp_dir, "P-1.0.tgz.sha256"), "w") as f:
+      f.write("%s  P-1.0.tgz\n" % self.sha256)
+    self.download_dir = os.path.join(self.tmp_dir, "archives")
+    os.makedirs(self.download_dir)
+    # the anonymous ftp server
+    authorizer = DummyAuthorizer()
+    authorizer.add_anonymous(os.path.join(self.tmp_dir, "ftp"))
+    handler = type("Handler", (FTPHandler,), {"authorizer": authorizer})
+    self.server = ThreadedFTPServer(("127.0.0.1", 0), handler)
+    self.port = self.server.address[1]
+    self.thread = threading.Thread(target=self.server.serve_forever,
+                                   kwargs={"timeout": 0.1})
+    self.thread.daemon = True
+    self.thread.start()
+    self.server_name = "127.0.0.1:%d" % self.port
+
+  def tearDown(self):
+    self.server.close_all()
+    self.thread.join(5)
+    shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+  def check_file(self, path):
+    with open(path, "rb") as f:
+      self.assertEqual(f.read(), self.content)
+    self.assertFalse(os.path.exists(path + FTPP.PART_EXT))
+
+  def test_010(self):
+    # the connections are reused, at most max_connections
+    pool = FTPP.FtpPool(max_connections=1, retry_wait=0)
+    threads = []
+    for name in ["P-1.0.tgz", "Q-1.0.tgz"]:
+      destination = os.path.join(self.download_dir, name)
+      threads.append(threading.Thread(target=pool.download,
+                                      args=(self.server_name, ["pub", "bin"],
+                                            name, destination, Logger())))
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    for name in ["P-1.0.tgz", "Q-1.0.tgz"]:
+      self.check_file(os.path.join(self.download_dir, name))
+    self.assertFalse(pool.download(self.server_name, ["pub"], "X-1.0.tgz",
+                                   os.path.join(self.download_dir, "X-1.0.tgz"),
+                                   Logger()))
+    self.assertEqual(pool.nb_connections, 1)
+    pool.close()
+
+  def test_020(self):
+    # an interrupted download is resumed
+    destination = os.path.join(self.download_dir, "P-1.0.tgz")
+    with open(destination + FTPP.PART_EXT, "wb") as f:
+      f.write(self.content[:1234567])
+    pool = FTPP.FtpPool(retry_wait=0)
+    logger = Logger()
+    checksums = [hashlib.sha256()]
+    self.assertTrue(pool.download(self.server_name, ["pub"], "P-1.0.tgz",
+                                  destination, logger, checksums))
+    self.check_file(destination)
+    self.assertEqual(checksums[0].hexdigest(), self.sha256)
+    self.assertIn("Resume the download of P-1.0.tgz at 1.2 MB\n",
+                  [m.strip(" ") for m in logger.messages])
+    # a part file larger than the file is from another file
+    with open(destination + FTPP.PART_EXT, "wb") as f:
+      f.write(b"\0" * (len(self.content) + 1))
+    self.assertTrue(pool.download(self.server_name, ["pub"], "P-1.0.tgz",
+                                  destination, logger))
+    self.check_file(destination)
+    pool.close()
+
+  def test_030(self):
+    # the archive and its checksum file, with the pool of sat
+    class Index(object):
+      def set(index, path, algorithm, checksum):
+        index.checksum = (path, algorithm, checksum)
+    index = Index()
+    port, ftplib.FTP.port = ftplib.FTP.port, self.port
+    pool, FTPP._pool = FTPP._pool, FTPP.FtpPool(retry_wait=0)
+    try:
+      path = src.find_file_in_ftppath("P-1.0.tgz", ["127.0.0.1/pub"],
+                                      self.download_dir, Logger(), "bin",
+                                      index)
+      self.assertFalse(src.find_file_in_ftppath("X-1.0.tgz",
+                                                ["127.0.0.1/pub"],
+                                                self.download_dir, Logger()))
+    finally:
+      FTPP._pool.close()
+      ftplib.FTP.port, FTPP._pool = port, pool
+    self.assertEqual(path, os.path.join(self.download_dir, "P-1.0.tgz"))
+    self.check_file(path)
+    self.assertTrue(os.path.exists(path + ".sha256"))
+    self.assertEqual(index.checksum, (path, "sha256", self.sha256))
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
+    pass